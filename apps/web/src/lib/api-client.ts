@@ -1,9 +1,20 @@
 import type {
+  CompactFiles,
   DailyUploadCount,
+  DeleteBatchResponse,
+  DeletePrefixResponse,
+  Disposition,
   FileMetadata,
+  FileField,
   FileMetadataDetail,
+  FilePage,
+  FileSort,
   FileUploadResponse,
+  FolderChildren,
+  FolderSummary,
+  PresignBatchResponse,
   PresignUploadResponse,
+  SortOrder,
   UploadStats,
 } from "@vibe-coding-starter-kit/shared";
 
@@ -24,8 +35,15 @@ type ApiClientRoute = {
 export const API_CLIENT_ROUTES = {
   health: { method: "get", path: "/health" },
   files: { method: "get", path: "/files" },
+  filesPage: { method: "get", path: "/files/page" },
+  fileSearch: { method: "get", path: "/files/search" },
+  folderTree: { method: "get", path: "/files/tree" },
+  folderChildren: { method: "get", path: "/files/children" },
   fileStats: { method: "get", path: "/files/stats" },
   uploadActivity: { method: "get", path: "/files/stats/activity" },
+  filePresignBatch: { method: "post", path: "/files/presign-batch" },
+  fileDeleteBatch: { method: "post", path: "/files/delete-batch" },
+  fileDeletePrefix: { method: "post", path: "/files/delete-prefix" },
   fileByKeyDownload: { method: "get", path: "/files-by-key/download" },
   fileByKeyPreview: { method: "get", path: "/files-by-key/preview" },
   fileByKeyMetadata: { method: "get", path: "/files-by-key/metadata" },
@@ -204,10 +222,69 @@ export async function getHealth() {
   );
 }
 
-export async function getFiles(prefix = "", limit = 100) {
-  return apiFetch<FileMetadata[]>(
-    `${API_CLIENT_ROUTES.files.path}?prefix=${encodeURIComponent(prefix)}&limit=${limit}`
-  );
+export async function getFiles(
+  prefix = "",
+  limit = 100,
+  sort: FileSort = "uploaded_at",
+  order?: SortOrder
+) {
+  const params = new URLSearchParams({ prefix, limit: String(limit), sort });
+  if (order) params.set("order", order);
+  return apiFetch<FileMetadata[]>(`${API_CLIENT_ROUTES.files.path}?${params}`);
+}
+
+/** `getFiles` in the compact encoding, with only `fields` (every field by
+ *  default): a fraction of the bytes for a large listing. Expand the rows
+ *  with `expandCompactFiles`. */
+export async function getFilesCompact(
+  prefix = "",
+  limit = 100,
+  sort: FileSort = "uploaded_at",
+  order?: SortOrder,
+  fields?: FileField[]
+) {
+  const params = new URLSearchParams({ prefix, limit: String(limit), sort, format: "compact" });
+  if (order) params.set("order", order);
+  if (fields) params.set("fields", fields.join(","));
+  return apiFetch<CompactFiles>(`${API_CLIENT_ROUTES.files.path}?${params}`);
+}
+
+/** One object per compact row, keyed by `columns`. */
+export function expandCompactFiles({ columns, rows }: CompactFiles): Partial<FileMetadata>[] {
+  return rows.map((row) => Object.fromEntries(columns.map((column, i) => [column, row[i]])));
+}
+
+export async function getFilesPage(
+  prefix = "",
+  limit = 100,
+  sort: FileSort = "uploaded_at",
+  order?: SortOrder,
+  cursor?: string
+) {
+  const params = new URLSearchParams({ prefix, limit: String(limit), sort });
+  if (order) params.set("order", order);
+  if (cursor) params.set("cursor", cursor);
+  return apiFetch<FilePage>(`${API_CLIENT_ROUTES.filesPage.path}?${params}`);
+}
+
+/** Bucket-wide filename search, best match first (not just the rows `/files`
+ *  returned). Substring matches need 3+ characters. */
+export async function searchFiles(q: string, limit = 20) {
+  const params = new URLSearchParams({ q, limit: String(limit) });
+  return apiFetch<FileMetadata[]>(`${API_CLIENT_ROUTES.fileSearch.path}?${params}`);
+}
+
+/** Folder structure with per-folder totals, without listing the objects. */
+export async function getFolderTree(prefix = "", depth = 2) {
+  const params = new URLSearchParams({ prefix, depth: String(depth) });
+  return apiFetch<FolderSummary>(`${API_CLIENT_ROUTES.folderTree.path}?${params}`);
+}
+
+/** A folder's immediate subfolders and files, a page at a time. */
+export async function getFolderChildren(folder = "", limit = 200, cursor?: string) {
+  const params = new URLSearchParams({ folder, limit: String(limit) });
+  if (cursor) params.set("cursor", cursor);
+  return apiFetch<FolderChildren>(`${API_CLIENT_ROUTES.folderChildren.path}?${params}`);
 }
 
 export async function getFileStats() {
@@ -258,6 +335,19 @@ export async function getPreviewUrl(key: string) {
   );
 }
 
+/**
+ * Presigned URLs for up to 100 keys in one request — for thumbnail grids and
+ * multi-file downloads, instead of one `getPreviewUrl` call per file. Keys with
+ * no object come back in `missing`. `attachment` URLs count as downloads.
+ */
+export async function presignFiles(keys: string[], disposition: Disposition = "inline") {
+  return apiFetch<PresignBatchResponse>(API_CLIENT_ROUTES.filePresignBatch.path, {
+    method: API_CLIENT_ROUTES.filePresignBatch.method.toUpperCase(),
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ keys, disposition }),
+  });
+}
+
 export async function deleteFile(key: string) {
   return apiFetchWithLegacyFallback<{ deleted: boolean; key: string }>(
     `${API_CLIENT_ROUTES.fileByKeyDelete.path}?${fileKeyQuery(key)}`,
@@ -270,6 +360,31 @@ export async function deleteFile(key: string) {
   );
 }
 
+/**
+ * Delete up to 10,000 keys in one request, instead of one `deleteFile` call per
+ * file. Keys B2 refused come back in `errors`; the rest are in `deleted`.
+ */
+export async function deleteFiles(keys: string[]) {
+  return apiFetch<DeleteBatchResponse>(API_CLIENT_ROUTES.fileDeleteBatch.path, {
+    method: API_CLIENT_ROUTES.fileDeleteBatch.method.toUpperCase(),
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ keys }),
+  });
+}
+
+/**
+ * Delete every file under `prefix` (a folder path ending in "/"), answered
+ * with counts rather than the deleted keys. An empty prefix deletes the WHOLE
+ * bucket and is refused unless `confirm` is the bucket's name.
+ */
+export async function deleteFolder(prefix: string, confirm?: string) {
+  return apiFetch<DeletePrefixResponse>(API_CLIENT_ROUTES.fileDeletePrefix.path, {
+    method: API_CLIENT_ROUTES.fileDeletePrefix.method.toUpperCase(),
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ prefix, confirm }),
+  });
+}
+
 /**
  * Upload a file directly to B2 in three steps: presign (the API validates the
  * declared file and signs a short-lived PUT), a direct browser→B2 PUT, then
@@ -20,6 +20,7 @@ import {
 import type {
   FileMetadata,
   FileMetadataDetail,
+  UploadStats,
 } from "@vibe-coding-starter-kit/shared";
 
 // Single source of truth for query keys. Keep these tightly scoped so that
@@ -49,11 +50,24 @@ export interface QueryGate {
   enabled?: boolean;
 }
 
+// While the API's first bucket scan is still running it answers listing
+// requests from the objects listed so far instead of blocking (`complete:
+// false` on /files/stats). The listing queries poll until the scan finishes, so
+// the first paint no longer waits on bucket size and still fills in unprompted.
+const PARTIAL_LISTING_POLL_MS = 1_000;
+
+function partialListingPoll(queryClient: QueryClient): number | false {
+  const stats = queryClient.getQueryData<UploadStats>(qk.stats());
+  return stats?.complete === false ? PARTIAL_LISTING_POLL_MS : false;
+}
+
 export function useFiles(prefix = "", limit = 100, { enabled = true }: QueryGate = {}) {
+  const queryClient = useQueryClient();
   return useQuery<FileMetadata[], ApiError>({
     queryKey: qk.files(prefix, limit),
     queryFn: () => getFiles(prefix, limit),
     enabled,
+    refetchInterval: () => partialListingPoll(queryClient),
   });
 }
 
@@ -62,13 +76,17 @@ export function useFileStats({ enabled = true }: QueryGate = {}) {
     queryKey: qk.stats(),
     queryFn: getFileStats,
     enabled,
+    refetchInterval: (query) =>
+      query.state.data?.complete === false ? PARTIAL_LISTING_POLL_MS : false,
   });
 }
 
 export function useUploadActivity(days = 7) {
+  const queryClient = useQueryClient();
   return useQuery({
     queryKey: qk.uploadActivity(days),
     queryFn: () => getUploadActivity(days),
+    refetchInterval: () => partialListingPoll(queryClient),
   });
 }
 
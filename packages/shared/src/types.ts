@@ -11,6 +11,63 @@ export interface FileMetadata {
   url: string | null;
 }
 
+/**
+ * `GET /files` orderings; the default order is `desc` except for `name` and
+ * `key`. `name` is the filename, case-insensitive; `key` is the whole key in
+ * B2's own order, the one a cold cache answers without a bucket scan.
+ */
+export type FileSort = "uploaded_at" | "name" | "size" | "key";
+export type SortOrder = "asc" | "desc";
+
+/** `GET /files/page`. Send `next_cursor` back as `cursor` with the same query
+ *  for the next page; null after the last. A 410 means the listing changed —
+ *  restart without a cursor. */
+export interface FilePage {
+  files: FileMetadata[];
+  next_cursor: string | null;
+}
+
+/** A folder in `GET /files/tree`: du-style totals of everything under it.
+ *  `children` stops at the requested depth; `subfolder_count` is exact. */
+export interface FolderSummary {
+  /** "" for the bucket root, else ends with "/". */
+  path: string;
+  name: string;
+  file_count: number;
+  size_bytes: number;
+  size_human: string;
+  newest_uploaded_at: string | null;
+  subfolder_count: number;
+  children: FolderSummary[];
+}
+
+/** `FileMetadata` fields a list route can project to with `fields=`. */
+export type FileField = keyof FileMetadata;
+
+/** A `FileMetadata` cut down by `fields=`: only the requested keys are sent. */
+export type FileFields = Partial<FileMetadata>;
+
+/** `format=compact`: a header row naming each column once, then one array of
+ *  values per file in that order. */
+export interface CompactFiles {
+  columns: FileField[];
+  rows: (string | number | null)[][];
+}
+
+/** `GET /files/page` in `format=compact`. */
+export interface CompactFilePage extends CompactFiles {
+  next_cursor: string | null;
+}
+
+/** One level of a folder from `GET /files/children`: its subfolders (full
+ *  paths ending in "/") and the files directly in it, in key order. */
+export interface FolderChildren {
+  folder: string;
+  folders: string[];
+  files: FileMetadata[];
+  next_cursor: string | null;
+}
+
 export interface FileMetadataDetail {
   filename: string;
   size_bytes: number;
@@ -48,6 +105,38 @@ export interface FileUploadResponse {
   metadata: FileMetadataDetail | null;
 }
 
+/** How a presigned GET asks B2 to serve the object: saved, or shown in place. */
+export type Disposition = "attachment" | "inline";
+
+/** `POST /files/presign-batch`: a presigned URL per existing key (in request
+ *  order), and the keys with no object. */
+export interface PresignBatchResponse {
+  urls: Record<string, string>;
+  missing: string[];
+}
+
+/** A key B2 refused to delete, with its S3 error code and message. */
+export interface DeleteError {
+  key: string;
+  code: string;
+  message: string;
+}
+
+/** `POST /files/delete-batch`: the keys deleted, and an error for each one
+ *  that wasn't. */
+export interface DeleteBatchResponse {
+  deleted: string[];
+  errors: DeleteError[];
+}
+
+/** `POST /files/delete-prefix`: how many objects were deleted and how many
+ *  weren't, with the first 10,000 errors. */
+export interface DeletePrefixResponse {
+  deleted: number;
+  failed: number;
+  errors: DeleteError[];
+}
+
 /** A short-lived presigned PUT the browser uploads a file directly to B2 with.
  *  `headers` are signed into the URL, so the browser must send them verbatim. */
 export interface PresignUploadResponse {
@@ -70,4 +159,9 @@ export interface UploadStats {
   total_size_human: string;
   uploads_today: number;
   total_downloads: number;
+  /** Objects per content type, most common first. */
+  files_by_content_type: Record<string, number>;
+  /** False while the API's first bucket scan is still running: these numbers
+   * cover only the objects listed so far. */
+  complete: boolean;
 }
@@ -29,6 +29,16 @@ class Settings(BaseSettings):
     # enough for a big file on a slow link, short enough that a leaked URL is a
     # narrow, single-key, single-size window.
     presign_upload_expiry_seconds: int = 900  # 15 minutes
+    # Sign download/preview URLs as of the start of fixed buckets of this many
+    # seconds (repo/b2_presign.py), so every request for the same key and
+    # disposition within a bucket gets the exact same URL, one that lets the
+    # browser (or a CDN) cache the body for the URL's usual expiry (the URL
+    # itself stays valid for the bucket on top, so a late hand-out still has
+    # that expiry left): a reopened preview is served from cache instead of
+    # downloaded from B2 again. The catch: an object overwritten under the
+    # same key can be served stale from those caches until its URL expires.
+    # 0 (default) signs a new URL on every request.
+    presign_time_bucket_seconds: int = 0
 
     # Optional confinement for key-addressed reads/deletes. Empty by default so
     # the by-key routes accept any key shape (they deliberately support nested
@@ -41,13 +51,60 @@ class Settings(BaseSettings):
     # ~8-20s, so one scan is shared. Entries older than the TTL are still
     # served *immediately* while a background thread refreshes them
     # (stale-while-revalidate), so only the very first scan can make a user
-    # wait. Uploads and deletes invalidate the cache outright, so the app's own
-    # writes are never served stale — only bucket changes made elsewhere can lag
-    # by up to this TTL.
+    # wait. Uploads and deletes are written through to the cached snapshot, so
+    # the app's own writes are never served stale — only bucket changes made
+    # elsewhere can lag, by up to the refresh interval.
     list_cache_ttl_seconds: float = 300.0
+    # The TTL is the starting interval: each refresh is diffed against the
+    # snapshot it replaces (repo/list_schedule.py), and the interval halves
+    # when the bucket changed outside the app at `churn_high` changes per
+    # second or more, doubles at `churn_low` or less, and holds in between,
+    # within these bounds. False keeps the fixed TTL.
+    list_refresh_adaptive: bool = True
+    list_refresh_min_seconds: float = 30.0
+    list_refresh_max_seconds: float = 3600.0
+    list_refresh_churn_high: float = 0.05  # 15 changes per 5-minute interval
+    list_refresh_churn_low: float = 0.005
     # Scan the bucket once at startup so the first page view doesn't pay for the
     # cold scan. Set false for offline dev or when startup must not touch B2.
     warm_list_cache_on_startup: bool = True
+    # The cached full-bucket scan is split into this many key ranges listed
+    # concurrently (repo/b2_scan.py). One listing is a chain of dependent page
+    # requests, so this divides the scan's wall time by up to this factor at the
+    # same total list-call count (+1 delimiter call on a first scan). 1 restores
+    # the plain sequential paginator.
+    list_scan_partitions: int = 8
+    # Send the scan's ListObjectsV2 calls as botocore-presigned GETs over a
+    # urllib3 pool and stream-parse the XML for Key/Size/LastModified only
+    # (repo/b2_raw_list.py) — ~8x less CPU per page than botocore's parser.
+    # Off by default: a new request path against a production bucket.
+    list_raw_parser: bool = False
+    # A root scan that fails (after per-page retries) keeps the pages it got
+    # and each range's continuation token (repo/list_checkpoint.py); the next
+    # scan starting within this many seconds of the failed one resumes there
+    # instead of at page 1. 0 always restarts.
+    list_resume_max_age_seconds: float = 600.0
+    # With nothing cached, /files and the stats answer from a partial snapshot
+    # of the running scan (repo/list_progress.py) — flagged by an
+    # `X-Listing-Complete: false` header — instead of waiting for its last
+    # page. False makes those requests block on the cold scan as before.
+    list_progressive: bool = True
+    # Each root scan is persisted here (repo/list_store.py) and served as stale
+    # on the first read after a restart while the normal refresh runs, so a
+    # deploy doesn't hand every replica a cold scan. Resolved like
+    # DOWNLOAD_COUNT_FILE (repo root, outside the reloader's watch tree). Empty
+    # disables it. Best-effort: an unreadable/unwritable file only costs a scan.
+    list_snapshot_file: str = ".data/list_snapshot.bin"
+    # Share that file between the worker processes of one host (uvicorn
+    # --workers N; repo/list_shared.py): one worker scans, all serve the same
+    # generation, and uploads/deletes reach every worker. Needs the snapshot
+    # file on a local disk and POSIX flock; ignored elsewhere.
+    list_shared_cache: bool = False
+
+    # Per-object B2 calls (HEAD, delete, Range GET for upload sniffing) go out
+    # from the event loop on one pooled async HTTP client (repo/b2_async.py),
+    # not a threadpool thread each; this caps its open connections to B2.
+    b2_async_max_connections: int = 100
 
     # Rate limiting (per client IP, per 60s window). In-process per replica —
     # documented in docs/RELIABILITY.md; horizontal scaling needs a shared
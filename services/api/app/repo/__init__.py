@@ -1,34 +1,79 @@
+from app.repo.b2_async import (
+    add_to_listing_async,
+    close_async_client,
+    delete_file_async,
+    get_file_metadata_async,
+    get_object_head_bytes_async,
+)
 from app.repo.b2_client import (
     check_connectivity,
     delete_file,
     get_file_metadata,
-    get_presigned_url,
+    upload_file,
+)
+from app.repo.b2_delete import delete_files, delete_prefix
+from app.repo.b2_listing import (
+    get_daily_uploads,
+    get_folder_tree,
     get_upload_stats,
+    list_children,
     list_files,
+    list_files_after,
+    list_files_page,
+    list_files_sorted,
+    listed,
+    listing_progress,
+    listing_version,
     prewarm_listing,
-    upload_file,
+    search_files,
 )
 from app.repo.b2_object import get_object_bytes
+from app.repo.b2_presign import get_presigned_url
 from app.repo.b2_upload import (
+    add_to_listing,
     generate_presigned_upload,
     get_object_head_bytes,
-    invalidate_listing,
 )
 from app.repo.counter import get_download_count, increment_download_count
+from app.repo.list_rows import FileRows
+from app.repo.list_schedule import RefreshSchedule, refresh_schedule
+from app.repo.list_tree import FolderTree, folder_name
 
 __all__ = [
+    "FileRows",
+    "FolderTree",
+    "RefreshSchedule",
+    "add_to_listing",
+    "add_to_listing_async",
     "check_connectivity",
+    "close_async_client",
     "delete_file",
+    "delete_file_async",
+    "delete_files",
+    "delete_prefix",
+    "folder_name",
     "generate_presigned_upload",
+    "get_daily_uploads",
     "get_download_count",
     "get_file_metadata",
+    "get_file_metadata_async",
+    "get_folder_tree",
     "get_object_bytes",
     "get_object_head_bytes",
+    "get_object_head_bytes_async",
     "get_presigned_url",
     "get_upload_stats",
     "increment_download_count",
-    "invalidate_listing",
+    "list_children",
     "list_files",
+    "list_files_after",
+    "list_files_page",
+    "list_files_sorted",
+    "listed",
+    "listing_progress",
+    "listing_version",
     "prewarm_listing",
+    "refresh_schedule",
+    "search_files",
     "upload_file",
 ]
@@ -0,0 +1,150 @@
+"""Per-object B2 calls as coroutines, on one pooled async HTTP client.
+
+boto3 blocks, so every route that reached B2 was a sync handler holding one of
+AnyIO's ~40 threadpool slots for its whole round trip: a handful of slow HEADs
+queued every other request behind them, in-memory listing reads included.
+These make the same calls without a thread. Each request is a presigned URL
+(`b2_presign`, signing as `get_s3_client` does; local CPU, no I/O) that an
+aiohttp session sends from the event loop over up to
+`B2_ASYNC_MAX_CONNECTIONS` keep-alive connections. (httpx was
+measured too: its connection pool rescans every queued request against every
+connection, and at a few hundred concurrent requests that CPU made it slower
+than the threadpool — see benchmarks/bench_async_load.py.)
+
+Each function returns and raises what its boto3 counterpart in `b2_client` /
+`b2_upload` does: the same `FileMetadata`, None for a missing object,
+botocore's ClientError or a RuntimeError. Connection errors, timeouts and 5xx
+responses are retried like botocore's standard mode, 3 attempts in all. Writes
+through to the listing cache take its locks (a file lock when shared) and
+patch the snapshot, so they run in a worker thread.
+
+A session belongs to the event loop that made it (the test suite runs one loop
+per test); `close_async_client()` closes it at shutdown.
+"""
+
+import asyncio
+import weakref
+from collections.abc import Mapping
+from email.utils import parsedate_to_datetime
+from typing import NamedTuple
+
+import aiohttp
+import anyio
+from yarl import URL
+
+from app.config import settings
+from app.repo.b2_client import object_metadata
+from app.repo.b2_presign import get_presigner
+from app.repo.b2_raw_list import client_error
+from app.repo.b2_upload import add_to_listing
+from app.repo.list_builder import Delta
+from app.repo.list_cache import apply as _apply_to_list_cache
+from app.types import FileMetadata
+
+# The presigned URL is used at once; this only has to outlast clock skew.
+_URL_EXPIRY_SECONDS = 300
+_ATTEMPTS = 3
+_RETRY_STATUSES = frozenset((500, 502, 503, 504))
+_RETRY_BASE_SECONDS = 0.1
+# What a request can fail with short of an HTTP response.
+_SEND_ERRORS = (aiohttp.ClientError, TimeoutError)
+
+_sessions: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class _Response(NamedTuple):
+    status: int
+    headers: Mapping[str, str]  # case-insensitive
+    body: bytes
+
+
+def _session() -> aiohttp.ClientSession:
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        # Timeouts as `get_s3_client`'s.
+        session = _sessions[loop] = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=settings.b2_async_max_connections),
+            timeout=aiohttp.ClientTimeout(connect=5, sock_read=30),
+        )
+    return session
+
+
+async def close_async_client() -> None:
+    """Close the running loop's session and its pooled connections."""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+async def _request(method: str, url: str, headers: dict[str, str] | None) -> _Response:
+    # `encoded=True`: the signature covers the query exactly as botocore wrote it.
+    async with _session().request(method, URL(url, encoded=True), headers=headers) as response:
+        return _Response(response.status, response.headers.copy(), await response.read())
+
+
+async def _send(method: str, key: str, headers: dict[str, str] | None = None) -> _Response:
+    url = get_presigner().presign(
+        method, settings.b2_bucket_name, key, expires_in=_URL_EXPIRY_SECONDS, headers=headers
+    )
+    for attempt in range(_ATTEMPTS - 1):
+        try:
+            response = await _request(method, url, headers)
+            if response.status not in _RETRY_STATUSES:
+                return response
+        except _SEND_ERRORS:
+            pass
+        await anyio.sleep(_RETRY_BASE_SECONDS * 2**attempt)
+    return await _request(method, url, headers)
+
+
+async def get_file_metadata_async(key: str) -> FileMetadata | None:
+    """`get_file_metadata`: a HEAD; None if the object doesn't exist."""
+    response = await _send("HEAD", key)
+    if response.status == 404:
+        return None
+    if response.status != 200:
+        raise client_error(response.status, b"", "HeadObject")
+    headers = response.headers
+    return object_metadata(
+        key,
+        int(headers["Content-Length"]),
+        headers.get("Content-Type"),
+        parsedate_to_datetime(headers["Last-Modified"]),
+    )
+
+
+async def delete_file_async(key: str) -> None:
+    """`delete_file`. Raises RuntimeError on failure."""
+    try:
+        response = await _send("DELETE", key)
+    except _SEND_ERRORS as e:
+        raise RuntimeError(f"B2 delete failed for '{key}': {e!r}") from e
+    if response.status >= 300:
+        error = client_error(response.status, response.body, "DeleteObject")
+        raise RuntimeError(f"B2 delete failed for '{key}': {error}")
+    # The deleted object must disappear from listings/stats, without a rescan.
+    await anyio.to_thread.run_sync(_apply_to_list_cache, Delta({}, frozenset({key})))
+
+
+async def get_object_head_bytes_async(key: str, length: int) -> bytes | None:
+    """`get_object_head_bytes`: the first `length` bytes by a Range GET; None
+    if the object is missing. Raises RuntimeError on other failures."""
+    byte_range = f"bytes=0-{max(length - 1, 0)}"
+    try:
+        response = await _send("GET", key, headers={"Range": byte_range})
+    except _SEND_ERRORS as e:
+        raise RuntimeError(f"B2 range-get failed for '{key}': {e!r}") from e
+    if response.status == 404:
+        return None
+    if response.status >= 300:
+        error = client_error(response.status, response.body, "GetObject")
+        raise RuntimeError(f"B2 range-get failed for '{key}': {error}")
+    return response.body
+
+
+async def add_to_listing_async(metadata: FileMetadata) -> None:
+    """`add_to_listing`, in a worker thread."""
+    await anyio.to_thread.run_sync(add_to_listing, metadata)
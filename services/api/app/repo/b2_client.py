@@ -11,9 +11,9 @@ from botocore.config import Config
 from botocore.exceptions import ClientError
 
 from app.config import settings
-from app.repo.list_cache import cached_listing
-from app.repo.list_cache import invalidate as _invalidate_list_cache
-from app.repo.list_cache import prewarm as _prewarm_list_cache
+from app.repo.list_builder import Delta
+from app.repo.list_cache import apply as _apply_to_list_cache
+from app.repo.list_snapshot import epoch_ms
 from app.types import FileMetadata
 from app.types.formatting import humanize_bytes
 
@@ -49,6 +49,8 @@ def get_s3_client():
             connect_timeout=5,
             read_timeout=30,
             retries={"mode": "standard", "total_max_attempts": 3},
+            # Room for every concurrent range of a partitioned scan (b2_scan).
+            max_pool_connections=max(10, settings.list_scan_partitions),
             signature_version="s3v4",
             user_agent_extra="b2ai-oss-start",
         ),
@@ -93,9 +95,11 @@ def upload_file(
         )
     except ClientError as e:
         raise RuntimeError(f"B2 upload failed for '{key}': {e}") from e
-    _invalidate_list_cache()  # new object must show up in listings/stats now
     folder, filename = _split_key(key)
     size = len(file_data)
+    uploaded_at = datetime.now(UTC)
+    # The new object must show up in listings/stats now, without a rescan.
+    _apply_to_list_cache(Delta({key: (size, epoch_ms(uploaded_at))}, frozenset()))
     return FileMetadata(
         key=key,
         filename=filename,
@@ -103,75 +107,11 @@ def upload_file(
         size_bytes=size,
         size_human=humanize_bytes(size),
         content_type=content_type,
-        uploaded_at=datetime.now(UTC),
+        uploaded_at=uploaded_at,
         url=_public_url(key),
     )
 
 
-def _list_all_objects(prefix: str = "") -> list[dict]:
-    """Every object under `prefix`, via the shared single-flight listing cache.
-
-    The returned list is shared and cached — callers must treat it as read-only
-    (never sort/mutate in place). Raises RuntimeError on S3 failure.
-    """
-    return cached_listing(prefix, _fetch_all_objects)
-
-
-def prewarm_listing() -> None:
-    """Kick off the full-bucket scan in the background (startup warm-up).
-
-    Returns immediately. Without it the first user to open the dashboard or the
-    file browser waits out the cold scan (8-20s on a 16k-object bucket).
-    """
-    _prewarm_list_cache("", _fetch_all_objects)
-
-
-def _fetch_all_objects(prefix: str) -> list[dict]:
-    """Paginate B2 for every object under `prefix`. Raises RuntimeError on failure."""
-    client = get_s3_client()
-    contents: list[dict] = []
-    kwargs: dict = {
-        "Bucket": settings.b2_bucket_name,
-        "Prefix": prefix,
-        "MaxKeys": 1000,
-    }
-    try:
-        while True:
-            response = client.list_objects_v2(**kwargs)
-            contents.extend(response.get("Contents", []))
-            if not response.get("IsTruncated"):
-                break
-            kwargs["ContinuationToken"] = response["NextContinuationToken"]
-    except ClientError as e:
-        raise RuntimeError(f"B2 list failed: {e}") from e
-    return contents
-
-
-def list_files(prefix: str = "") -> list[FileMetadata]:
-    """List all files under `prefix`.
-
-    Paginates the whole prefix so callers see every object, not just the first
-    1000. Order is unspecified — callers that need newest-first sort themselves
-    (see `service.files.get_files`). Raises RuntimeError on S3 failure.
-    """
-    files: list[FileMetadata] = []
-    for obj in _list_all_objects(prefix):
-        folder, filename = _split_key(obj["Key"])
-        files.append(
-            FileMetadata(
-                key=obj["Key"],
-                filename=filename,
-                folder=folder,
-                size_bytes=obj["Size"],
-                size_human=humanize_bytes(obj["Size"]),
-                content_type=_guess_content_type(obj["Key"]),
-                uploaded_at=obj["LastModified"],
-                url=_public_url(obj["Key"]),
-            )
-        )
-    return files
-
-
 def get_file_metadata(key: str) -> FileMetadata | None:
     client = get_s3_client()
     try:
@@ -185,15 +125,25 @@ def get_file_metadata(key: str) -> FileMetadata | None:
             return None
         raise
 
+    return object_metadata(
+        key, response["ContentLength"], response.get("ContentType"), response["LastModified"]
+    )
+
+
+def object_metadata(
+    key: str, size: int, content_type: str | None, uploaded_at: datetime
+) -> FileMetadata:
+    """`FileMetadata` from a HEAD's fields (the type guessed from the key if
+    the object has none)."""
     folder, filename = _split_key(key)
     return FileMetadata(
         key=key,
         filename=filename,
         folder=folder,
-        size_bytes=response["ContentLength"],
-        size_human=humanize_bytes(response["ContentLength"]),
-        content_type=response.get("ContentType", _guess_content_type(key)),
-        uploaded_at=response["LastModified"],
+        size_bytes=size,
+        size_human=humanize_bytes(size),
+        content_type=content_type or _guess_content_type(key),
+        uploaded_at=uploaded_at,
         url=_public_url(key),
     )
 
@@ -205,65 +155,6 @@ def delete_file(key: str) -> None:
         client.delete_object(Bucket=settings.b2_bucket_name, Key=key)
     except ClientError as e:
         raise RuntimeError(f"B2 delete failed for '{key}': {e}") from e
-    _invalidate_list_cache()  # deleted object must disappear from listings/stats
-
-
-DISPOSITIONS = ("attachment", "inline")
+    # The deleted object must disappear from listings/stats, without a rescan.
+    _apply_to_list_cache(Delta({}, frozenset({key})))
 
-
-def get_presigned_url(
-    key: str,
-    filename: str | None = None,
-    expires_in: int = 600,
-    disposition: str = "attachment",
-) -> str:
-    """Generate a presigned GET URL. Raises RuntimeError on S3 failure.
-
-    `disposition` selects the `Content-Disposition` the signed response will
-    carry. "attachment" (the default) makes browsers save the file; "inline"
-    lets them render it in place, which the preview modal needs — an
-    `attachment` response makes an `<iframe>` PDF preview impossible because
-    the browser starts a download instead of painting the document.
-    Raises ValueError for any other value.
-    """
-    if disposition not in DISPOSITIONS:
-        raise ValueError(
-            f"disposition must be one of {DISPOSITIONS}, got {disposition!r}"
-        )
-    client = get_s3_client()
-    params: dict = {"Bucket": settings.b2_bucket_name, "Key": key}
-    if filename:
-        # RFC 5987 encoding for non-ASCII filenames
-        encoded = quote(filename, safe="")
-        params["ResponseContentDisposition"] = (
-            f"{disposition}; filename=\"{encoded}\"; filename*=UTF-8''{encoded}"
-        )
-    else:
-        params["ResponseContentDisposition"] = disposition
-    try:
-        return client.generate_presigned_url(
-            "get_object",
-            Params=params,
-            ExpiresIn=expires_in,
-        )
-    except ClientError as e:
-        raise RuntimeError(f"B2 presign failed for '{key}': {e}") from e
-
-
-def get_upload_stats() -> dict:
-    """Aggregate stats across every object in the bucket.
-
-    Raises RuntimeError on S3 failure.
-    """
-    contents = _list_all_objects()
-    total_size = sum(obj["Size"] for obj in contents)
-    today = datetime.now(UTC).date()
-    uploads_today = sum(
-        1 for obj in contents if obj["LastModified"].date() == today
-    )
-    return {
-        "total_files": len(contents),
-        "total_size_bytes": total_size,
-        "total_size_human": humanize_bytes(total_size),
-        "uploads_today": uploads_today,
-    }
@@ -0,0 +1,293 @@
+"""Bucket listings: the cached full scan, and the reads served from it.
+
+Split out of `b2_client` to keep that module under the 300-line ceiling. Same
+`repo` layer, so boto3/botocore usage is allowed here too; the cached S3 client
+is reused from `b2_client`.
+"""
+
+import logging
+from bisect import bisect_right
+from contextlib import nullcontext
+from contextvars import ContextVar
+from datetime import UTC, date, datetime
+from itertools import islice
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from app.config import settings
+from app.repo import list_checkpoint, list_progress
+from app.repo.b2_client import get_s3_client
+from app.repo.b2_raw_list import RawListClient
+from app.repo.b2_scan import scan_listing
+from app.repo.list_builder import patch_snapshot, snapshot_from_objects
+from app.repo.list_cache import cached_listing, version_of
+from app.repo.list_cache import peek as _peek_list_cache
+from app.repo.list_cache import prewarm as _prewarm_list_cache
+from app.repo.list_children import children, page_marker, start_after
+from app.repo.list_index import order_index, ordered, page
+from app.repo.list_rows import FileRows
+from app.repo.list_search import search, search_index
+from app.repo.list_snapshot import ListingSnapshot
+from app.repo.list_stats import listing_stats
+from app.repo.list_tree import FolderTree, folder_tree
+from app.types import FileMetadata, FileSort
+from app.types.formatting import humanize_bytes
+
+logger = logging.getLogger(__name__)
+
+# The listing the current request last read, for `listing_progress()`. Each
+# sync handler runs in its own copied context, so this never leaks between
+# requests — and every read sets it, so it is never stale within one.
+_last_listing: ContextVar[ListingSnapshot | None] = ContextVar("last_listing", default=None)
+
+
+def _list_all_objects(prefix: str = "", progressive: bool = False) -> ListingSnapshot:
+    """Every object under `prefix`, via the shared single-flight listing cache.
+
+    The returned snapshot is shared and cached (and immutable). `progressive`
+    (when `settings.list_progressive` allows it) may return a partial snapshot
+    rather than block on a cold scan. Raises RuntimeError on S3 failure.
+    """
+    progressive = progressive and settings.list_progressive
+    snapshot = cached_listing(prefix, _fetch_all_objects, progressive=progressive)
+    _last_listing.set(snapshot)
+    return snapshot
+
+
+def listing_progress() -> int | None:
+    """None if the listing this request read was complete; else how many
+    objects the cold scan it was cut from had seen."""
+    snapshot = _last_listing.get()
+    if snapshot is None or snapshot.complete:
+        return None
+    return len(snapshot.origin[0])
+
+
+def listing_version(prefix: str = "", wait: bool = True) -> str | None:
+    """An opaque token naming the listing a read of `prefix` sees right now —
+    the same across workers sharing a snapshot, different after any rescan or
+    write. None while that listing is partial (a cold scan in progress). Without
+    `wait`, also None at once when nothing is cached, rather than after waiting
+    for the scan's first page (for reads that need no scan: `list_files_after`)."""
+    if not wait and _peek_list_cache("") is None:
+        return None
+    return version_of(_list_all_objects(prefix, progressive=True))
+
+
+def prewarm_listing() -> None:
+    """Kick off the full-bucket scan in the background (startup warm-up).
+
+    Returns immediately. Without it the first user to open the dashboard or the
+    file browser waits out the cold scan (8-20s on a 16k-object bucket).
+    """
+    _prewarm_list_cache("", _fetch_all_objects)
+
+
+def _fetch_all_objects(prefix: str) -> ListingSnapshot:
+    """Every object under `prefix`, sorted by key. Raises RuntimeError on failure.
+
+    The root scan (the one the listing cache stores) is split into
+    `settings.list_scan_partitions` key ranges listed concurrently, bounded by
+    the previous snapshot's key quantiles; see `b2_scan`. Prefix scans stay
+    sequential — they are uncached, so there is nothing to learn ranges from.
+    """
+    partitions = settings.list_scan_partitions if prefix == "" else 1
+    client = get_s3_client()
+    if settings.list_raw_parser:
+        client = RawListClient(client)
+    previous = _peek_list_cache(prefix)
+    # Only a root scan feeds progressive readers or is resumable; prefix scans
+    # are never shared.
+    tracking = list_progress.tracking() if prefix == "" else nullcontext()
+    checkpoint = (
+        list_checkpoint.begin(settings.list_resume_max_age_seconds) if prefix == "" else None
+    )
+    if checkpoint is not None and checkpoint.resumed_objects:
+        logger.info("Resuming the listing scan with %d objects from a failed one",
+                    checkpoint.resumed_objects)
+    try:
+        with tracking as on_page:
+            contents = scan_listing(
+                client,
+                settings.b2_bucket_name,
+                prefix,
+                partitions,
+                previous=previous.keys() if previous else None,
+                on_page=on_page,
+                checkpoint=checkpoint,
+            )
+    except (BotoCoreError, ClientError) as e:
+        raise RuntimeError(f"B2 list failed: {e}") from e
+    # Columnar from here on: the page dicts are dropped as soon as this returns.
+    snapshot = snapshot_from_objects(contents)
+    if checkpoint is not None:
+        list_checkpoint.finish(checkpoint)
+        # Pages kept from before a failure predate the writes made since.
+        for delta in list(checkpoint.deltas):
+            snapshot = patch_snapshot(snapshot, delta)
+    if prefix == "":
+        # Build the default `/files` order, the stats and the folder tree here,
+        # in the scan (usually the refresh thread), rather than in the first
+        # request. The search index (~11s per 1M objects) only once the bucket
+        # is being searched — the snapshot this one replaces has one — so a
+        # cold read never waits on it and a rescan's first search doesn't either.
+        order_index(snapshot, "uploaded_at")
+        listing_stats(snapshot)
+        folder_tree(snapshot)
+        if previous is not None and previous.memoized("search") is not None:
+            search_index(snapshot)
+    return snapshot
+
+
+def list_files(prefix: str = "") -> list[FileMetadata]:
+    """List all files under `prefix`.
+
+    Covers the whole prefix so callers see every object, not just the first
+    1000 — sliced from the cached root snapshot when one exists, else a full
+    paginated scan of the prefix. Ordered by key; callers that want the first
+    few by another order use `list_files_sorted`. Raises RuntimeError on S3
+    failure.
+    """
+    return list(FileRows(_list_all_objects(prefix)))
+
+
+def list_files_sorted(prefix: str, limit: int, sort: FileSort, descending: bool) -> FileRows:
+    """The first `limit` files under `prefix` ordered by `sort` — of those
+    seen so far, while a cold scan runs (see `listing_progress`).
+
+    Served from the snapshot's precomputed order index (`list_index`): only the
+    returned rows are materialized, so a warm call is O(limit) however large
+    the bucket. Ties keep key order (reversed when descending). Raises
+    RuntimeError on S3 failure.
+    """
+    snapshot = _list_all_objects(prefix, progressive=True)
+    return FileRows(snapshot, islice(ordered(snapshot, sort, descending), limit))
+
+
+def list_files_page(
+    prefix: str, limit: int, sort: FileSort, descending: bool, start: int = 0
+) -> tuple[FileRows, int | None, str | None]:
+    """One page of `list_files_sorted`'s order: up to `limit` files from walk
+    position `start` (0 for the first page).
+
+    Returns the files, the position the next page starts at (None after the
+    last), and the `listing_version` they were read from — a position is only
+    meaningful against that same version. O(limit) per page on a warm cache.
+    Raises RuntimeError on S3 failure.
+    """
+    snapshot = _list_all_objects(prefix, progressive=True)
+    rows, next_start = page(snapshot, sort, descending, start, limit)
+    return FileRows(snapshot, rows), next_start, version_of(snapshot)
+
+
+def list_files_after(prefix: str, limit: int, after: str | None) -> tuple[FileRows, str | None]:
+    """Up to `limit` files under `prefix` in key order, after key `after` (from
+    the first without one); and the key to pass as `after` for the rest, None
+    after the last.
+
+    Key order is S3's own, so with no root snapshot cached this is one
+    `MaxKeys=limit` request rather than the whole scan (started in the
+    background for next time); from the snapshot, it is a bisect. Raises
+    RuntimeError on S3 failure.
+    """
+    if _peek_list_cache("") is not None:
+        snapshot = _list_all_objects(prefix)  # cached: never waits on a scan
+        start = bisect_right(snapshot.keys(), after) if after is not None else 0
+        end = min(start + limit, len(snapshot))
+        more = end < len(snapshot)
+        return FileRows(snapshot, range(start, end)), snapshot.key(end - 1) if more else None
+    _prewarm_list_cache("", _fetch_all_objects)
+    params = {"Bucket": settings.b2_bucket_name, "Prefix": prefix, "MaxKeys": limit}
+    if after is not None:
+        params["StartAfter"] = after
+    try:
+        response = get_s3_client().list_objects_v2(**params)
+    except (BotoCoreError, ClientError) as e:
+        raise RuntimeError(f"B2 list failed: {e}") from e
+    snapshot = snapshot_from_objects(response.get("Contents", []))
+    more = response.get("IsTruncated", False) and len(snapshot) > 0
+    return FileRows(snapshot), snapshot.key(len(snapshot) - 1) if more else None
+
+
+def search_files(query: str, limit: int) -> FileRows:
+    """Up to `limit` files whose key matches `query` (case-insensitive
+    substring), best match first — see `list_search` for the ranking.
+
+    Answered from the root snapshot's search index, so a warm call touches
+    only matching posting lists and the returned rows. Waits out a cold scan
+    rather than searching part of the bucket. Raises RuntimeError on S3
+    failure.
+    """
+    snapshot = _list_all_objects()
+    return FileRows(snapshot, search(snapshot, query, limit))
+
+
+def listed(keys: list[str]) -> list[bool] | None:
+    """Whether each of `keys` is in the cached root listing (a bisect each), or
+    None when nothing is cached. Never scans; lags changes made outside the app."""
+    snapshot = _peek_list_cache("")
+    return None if snapshot is None else [key in snapshot for key in keys]
+
+
+def list_children(
+    folder: str, after: str | None, limit: int
+) -> tuple[list[str], list[FileMetadata], str | None]:
+    """Up to `limit` immediate children of `folder`: its subfolders, the files
+    directly in it, and the marker to pass as `after` for the next page (None
+    after the last).
+
+    From the cached root snapshot when there is one (`list_children`, a bisect
+    per subfolder); otherwise one `Delimiter="/"` request to B2 for just this
+    level, while the full scan is started in the background for next time.
+    Raises RuntimeError on S3 failure.
+    """
+    if _peek_list_cache("") is not None:
+        snapshot = _list_all_objects()  # cached: never waits on a scan
+        page = children(snapshot, folder, after, limit)
+        return page.folders, list(FileRows(snapshot, page.rows)), page.after
+    _prewarm_list_cache("", _fetch_all_objects)
+    params = {"Bucket": settings.b2_bucket_name, "Prefix": folder, "Delimiter": "/",
+              "MaxKeys": limit}
+    if after is not None:
+        params["StartAfter"] = start_after(folder, after)
+    try:
+        response = get_s3_client().list_objects_v2(**params)
+    except (BotoCoreError, ClientError) as e:
+        raise RuntimeError(f"B2 list failed: {e}") from e
+    folders = [p["Prefix"] for p in response.get("CommonPrefixes", [])]
+    objects = [o for o in response.get("Contents", []) if o["Key"] != folder]
+    return folders, list(FileRows(snapshot_from_objects(objects))), page_marker(response)
+
+
+def get_upload_stats() -> dict:
+    """Aggregate stats across every object in the bucket.
+
+    Read from the snapshot's per-generation aggregate (`list_stats`), not by
+    summing the bucket per call. `complete` is False while a cold scan is still
+    running and these are the objects it has seen so far. Raises RuntimeError
+    on S3 failure.
+    """
+    snapshot = _list_all_objects(progressive=True)
+    stats = listing_stats(snapshot)
+    return {
+        "total_files": stats.total_files,
+        "total_size_bytes": stats.total_size_bytes,
+        "total_size_human": humanize_bytes(stats.total_size_bytes),
+        "uploads_today": stats.uploads_by_day.get(datetime.now(UTC).date(), 0),
+        "files_by_content_type": stats.files_by_content_type,
+        "complete": snapshot.complete,
+    }
+
+
+def get_daily_uploads() -> dict[date, int]:
+    """Objects per UTC day of LastModified, across the bucket (days with
+    none are absent; partial during a cold scan, see `listing_progress`).
+    Shared — treat as read-only. Raises RuntimeError on S3 failure."""
+    return listing_stats(_list_all_objects(progressive=True)).uploads_by_day
+
+
+def get_folder_tree() -> FolderTree:
+    """Per-folder totals across the bucket (partial during a cold scan, see
+    `listing_progress`). Shared — treat as read-only. Raises RuntimeError on
+    S3 failure."""
+    return folder_tree(_list_all_objects(progressive=True))
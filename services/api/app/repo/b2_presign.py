@@ -0,0 +1,207 @@
+"""SigV4 query-string presigning without botocore's request pipeline.
+
+`generate_presigned_url` builds an operation model, serializes a request,
+runs the event hooks and derives the SigV4 signing key — four HMACs — on every
+call, and the file browser presigns on each preview and download. This signs
+the same URL directly: the signing key is derived once per UTC day, region
+and service, and the query string is formatted in place, leaving one SHA-256
+and one HMAC per URL. It does no I/O and takes no lock, so it can run on the
+event loop.
+
+The URLs are byte-identical to botocore's for the operations the app presigns
+(GET/HEAD/DELETE/PUT on an object, path-style, no session token), which
+tests/test_presign.py checks against botocore itself. Endpoint, region and
+credentials come from `get_s3_client`, so both sign as the same principal.
+"""
+
+import functools
+import hashlib
+import hmac
+from collections.abc import Mapping
+from datetime import UTC, datetime
+from urllib.parse import quote, urlsplit
+
+from app.config import settings
+from app.repo.b2_client import get_s3_client
+
+_ALGORITHM = "AWS4-HMAC-SHA256"
+_SERVICE = "s3"
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+# SigV4's ceiling on X-Amz-Expires (7 days).
+_MAX_EXPIRES = 7 * 24 * 3600
+
+
+def _encode(value: str) -> str:
+    """botocore's `percent_encode`: RFC 3986 unreserved characters only."""
+    return quote(value, safe="-_.~")
+
+
+@functools.lru_cache(maxsize=16)
+def _signing_key(secret_key: str, date: str, region: str, service: str) -> bytes:
+    key = f"AWS4{secret_key}".encode()
+    for part in (date, region, service, "aws4_request"):
+        key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+    return key
+
+
+class Presigner:
+    """Presigns object requests for one endpoint, region and key pair."""
+
+    def __init__(self, endpoint_url: str, region: str, access_key: str, secret_key: str):
+        parts = urlsplit(endpoint_url)
+        # The Host header as botocore derives it: lowercase, default port dropped.
+        host = parts.hostname or ""
+        if parts.port is not None and parts.port != _DEFAULT_PORTS.get(parts.scheme):
+            host = f"{host}:{parts.port}"
+        self._origin = f"{parts.scheme}://{parts.netloc}"
+        self._host = host
+        self._region = region
+        self._access_key = access_key
+        self._secret_key = secret_key
+
+    def presign(
+        self,
+        method: str,
+        bucket: str,
+        key: str,
+        *,
+        expires_in: int,
+        query: Mapping[str, str] | None = None,
+        headers: Mapping[str, str] | None = None,
+        now: datetime | None = None,
+    ) -> str:
+        """A presigned URL for `method` on `bucket`/`key`.
+
+        `query` holds the operation's own parameters (e.g.
+        `response-content-disposition`), in the order botocore would
+        serialize them. `headers` are signed, so the request must send them
+        with exactly these values (e.g. Content-Type, Content-Length, Range).
+        """
+        timestamp = (now or datetime.now(UTC)).strftime("%Y%m%dT%H%M%SZ")
+        date = timestamp[:8]
+        scope = f"{date}/{self._region}/{_SERVICE}/aws4_request"
+        signed = {"host": self._host}
+        for name, value in (headers or {}).items():
+            signed[name.lower()] = " ".join(value.split())
+        names = sorted(signed)
+        signed_headers = ";".join(names)
+
+        pairs = [(_encode(k), _encode(v)) for k, v in (query or {}).items()]
+        pairs += [
+            ("X-Amz-Algorithm", _ALGORITHM),
+            ("X-Amz-Credential", _encode(f"{self._access_key}/{scope}")),
+            ("X-Amz-Date", timestamp),
+            ("X-Amz-Expires", str(expires_in)),
+            ("X-Amz-SignedHeaders", _encode(signed_headers)),
+        ]
+        path = f"/{_encode(bucket)}/{quote(key, safe='/~')}"
+        canonical_request = "\n".join((
+            method,
+            path,
+            "&".join(f"{k}={v}" for k, v in sorted(pairs)),
+            "".join(f"{name}:{signed[name]}\n" for name in names),
+            signed_headers,
+            "UNSIGNED-PAYLOAD",
+        ))
+        string_to_sign = "\n".join((
+            _ALGORITHM,
+            timestamp,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ))
+        signature = hmac.new(
+            _signing_key(self._secret_key, date, self._region, _SERVICE),
+            string_to_sign.encode(),
+            hashlib.sha256,
+        ).hexdigest()
+        query_string = "&".join(f"{k}={v}" for k, v in pairs)
+        return f"{self._origin}{path}?{query_string}&X-Amz-Signature={signature}"
+
+
+@functools.lru_cache(maxsize=1)
+def get_presigner() -> Presigner:
+    """The process's presigner, signing as `get_s3_client` does (its endpoint
+    and resolved region; botocore falls back to us-east-1 when none is set)."""
+    client = get_s3_client()
+    return Presigner(
+        client.meta.endpoint_url,
+        client.meta.region_name,
+        settings.b2_key_id,
+        settings.b2_application_key,
+    )
+
+
+DISPOSITIONS = ("attachment", "inline")
+
+
+def get_presigned_url(
+    key: str,
+    filename: str | None = None,
+    expires_in: int = 600,
+    disposition: str = "attachment",
+) -> str:
+    """Generate a presigned GET URL (signed locally; no B2 call).
+
+    `disposition` selects the `Content-Disposition` the signed response will
+    carry. "attachment" (the default) makes browsers save the file; "inline"
+    lets them render it in place, which the preview modal needs — an
+    `attachment` response makes an `<iframe>` PDF preview impossible because
+    the browser starts a download instead of painting the document.
+    Raises ValueError for any other value.
+
+    With `PRESIGN_TIME_BUCKET_SECONDS` set, repeat calls within one bucket
+    return the same cached, cacheable URL (`_bucketed_url`).
+    """
+    if disposition not in DISPOSITIONS:
+        raise ValueError(
+            f"disposition must be one of {DISPOSITIONS}, got {disposition!r}"
+        )
+    if filename:
+        # RFC 5987 encoding for non-ASCII filenames
+        encoded = quote(filename, safe="")
+        content_disposition = (
+            f"{disposition}; filename=\"{encoded}\"; filename*=UTF-8''{encoded}"
+        )
+    else:
+        content_disposition = disposition
+    bucket_seconds = min(settings.presign_time_bucket_seconds, _MAX_EXPIRES - expires_in)
+    if bucket_seconds > 0:
+        now = int(datetime.now(UTC).timestamp())
+        return _bucketed_url(
+            key, content_disposition, expires_in, bucket_seconds, now - now % bucket_seconds
+        )
+    return get_presigner().presign(
+        "GET",
+        settings.b2_bucket_name,
+        key,
+        expires_in=expires_in,
+        query={"response-content-disposition": content_disposition},
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def _bucketed_url(
+    key: str, content_disposition: str, expires_in: int, bucket_seconds: int, signed_at: int
+) -> str:
+    """A GET URL signed as of `signed_at`, the start of its time bucket.
+
+    Every request in the bucket gets these same bytes, so a browser or CDN
+    cache keyed on the URL hits. The URL is valid for the bucket plus
+    `expires_in`, so one handed out at the bucket's end still has the full
+    expiry left. Its `max-age` is `expires_in` alone — what is left of the
+    URL's life at the bucket's end, in the worst case — so a body fetched
+    late in the bucket isn't cached past the URL's expiry. The clamp in
+    `get_presigned_url` keeps the bucket short enough that this stays the full
+    `expires_in`.
+    """
+    return get_presigner().presign(
+        "GET",
+        settings.b2_bucket_name,
+        key,
+        expires_in=expires_in + bucket_seconds,
+        query={
+            "response-content-disposition": content_disposition,
+            "response-cache-control": f"max-age={expires_in}",
+        },
+        now=datetime.fromtimestamp(signed_at, UTC),
+    )
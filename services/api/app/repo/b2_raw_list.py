@@ -0,0 +1,211 @@
+"""ListObjectsV2 without botocore's response parser (`LIST_RAW_PARSER`).
+
+botocore turns each 1000-key page into dicts through its generic, shape-driven
+XML parser: a timezone-aware datetime per LastModified, plus the ETag,
+StorageClass and Owner fields the listing never reads. That is most of a
+scan's CPU — ~130ms a page, against the ~15ms of streaming the same page
+through expat and keeping only Key, Size and LastModified (as epoch ms,
+which is what the snapshot stores). `benchmarks/bench_list_parse.py`
+compares the two on recorded pages.
+
+`RawListClient` stands in for the boto3 client in `b2_scan`: the request is
+still signed by botocore (a presigned GET, so credentials and SigV4 stay in
+one place) but sent over a pooled urllib3 connection and parsed here as it
+streams in. It returns the subset of the botocore response shape the scan
+reads, with `LastModified` as an int (`snapshot_from_objects` takes both),
+and raises botocore's ClientError for an S3 error response and a
+BotoCoreError for a transport failure, so callers handle failures the same
+either way.
+"""
+
+from __future__ import annotations
+
+import calendar
+from collections.abc import Iterable
+from datetime import datetime
+from functools import lru_cache
+from urllib.parse import unquote_plus
+from xml.parsers import expat
+
+import urllib3
+from botocore.exceptions import ClientError, HTTPClientError
+
+from app.config import settings
+from app.repo.list_snapshot import epoch_ms
+
+_CHUNK = 64 * 1024
+# The presigned URL is used at once; this only has to outlast clock skew.
+_URL_EXPIRY_SECONDS = 300
+# Elements whose text is kept (Code/Message: an S3 <Error> body); the rest —
+# ETag, StorageClass, Owner, ... — is skipped unread.
+_TEXT_FIELDS = frozenset(
+    (
+        "Key", "Size", "LastModified", "Prefix", "IsTruncated", "NextContinuationToken",
+        "EncodingType", "Code", "Message",
+    )
+)
+
+
+@lru_cache(maxsize=1)
+def _pool() -> urllib3.PoolManager:
+    # Timeouts and pool size as `get_s3_client`; urllib3 retries the 5xx
+    # responses botocore's standard mode would. Once they run out, the last
+    # 5xx is returned rather than raised, so it becomes a ClientError below.
+    return urllib3.PoolManager(
+        maxsize=max(10, settings.list_scan_partitions),
+        timeout=urllib3.Timeout(connect=5, read=30),
+        retries=urllib3.Retry(
+            total=2,
+            backoff_factor=0.2,
+            status_forcelist=(500, 502, 503, 504),
+            raise_on_status=False,
+        ),
+    )
+
+
+@lru_cache(maxsize=4096)
+def _day_ms(date: str) -> int:
+    return calendar.timegm((int(date[:4]), int(date[5:7]), int(date[8:10]), 0, 0, 0)) * 1000
+
+
+def parse_last_modified(text: str) -> int:
+    """S3's `2026-03-04T12:34:56.789Z` as epoch ms, equal to botocore's
+    datetime through `epoch_ms`."""
+    if len(text) == 24 and text[19] == "." and text[23] == "Z":
+        return (
+            _day_ms(text[:10])
+            + int(text[11:13]) * 3_600_000
+            + int(text[14:16]) * 60_000
+            + int(text[17:19]) * 1000
+            + int(text[20:23])
+        )
+    return epoch_ms(datetime.fromisoformat(text.replace("Z", "+00:00")))
+
+
+class _Page:
+    """expat handlers collecting one ListBucketResult (or S3 Error) body."""
+
+    def __init__(self) -> None:
+        self.contents: list[dict] = []
+        self.prefixes: list[dict] = []
+        self.fields: dict[str, str] = {}
+        self._object: dict = {}
+        self._text: list[str] | None = None
+        self._in_prefixes = False
+
+    def start(self, name: str, _attrs) -> None:
+        if name in _TEXT_FIELDS:
+            self._text = []
+        elif name == "CommonPrefixes":
+            self._in_prefixes = True
+
+    def data(self, text: str) -> None:
+        if self._text is not None:
+            self._text.append(text)
+
+    def end(self, name: str) -> None:
+        if name == "Contents":
+            self.contents.append(self._object)
+            self._object = {}
+            return
+        if name == "CommonPrefixes":
+            self._in_prefixes = False
+            return
+        if self._text is None:
+            return
+        text = "".join(self._text)
+        self._text = None
+        if name == "Key":
+            self._object["Key"] = text
+        elif name == "Size":
+            self._object["Size"] = int(text)
+        elif name == "LastModified":
+            self._object["LastModified"] = parse_last_modified(text)
+        elif name == "Prefix" and self._in_prefixes:
+            self.prefixes.append({"Prefix": text})
+        else:
+            self.fields[name] = text
+
+
+def _parse(chunks: Iterable[bytes]) -> _Page:
+    page = _Page()
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    parser.StartElementHandler = page.start
+    parser.CharacterDataHandler = page.data
+    parser.EndElementHandler = page.end
+    for chunk in chunks:
+        parser.Parse(chunk, False)
+    parser.Parse(b"", True)
+    return page
+
+
+def parse_list_page(chunks: Iterable[bytes]) -> dict:
+    """A ListObjectsV2 response body, fed as it arrives, as the parts of
+    botocore's response `b2_scan` reads: `Contents` (Key, Size, LastModified
+    as epoch ms), `CommonPrefixes`, `IsTruncated`, `NextContinuationToken`.
+
+    botocore adds `EncodingType=url` to every ListObjectsV2 request, presigned
+    ones included, and decodes the keys and prefixes in an after-call handler
+    rather than in its parser; they are decoded here the same way. The
+    continuation token is opaque and passed back as sent.
+    """
+    page = _parse(chunks)
+    if page.fields.get("EncodingType") == "url":
+        for obj in page.contents:
+            obj["Key"] = unquote_plus(obj["Key"])
+        for folder in page.prefixes:
+            folder["Prefix"] = unquote_plus(folder["Prefix"])
+    response: dict = {"IsTruncated": page.fields.get("IsTruncated") == "true"}
+    if page.contents:
+        response["Contents"] = page.contents
+    if page.prefixes:
+        response["CommonPrefixes"] = page.prefixes
+    if "NextContinuationToken" in page.fields:
+        response["NextContinuationToken"] = page.fields["NextContinuationToken"]
+    return response
+
+
+def client_error(status: int, body: bytes, operation: str) -> ClientError:
+    """botocore's ClientError for an S3 error response (`body` may be empty,
+    as for a HEAD: the code is then the status, e.g. "404")."""
+    error = _parse([body]).fields if body else {}
+    return ClientError(
+        {
+            "Error": {
+                "Code": error.get("Code", str(status)),
+                "Message": error.get("Message", ""),
+            },
+            "ResponseMetadata": {"HTTPStatusCode": status},
+        },
+        operation,
+    )
+
+
+class RawListClient:
+    """`list_objects_v2` for `b2_scan`, signed by `client` and parsed here.
+
+    Only `list_objects_v2` is provided; everything else stays on the boto3
+    client. `http` defaults to one process-wide pool, sized like the client's.
+    """
+
+    def __init__(self, client, http: urllib3.PoolManager | None = None):
+        self._client = client
+        self._http = http or _pool()
+
+    def list_objects_v2(self, **params) -> dict:
+        url = self._client.generate_presigned_url(
+            "list_objects_v2", Params=params, ExpiresIn=_URL_EXPIRY_SECONDS
+        )
+        try:
+            response = self._http.request("GET", url, preload_content=False)
+            try:
+                if response.status != 200:
+                    raise client_error(response.status, response.read(), "ListObjectsV2")
+                return parse_list_page(response.stream(_CHUNK))
+            finally:
+                response.release_conn()
+        except urllib3.exceptions.HTTPError as e:
+            # Refused connections, timeouts, a body cut off mid-stream: what
+            # botocore would raise as a BotoCoreError, so `b2_scan` retries it.
+            raise HTTPClientError(error=e) from e
@@ -0,0 +1,218 @@
+"""Range-partitioned, concurrent bucket listing.
+
+Split out of `b2_client` to keep that module under the 300-line ceiling. Same
+`repo` layer, so it talks to the boto3 client directly — but it takes the
+client and bucket as arguments, so the benchmark can point it at a local S3
+stand-in (see `benchmarks/bench_parallel_scan.py`).
+
+Why: `list_objects_v2` is strictly sequential within one listing — each page's
+continuation token comes from the previous response — so a 16-page scan is 16
+round trips back to back, and that chain is the 8-20s. Splitting the keyspace
+into ranges breaks it: every range is an independent listing (`StartAfter` its
+lower boundary, stopped once a key passes its upper one), so N ranges keep N
+round trips in flight on a bounded thread pool.
+
+Boundaries are any sorted strings. Range i holds the keys in (b[i-1], b[i]], so
+the ranges tile the keyspace with no gap or overlap whether or not a boundary
+is itself a key, and concatenating the ranges in order yields one sorted
+listing. They come from the previous snapshot's key quantiles when there is
+one (evenly sized ranges), else from one delimiter listing's CommonPrefixes.
+
+Each page is retried on its own (`_PAGE_ATTEMPTS`, backing off) before a range
+gives up, and a scan given a `ScanCheckpoint` records every range's progress
+in it so a failed scan can be resumed rather than restarted (`list_checkpoint`).
+"""
+
+import random
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from itertools import pairwise
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from app.repo.list_checkpoint import RangeProgress, ScanCheckpoint
+
+_PAGE_SIZE = 1000
+# botocore already retries each request a few times within about a second;
+# these attempts wrap that, with longer waits (full jitter, capped), so one bad
+# stretch of a flaky link costs a pause instead of the scan.
+_PAGE_ATTEMPTS = 4
+_BACKOFF_BASE_SECONDS = 0.5
+_BACKOFF_CAP_SECONDS = 8.0
+_RETRYABLE_CODES = frozenset(
+    {"InternalError", "ServiceUnavailable", "SlowDown", "RequestTimeout", "Throttling"}
+)
+
+# Split points tried *inside* a common prefix when the bucket has too few
+# top-level folders to partition on — this app writes everything under
+# `uploads/`, and sanitized upload names start with one of these characters.
+_SPLIT_ALPHABET = "-.0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz"
+
+# Called with each page's objects as it lands (concurrently, from every range of
+# a partitioned scan), for progressive listing (see `list_progress`).
+OnPage = Callable[[list[dict]], None]
+
+
+def _evenly(candidates: Sequence[str], count: int) -> list[str]:
+    """Pick `count` evenly spaced, distinct, sorted items from `candidates`."""
+    if count <= 0 or not candidates:
+        return []
+    if len(candidates) <= count:
+        return sorted(set(candidates))
+    step = len(candidates) / (count + 1)
+    return sorted({candidates[int(step * i)] for i in range(1, count + 1)})
+
+
+def _retryable(error: Exception) -> bool:
+    if isinstance(error, ClientError):
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        return status >= 500 or error.response.get("Error", {}).get("Code") in _RETRYABLE_CODES
+    return True  # BotoCoreError: connection reset, timeout, unparseable response
+
+
+def _list_page(client, kwargs: dict) -> dict:
+    """One `list_objects_v2` call, retried on server-side and transport errors."""
+    backoff = _BACKOFF_BASE_SECONDS
+    for _ in range(_PAGE_ATTEMPTS - 1):
+        try:
+            return client.list_objects_v2(**kwargs)
+        except (BotoCoreError, ClientError) as e:
+            if not _retryable(e):
+                raise
+        time.sleep(random.uniform(0, backoff))
+        backoff = min(_BACKOFF_CAP_SECONDS, backoff * 2)
+    return client.list_objects_v2(**kwargs)
+
+
+def boundaries_from_keys(keys: Sequence[str], partitions: int) -> list[str]:
+    """Quantile split points over a previous snapshot's *sorted* keys."""
+    return _evenly(keys, partitions - 1)
+
+
+def first_scan_boundaries(
+    client, bucket: str, prefix: str, partitions: int
+) -> list[str]:
+    """Split points for a scan with no previous snapshot to learn from.
+
+    One delimiter listing returns the top-level folders (CommonPrefixes). With
+    at least `partitions` of them they are the boundaries; with fewer, each is
+    fanned out on the first character after it, since a single `uploads/`
+    folder would otherwise leave the whole bucket in one range. The ranges are
+    only roughly even — the next scan uses real key quantiles.
+    """
+    response = _list_page(
+        client, {"Bucket": bucket, "Prefix": prefix, "Delimiter": "/", "MaxKeys": _PAGE_SIZE}
+    )
+    folders = sorted(cp["Prefix"] for cp in response.get("CommonPrefixes", []))
+    if len(folders) < partitions:
+        folders = [f + ch for f in (folders or [prefix]) for ch in _SPLIT_ALPHABET]
+    return _evenly(folders, partitions - 1)
+
+
+def list_range(
+    client,
+    bucket: str,
+    prefix: str,
+    start_after: str | None = None,
+    end: str | None = None,
+    on_page: OnPage | None = None,
+    progress: RangeProgress | None = None,
+) -> list[dict]:
+    """Every object under `prefix` with `start_after < Key <= end`, in key order.
+
+    `None` leaves that side open, so `list_range(client, bucket, prefix)` is the
+    plain sequential paginator. Pages are kept in `progress` as they land, and
+    a `progress` from an earlier, failed run is continued from its last page
+    (its pages are passed to `on_page` again first). Propagates botocore's
+    ClientError/BotoCoreError once a page has used up its retries.
+    """
+    progress = progress or RangeProgress()
+    if on_page is not None and progress.contents:
+        on_page(progress.contents)
+    if progress.done:
+        return progress.contents
+    kwargs: dict = {"Bucket": bucket, "Prefix": prefix, "MaxKeys": _PAGE_SIZE}
+    if start_after is not None:
+        kwargs["StartAfter"] = start_after
+    if progress.token is not None:
+        kwargs["ContinuationToken"] = progress.token
+    while True:
+        response = _list_page(client, kwargs)
+        page = response.get("Contents", [])
+        overran = end is not None and page and page[-1]["Key"] > end
+        if overran:
+            # Ran into the next range: keep our tail of this page and stop.
+            page = [obj for obj in page if obj["Key"] <= end]
+        progress.contents.extend(page)
+        if on_page is not None and page:
+            on_page(page)
+        if overran or not response.get("IsTruncated"):
+            progress.done = True
+            return progress.contents
+        progress.token = kwargs["ContinuationToken"] = response["NextContinuationToken"]
+
+
+def scan_partitioned(
+    client,
+    bucket: str,
+    prefix: str,
+    boundaries: Sequence[str],
+    partitions: int,
+    on_page: OnPage | None = None,
+    progress: Sequence[RangeProgress] | None = None,
+) -> list[dict]:
+    """List the ranges between `boundaries` concurrently and merge them.
+
+    At most `partitions` listings are in flight. The ranges are disjoint and
+    ordered, so the merge is a concatenation and the result is sorted by key.
+    `progress`, if given, holds one `RangeProgress` per range (see
+    `list_range`). Propagates the first error any range raises; the other
+    ranges still run to completion, so their progress is kept.
+    """
+    bounds: list[str | None] = [None, *boundaries, None]
+    ranges = list(pairwise(bounds))
+    progress = progress or [RangeProgress() for _ in ranges]
+    if len(ranges) == 1:
+        return list_range(client, bucket, prefix, on_page=on_page, progress=progress[0])
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(partitions, len(ranges))),
+        thread_name_prefix="list-scan",
+    ) as pool:
+        # Not `pool.map`, which cancels the queued ranges on the first error:
+        # every range runs, so a checkpoint keeps as much as it can.
+        futures = [
+            pool.submit(list_range, client, bucket, prefix, start, end, on_page, p)
+            for (start, end), p in zip(ranges, progress, strict=True)
+        ]
+        parts = [future.result() for future in futures]
+    return [obj for part in parts for obj in part]
+
+
+def scan_listing(
+    client,
+    bucket: str,
+    prefix: str,
+    partitions: int,
+    previous: Sequence[str] | None = None,
+    on_page: OnPage | None = None,
+    checkpoint: ScanCheckpoint | None = None,
+) -> list[dict]:
+    """Every object under `prefix`, sorted by key, over `partitions` ranges.
+
+    `previous` is the last snapshot's sorted keys, if any; its quantiles make
+    evenly sized ranges. `partitions <= 1` is the sequential paginator.
+    `on_page` sees every page as it arrives, in no particular order across
+    ranges. Progress is recorded in `checkpoint`; one left by a failed scan is
+    resumed, with its boundaries. Propagates botocore's ClientError/BotoCoreError.
+    """
+    if checkpoint is not None and checkpoint.boundaries is not None:
+        boundaries = checkpoint.boundaries
+    elif partitions <= 1:
+        boundaries = []
+    elif previous and len(previous) >= partitions:
+        boundaries = boundaries_from_keys(previous, partitions)
+    else:
+        boundaries = first_scan_boundaries(client, bucket, prefix, partitions)
+    progress = checkpoint.plan(boundaries) if checkpoint is not None else None
+    return scan_partitioned(client, bucket, prefix, boundaries, partitions, on_page, progress)
@@ -8,7 +8,11 @@ from botocore.exceptions import ClientError
 
 from app.config import settings
 from app.repo.b2_client import get_s3_client
-from app.repo.list_cache import invalidate as _invalidate_list_cache
+from app.repo.b2_presign import get_presigner
+from app.repo.list_builder import Delta
+from app.repo.list_cache import apply as _apply_to_list_cache
+from app.repo.list_snapshot import epoch_ms
+from app.types import FileMetadata
 
 
 def generate_presigned_upload(
@@ -23,22 +27,15 @@ def generate_presigned_upload(
     refuses a body of any other size (``403 SignatureDoesNotMatch``) or type.
     That is how the direct path keeps the size/type enforcement the old proxy
     did in-process — B2's S3 API has no browser POST-policy
-    (``content-length-range``) support. Raises RuntimeError on S3 failure.
+    (``content-length-range``) support. Signed locally; no B2 call.
     """
-    client = get_s3_client()
-    try:
-        return client.generate_presigned_url(
-            "put_object",
-            Params={
-                "Bucket": settings.b2_bucket_name,
-                "Key": key,
-                "ContentType": content_type,
-                "ContentLength": content_length,
-            },
-            ExpiresIn=expires_in,
-        )
-    except ClientError as e:
-        raise RuntimeError(f"B2 presign (PUT) failed for '{key}': {e}") from e
+    return get_presigner().presign(
+        "PUT",
+        settings.b2_bucket_name,
+        key,
+        expires_in=expires_in,
+        headers={"Content-Type": content_type, "Content-Length": str(content_length)},
+    )
 
 
 def get_object_head_bytes(key: str, length: int) -> bytes | None:
@@ -63,12 +60,16 @@ def get_object_head_bytes(key: str, length: int) -> bytes | None:
         raise RuntimeError(f"B2 range-get failed for '{key}': {e}") from e
 
 
-def invalidate_listing() -> None:
-    """Drop the shared listing cache.
+def add_to_listing(metadata: FileMetadata) -> None:
+    """Write a verified direct upload through to the shared listing cache.
 
     The direct-upload path stores the object via the browser, so the app never
-    calls ``upload_file`` and nothing else invalidates the cache — the new
-    object would otherwise not appear in ``/files`` or ``/files/stats`` until
-    the TTL.
+    calls ``upload_file`` and nothing else tells the cache — the new object
+    would otherwise not appear in ``/files`` or ``/files/stats`` until the TTL.
+    Size and timestamp come from the verify HEAD. The size matches what the
+    next scan will list; the timestamp only to the second, since Last-Modified
+    is an HTTP date and the listing carries milliseconds. That is why
+    `list_schedule.count_changes` doesn't compare written-through mtimes.
     """
-    _invalidate_list_cache()
+    upsert = {metadata.key: (metadata.size_bytes, epoch_ms(metadata.uploaded_at))}
+    _apply_to_list_cache(Delta(upsert, frozenset()))
@@ -25,13 +25,14 @@ logger = logging.getLogger(__name__)
 _lock = Lock()
 
 
-def _counter_path() -> Path:
-    """Resolve the counter file path relative to the repo root, when there is one.
+def state_path(value: str) -> Path:
+    """Resolve a runtime-state file setting relative to the repo root, when there is one.
 
     The repo root — not services/api/ — on purpose: `uvicorn --reload` watches
     services/api/, so runtime state written there lands inside the reloader's
-    watch tree. Every download then emits "N changes detected" noise (and would
-    become a real API restart the moment someone adds `--reload-include`).
+    watch tree. Every state write (each download, say) then emits "N changes
+    detected" noise (and would become a real API restart the moment someone
+    adds `--reload-include`).
     Runtime state belongs outside the watched source tree.
 
     A deployment that ships *only this service* has no repo root above it: with
@@ -42,7 +43,7 @@ def _counter_path() -> Path:
     the filesystem root, which raised IndexError at import time and took the
     whole API down before it could serve a request.
     """
-    p = Path(settings.download_count_file)
+    p = Path(value)
     if not p.is_absolute():
         # repo/ -> services/ -> api/ -> app/ -> repo/ -> counter.py, so the repo
         # root is parents[4] and this service's root is parents[2].
@@ -52,6 +53,11 @@ def _counter_path() -> Path:
     return p
 
 
+def _counter_path() -> Path:
+    """Resolve the counter file path (see `state_path`)."""
+    return state_path(settings.download_count_file)
+
+
 def _load() -> int:
     """Read the persisted counter; return 0 if missing or unreadable."""
     try:
@@ -91,7 +97,7 @@ def get_download_count() -> int:
         return _count
 
 
-def increment_download_count() -> None:
+def increment_download_count(by: int = 1) -> None:
     global _count
     # Snapshot under the lock, then persist outside it: with handlers now on
     # the threadpool, holding the lock across the file write would serialize
@@ -100,6 +106,6 @@ def increment_download_count() -> None:
     # the in-memory count (which stays correct) until the next increment.
     # Cross-restart/replica durability is tracked tech debt.
     with _lock:
-        _count += 1
+        _count += by
         snapshot = _count
     _save(snapshot)
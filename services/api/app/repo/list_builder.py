@@ -0,0 +1,197 @@
+"""Builds `ListingSnapshot`s from listing pages, and patches them.
+
+Split out of `list_snapshot` to keep that module under the 300-line ceiling:
+that module is the read side every request touches, this is the write side —
+the scan, and the app's own uploads/deletes (`patch_snapshot`). Folder strings
+and content types are interned here, content types via one `mimetypes` lookup
+per distinct extension rather than one per object.
+"""
+
+from __future__ import annotations
+
+import mimetypes
+import posixpath
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Mapping
+from typing import NamedTuple
+
+from app.repo import list_search
+from app.repo.list_snapshot import ListingSnapshot, Segment, epoch_ms
+
+_WIDER = {"B": "H", "H": "I", "I": "Q"}
+_INDEX_COLUMNS = ("_starts", "_lengths", "_folder_ids", "_type_ids")
+
+
+def _push(column: array, value: int) -> array:
+    """Append to an unsigned index column, widening its typecode on overflow."""
+    while True:
+        try:
+            column.append(value)
+            return column
+        except OverflowError:
+            column = array(_WIDER[column.typecode], column)
+
+
+def _append_all(column: array, values: array) -> array:
+    """Extend `column` with `values`, which were stored at most as wide."""
+    if values.typecode == column.typecode:
+        column.extend(values)  # a memcpy
+    elif values.itemsize <= column.itemsize:
+        column.extend(iter(values))
+    else:
+        column = array(values.typecode, column)
+        column.extend(values)
+    return column
+
+
+def _type_tail(filename: str) -> str:
+    """The suffix(es) `mimetypes` looks at: the extension, or two for `.tar.gz`."""
+    dot = filename.rfind(".")
+    if dot <= 0 or (filename[0] == "." and not filename[:dot].strip(".")):
+        return ""  # dotfiles have no extension, as in `posixpath.splitext`
+    ext = filename[dot:]
+    if ext in mimetypes.encodings_map or ext.lower() in mimetypes.suffix_map:
+        base, ext = posixpath.splitext(filename)  # rare: an encoding suffix
+        return posixpath.splitext(base)[1] + ext
+    return ext
+
+
+def snapshot_from_objects(objects: Iterable[dict]) -> ListingSnapshot:
+    """Build from botocore `Contents` dicts (Key, Size, LastModified) — the
+    LastModified a datetime, or already epoch ms (`b2_raw_list`)."""
+    builder = SnapshotBuilder()
+    for obj in objects:
+        mtime = obj["LastModified"]
+        builder.add(obj["Key"], obj["Size"], mtime if type(mtime) is int else epoch_ms(mtime))
+    return builder.build()
+
+
+class Delta(NamedTuple):
+    """Changes the app made itself. `upserts` maps key -> (size, mtime ms)."""
+
+    upserts: Mapping[str, tuple[int, int]]
+    deletes: frozenset[str]
+
+
+def patch_snapshot(snapshot: ListingSnapshot, delta: Delta) -> ListingSnapshot:
+    """A copy of `snapshot` with `delta` applied (an upsert wins over a delete).
+
+    Untouched runs are copied as whole column slices and keep their key-buffer
+    offsets; new keys are appended to the buffer. So the cost is O(n) memcpy
+    plus O(changes * log n) Python work — far below a rescan. A search index
+    built for `snapshot` is carried over the same way (`list_search.carry`).
+
+    The patched snapshot also remembers every key upserted since the last scan
+    (memo "written"): those rows carry the app's own timestamp, not the one
+    B2 will list, so `list_schedule.count_changes` ignores their mtime.
+    """
+    builder = SnapshotBuilder(base=snapshot)
+    keys = snapshot.keys()
+    pos = 0
+    for key in sorted(delta.upserts.keys() | delta.deletes):
+        i = bisect_left(keys, key, lo=pos)
+        builder.extend(snapshot.segment(pos, i))
+        pos = i + 1 if i < len(snapshot) and keys[i] == key else i
+        if key in delta.upserts:
+            builder.add(key, *delta.upserts[key])
+    builder.extend(snapshot.segment(pos, len(snapshot)))
+    patched = builder.build()
+    list_search.carry(snapshot, patched, delta.upserts.keys() | delta.deletes, delta.upserts)
+    written = (snapshot.memoized("written") or frozenset()) | delta.upserts.keys()
+    patched.memo("written", lambda _: written)
+    return patched
+
+
+class SnapshotBuilder:
+    """Accumulates objects, then freezes them into a `ListingSnapshot`.
+
+    With `base`, the builder starts from that snapshot's key buffer and string
+    tables, so its segments can be appended with `extend` as-is.
+    """
+
+    def __init__(self, base: ListingSnapshot | None = None) -> None:
+        self._blob = bytearray()
+        self._starts = array("B")
+        self._lengths = array("B")
+        self._sizes = array("q")
+        self._mtimes = array("q")
+        self._folder_ids = array("B")
+        self._folders: dict[str, int] = {}
+        self._type_ids = array("B")
+        self._types: dict[str, int] = {}
+        self._type_by_tail: dict[str, int] = {}
+        self._last_key: str | None = None
+        self._in_order = True
+        if base is not None:
+            self._blob += base.blob
+            self._folders = {folder: i for i, folder in enumerate(base.folders)}
+            self._types = {mime: i for i, mime in enumerate(base.content_types)}
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def add(self, key: str, size: int, mtime_ms: int) -> None:
+        if self._last_key is not None and key < self._last_key:
+            self._in_order = False
+        self._last_key = key
+        encoded = key.encode("utf-8")
+        start = len(self._blob)
+        self._blob += encoded
+        slash = key.rfind("/") + 1
+        folder = key[:slash]
+        fid = self._folders.get(folder)
+        if fid is None:
+            fid = self._folders[folder] = len(self._folders)
+        tail = _type_tail(key[slash:])
+        tid = self._type_by_tail.get(tail)
+        if tid is None:
+            mime = mimetypes.guess_type("x" + tail)[0] or "application/octet-stream"
+            tid = self._types.setdefault(mime, len(self._types))
+            self._type_by_tail[tail] = tid
+        try:
+            self._starts.append(start)
+            self._lengths.append(len(encoded))
+            self._folder_ids.append(fid)
+            self._type_ids.append(tid)
+        except OverflowError:  # an index column outgrew its typecode (rare)
+            self._append_widening(start, len(encoded), fid, tid)
+        self._sizes.append(size)
+        self._mtimes.append(mtime_ms)
+
+    def _append_widening(self, *values: int) -> None:
+        count = len(self._sizes)
+        for name, value in zip(_INDEX_COLUMNS, values, strict=True):
+            column = getattr(self, name)
+            del column[count:]  # undo the appends that did fit
+            setattr(self, name, _push(column, value))
+
+    def extend(self, segment: Segment) -> None:
+        """Append rows of the `base` snapshot, in key order."""
+        if not segment.sizes:
+            return
+        self._starts = _append_all(self._starts, segment.starts)
+        self._lengths = _append_all(self._lengths, segment.lengths)
+        self._sizes.extend(segment.sizes)
+        self._mtimes.extend(segment.mtimes)
+        self._folder_ids = _append_all(self._folder_ids, segment.folder_ids)
+        self._type_ids = _append_all(self._type_ids, segment.type_ids)
+        start = segment.starts[-1]
+        self._last_key = self._blob[start : start + segment.lengths[-1]].decode("utf-8")
+
+    def build(self) -> ListingSnapshot:
+        if not self._in_order:
+            return self._sorted()
+        segment = Segment(self._starts, self._lengths, self._sizes, self._mtimes,
+                          self._folder_ids, self._type_ids)
+        return ListingSnapshot(bytes(self._blob), segment, tuple(self._folders),
+                               tuple(self._types))
+
+    def _sorted(self) -> ListingSnapshot:
+        self._in_order = True
+        unsorted = self.build()
+        rows = sorted(unsorted.rows(), key=lambda row: row[0])
+        builder = SnapshotBuilder()
+        for key, _folder, size, mtime, _type in rows:
+            builder.add(key, size, mtime)
+        return builder.build()
@@ -1,129 +1,273 @@
 """Single-flight, stale-while-revalidate cache for full-bucket object listings.
 
-Extracted from `b2_client` to keep that module under the 300-line ceiling. It is
-storage-agnostic on purpose: the caller supplies the fetch, so nothing here
-touches boto3.
-
-Why this exists: `/files` and `/files/stats` both need *every* object (newest-N
-requires a full listing, since S3 lists lexicographically), and paginating a
-16k-object bucket measured 8-20s. One shared scan is therefore mandatory, and a
-cache that only ever expires would hand that 8-20s wait to a user again on the
-first request after every expiry — which is exactly what a browsing session hits.
-
-So the cache has three states, and only the first can make a caller wait:
-
-1. **cold** (nothing cached) — the caller blocks on a single-flight scan.
-2. **fresh** (younger than `settings.list_cache_ttl_seconds`) — served instantly.
-3. **stale** — the old snapshot is served *instantly* and a background thread
-   refreshes it. Staleness is bounded to bucket changes made outside this app:
-   uploads and deletes call `invalidate()`, which drops the entry so the next
-   read blocks on a genuinely fresh scan.
-
-Only the empty prefix is cached — caching client-supplied `?prefix=` values
-would grow unbounded. Thread-safe: the B2 handlers run in Starlette's
-threadpool.
+Extracted from `b2_client` to keep that module under the 300-line ceiling; the
+caller supplies the fetch, so nothing here touches boto3. `/files` and the stats
+need *every* object, and paginating a 16k-object bucket measured 8-20s, so one
+shared scan is mandatory — and a cache that only expired would hand that wait
+to a user again after every expiry.
+
+Three states, and only the first can make a caller wait:
+
+1. **cold** (nothing cached) — the caller blocks on a single-flight scan, or
+   with `progressive` gets a partial snapshot of it (`list_progress`).
+2. **fresh** (younger than the refresh interval, `list_schedule`) — served instantly.
+3. **stale** — served *instantly* while a background thread refreshes it.
+   Only changes made outside this app can be stale: its own uploads and deletes
+   are written through (`apply()`), with `invalidate()` as the fallback.
+
+Only the empty prefix is cached (client-supplied `?prefix=` values would grow
+unbounded); while a root snapshot exists, a prefix listing is its key range,
+bisected in O(log n + k). Thread-safe: the B2 handlers run in Starlette's
+threadpool, and listings are immutable `ListingSnapshot`s.
+
+Each root scan is persisted (`list_store`); the first cold read after a restart
+serves it as *stale* instead of blocking. With `LIST_SHARED_CACHE` that file is
+shared by the worker processes of a host (`list_shared`).
 """
 
 import logging
 import time
 from collections.abc import Callable
 from threading import Lock, Thread
+from typing import NamedTuple
+
+from app.repo import list_checkpoint, list_progress, list_schedule, list_shared, list_store
+from app.repo.list_builder import Delta, patch_snapshot
+from app.repo.list_snapshot import ListingSnapshot
+
+
+class _Entry(NamedTuple):
+    stored_at: float  # time.monotonic(); drives fresh vs stale
+    listing: ListingSnapshot
+    generation: int  # the `_list_generation` this snapshot was stored under
+    scanned_at: float  # wall-clock time.time() of the scan (persisted)
 
-from app.config import settings
 
 logger = logging.getLogger(__name__)
 
-_list_cache: dict[str, tuple[float, list[dict]]] = {}
-_list_cache_lock = Lock()  # guards _list_cache, _list_generation, _refreshing
+_list_cache: dict[str, _Entry] = {}
+_list_cache_lock = Lock()  # guards every module global below
 _list_scan_lock = Lock()  # single-flight: one bucket scan at a time
-_list_generation = 0  # bumped on invalidation to void in-flight scans
+_list_patch_lock = Lock()  # write-through patches apply one at a time, in order
+_list_generation = 0  # bumped on every store, patch and invalidation
+_voided_at = 0  # generation of the last invalidate(); older in-flight scans are dropped
+_scan_started: int | None = None  # generation the in-flight root scan started at
+_deltas: list[tuple[int, Delta]] = []  # patches applied during that scan
 _refreshing: set[str] = set()  # prefixes with a background refresh in flight
+_restored = False  # the on-disk snapshot is consulted once per process
 
-Fetch = Callable[[str], list[dict]]
-
-
-def _ttl() -> float:
-    """Read the TTL per call so tests (and env overrides) can change it."""
-    return float(settings.list_cache_ttl_seconds)
+Fetch = Callable[[str], ListingSnapshot]
 
 
 def invalidate() -> None:
-    """Drop cached listings and void any scan already in flight.
-
-    Called after any mutation (upload/delete). Bumping the generation stops a
-    scan that started *before* the mutation from writing its stale snapshot
-    back into the cache after this clears it.
-    """
-    global _list_generation
+    """Drop cached listings and void any scan in flight: the fallback for a
+    mutation `apply()` can't express. Neither a scan that started before it nor
+    the on-disk copy, which predate it, will be cached."""
+    global _list_generation, _voided_at, _restored
     with _list_cache_lock:
         _list_cache.clear()
         _list_generation += 1
+        _voided_at = _list_generation
+        _deltas.clear()
+        _restored = True
+    list_checkpoint.discard()
+
+
+def apply(delta: Delta) -> None:
+    """Write the app's own upload/delete through to the cached root snapshot: a
+    patched copy under a new generation, replayed by a scan in flight and (shared)
+    journaled for other workers. Falls back to `invalidate()` if patching fails."""
+    global _list_generation, _restored
+    with _list_patch_lock, list_shared.write_lock() as floor:
+        if list_shared.enabled():
+            _catch_up()  # patch the newest generation any worker wrote
+        with _list_cache_lock:
+            _list_generation = max(_list_generation, floor) + 1
+            generation = _list_generation
+            if _scan_started is not None:
+                _deltas.append((generation, delta))
+            list_checkpoint.record(delta)
+            entry = _list_cache.get("")
+            if entry is None:
+                _restored = True  # the on-disk copy predates this write
+        list_shared.record(generation, delta)
+        if entry is None:
+            return
+        try:
+            patched = patch_snapshot(entry.listing, delta)
+        except Exception:
+            logger.exception("Patching the cached listing failed; invalidating it")
+            invalidate()
+            return
+        with _list_cache_lock:
+            # Else a scan stored meanwhile (replaying this) or an invalidation.
+            if _list_cache.get("") is entry:
+                _list_cache[""] = entry._replace(listing=patched, generation=generation)
 
 
 def _reset_state() -> None:
-    """Test helper: invalidate and forget any in-flight background refresh."""
+    """Test helper: invalidate, forget refreshes and partial scans, re-allow a restore."""
+    global _restored
     invalidate()
+    list_progress._reset_state()
+    list_schedule._reset_state()
     with _list_cache_lock:
         _refreshing.clear()
+        _restored = False
 
 
-def _entry(prefix: str) -> tuple[float, list[dict]] | None:
-    """Return the cached (timestamp, listing) for `prefix`, fresh or stale."""
+def _entry(prefix: str) -> _Entry | None:
     with _list_cache_lock:
         return _list_cache.get(prefix)
 
 
-def _is_fresh(entry: tuple[float, list[dict]]) -> bool:
-    return time.monotonic() - entry[0] < _ttl()
+def version_of(listing: ListingSnapshot) -> str | None:
+    """Names the cached root `listing` (or a slice of it) across workers and
+    restarts: its scan time and generation. None for a partial, uncached or
+    since-replaced listing."""
+    entry = _entry("")
+    if entry is None or entry.listing is not listing.origin[0]:
+        return None
+    return f"{entry.scanned_at:.6f}-{entry.generation}"
 
 
-def cached_listing(prefix: str, fetch: Fetch) -> list[dict]:
-    """Return every object under `prefix`, reusing a recent scan when possible.
+def peek(prefix: str) -> ListingSnapshot | None:
+    """The cached listing for `prefix`, fresh or stale, without scanning."""
+    entry = _entry(prefix)
+    return entry.listing if entry is not None else None
 
-    The returned list is shared and cached — callers must treat it as read-only
-    (never sort/mutate in place). Propagates whatever `fetch` raises, except
-    from a background refresh (logged, and the stale snapshot keeps serving).
-    """
-    # Non-empty prefixes are neither cached nor deduplicated, so routing them
-    # through the single-flight lock would serialize unrelated scans for no
-    # benefit. Scan them directly (bounded by rate limiting).
-    if prefix != "":
-        return fetch(prefix)
 
-    entry = _entry(prefix)
-    if entry is not None:
-        if _is_fresh(entry):
-            return entry[1]
-        # Stale: hand back the old snapshot now and refresh behind the user's
-        # back. Never make someone wait 8-20s for a scan we can do off-request.
-        _start_background_refresh(prefix, fetch)
-        return entry[1]
+def _is_fresh(entry: _Entry) -> bool:
+    return time.monotonic() - entry.stored_at < list_schedule.interval()
 
-    return _scan(prefix, fetch)
 
+def _current() -> _Entry | None:
+    """The root entry, caught up with the snapshot file (`_catch_up`)."""
+    if _list_patch_lock.acquire(blocking=False):
+        try:  # a write in progress catches up itself; the next read will too
+            _catch_up()
+        finally:
+            _list_patch_lock.release()
+    return _entry("")
 
-def _scan(prefix: str, fetch: Fetch) -> list[dict]:
-    """Single-flight blocking scan. The only path that can make a caller wait.
 
-    Serializes (empty-prefix) scans so a cold/expired/invalidated entry can't
-    trigger a thundering herd of concurrent full-bucket scans. Waiters re-check
-    the cache and reuse the winner's result.
+def _catch_up() -> None:
+    """Adopt the snapshot file when it is newer. Unshared, that is a restore:
+    once per process, never after a write (the disk copy would predate it), as
+    *stale*. Shared, it is whatever other workers wrote since, aged by its
+    `scanned_at` so a peer's fresh scan is not scanned again."""
+    global _list_generation, _restored
+    with _list_cache_lock:
+        current, before = _list_cache.get(""), _list_generation
+        restoring = not list_shared.enabled()
+        if restoring and (current is not None or _restored):
+            return
+        _restored = True
+    if restoring:
+        newer = list_store.load()
+    else:
+        newer = list_shared.catch_up(current and list_store.StoredListing(
+            current.generation, current.scanned_at, current.listing))
+    if newer is None:
+        return
+    stored_at = time.monotonic() - max(0.0, time.time() - newer.scanned_at)
+    if restoring:
+        stored_at = float("-inf")
+    elif current is not None and current.scanned_at == newer.scanned_at:
+        stored_at = current.stored_at  # the same scan, patched
+    with _list_cache_lock:
+        if _list_cache.get("") is not current or _list_generation != before:
+            return  # a scan, write or invalidation landed while we read
+        _list_cache[""] = _Entry(stored_at, newer.listing, newer.generation, newer.scanned_at)
+        _list_generation = max(_list_generation, newer.generation)
+    if restoring:
+        logger.info("Restored listing snapshot from disk (%d objects, generation %d)",
+                    len(newer.listing), newer.generation)
+
+
+def cached_listing(prefix: str, fetch: Fetch, progressive: bool = False) -> ListingSnapshot:
+    """Return every object under `prefix`, reusing a recent scan when possible.
+
+    The snapshot is shared and immutable; a prefix is sliced from the root one.
+    With nothing cached, `progressive` returns a partial snapshot (`.complete`
+    False) of a background root scan. Propagates what a blocking `fetch` raises.
     """
-    with _list_scan_lock:
-        entry = _entry(prefix)
+    entry = _current()
+    if entry is None and progressive:
+        _start_background_refresh("", fetch)
+        partial = list_progress.await_partial(_scan_pending)
+        if partial is not None:
+            return partial.with_prefix(prefix) if prefix else partial
+        entry = _entry("")  # finished meanwhile; if it failed, block on a retry
+    if entry is None:
+        if prefix != "":  # uncached, and single-flight would only serialize unrelated scans
+            return fetch(prefix)
+        return _scan(prefix, fetch)
+
+    if not _is_fresh(entry):
+        # Stale: serve it now and refresh off-request — never make a user wait.
+        _start_background_refresh("", fetch)
+    # A folder click is a key range of the root snapshot, not a fresh scan.
+    return entry.listing.with_prefix(prefix) if prefix else entry.listing
+
+
+def _scan_pending() -> bool:
+    with _list_cache_lock:
+        return "" not in _list_cache and "" in _refreshing
+
+
+def _scan(prefix: str, fetch: Fetch) -> ListingSnapshot:
+    """Single-flight blocking scan, the only path that can make a caller wait:
+    no thundering herd of full-bucket scans — waiters reuse the winner's result
+    (shared, across the host's workers too)."""
+    global _scan_started
+    with _list_scan_lock, list_shared.scan_lock():
+        entry = _current()
         if entry is not None and _is_fresh(entry):
-            return entry[1]
+            return entry.listing
         with _list_cache_lock:
             generation = _list_generation
+            _scan_started = generation
+
+        scanned_at = time.time()
+        try:
+            contents = fetch(prefix)  # scan under the single-flight lock
+            previous = _entry("")
+            with list_shared.write_lock() as floor:
+                contents = list_shared.replay(contents)
+                entry = _store(prefix, contents, generation, scanned_at, floor)
+                if entry is not None:
+                    list_shared.publish(entry.listing, entry.generation, scanned_at)
+        finally:
+            with _list_cache_lock:
+                _scan_started = None
+                _deltas.clear()
+    if entry is None:
+        return contents
+    if previous is not None:  # adapt the refresh interval to the churn found
+        list_schedule.observe(previous.listing, entry.listing, scanned_at - previous.scanned_at)
+    return entry.listing
 
-        contents = fetch(prefix)  # scan under the single-flight lock
 
+def _store(prefix: str, contents: ListingSnapshot, started: int,
+           scanned_at: float, floor: int) -> _Entry | None:
+    """Cache a finished scan above generation `floor`; None if an invalidation
+    voided it. Patches applied while it ran are replayed (idempotent)."""
+    global _list_generation
+    seen = started
+    while True:
         with _list_cache_lock:
-            # Only store if nothing invalidated the cache mid-scan, else we'd
-            # cache a pre-mutation snapshot.
-            if generation == _list_generation:
-                _list_cache[prefix] = (time.monotonic(), contents)
-        return contents
+            if _voided_at > started:
+                return None  # invalidated mid-scan: a pre-mutation snapshot
+            pending = [delta for generation, delta in _deltas if generation > seen]
+            if not pending:
+                _list_generation = max(_list_generation, floor) + 1
+                entry = _Entry(time.monotonic(), contents, _list_generation, scanned_at)
+                _list_cache[prefix] = entry
+                return entry
+            seen = _deltas[-1][0]
+        for delta in pending:
+            contents = patch_snapshot(contents, delta)
 
 
 def _start_background_refresh(prefix: str, fetch: Fetch) -> None:
@@ -132,20 +276,14 @@ def _start_background_refresh(prefix: str, fetch: Fetch) -> None:
         if prefix in _refreshing:
             return
         _refreshing.add(prefix)
-    Thread(
-        target=_refresh,
-        args=(prefix, fetch),
-        name=f"list-cache-refresh:{prefix or 'root'}",
-        daemon=True,
-    ).start()
+    name = f"list-cache-refresh:{prefix or 'root'}"
+    Thread(target=_refresh, args=(prefix, fetch), name=name, daemon=True).start()
 
 
 def _refresh(prefix: str, fetch: Fetch) -> None:
     try:
         _scan(prefix, fetch)
-    except Exception as e:
-        # A failed refresh must never surface to the user or kill the thread's
-        # process — the previous snapshot stays served until the next attempt.
+    except Exception as e:  # never surfaces to a user: the old snapshot stays served
         logger.warning("Background listing refresh failed (prefix=%r): %s", prefix, e)
     finally:
         with _list_cache_lock:
@@ -153,11 +291,8 @@ def _refresh(prefix: str, fetch: Fetch) -> None:
 
 
 def prewarm(prefix: str, fetch: Fetch) -> None:
-    """Populate the cache off the request path (called once at startup).
-
-    Returns immediately. Without this the first user to open the dashboard or
-    the file browser pays for the cold full-bucket scan.
-    """
-    if _entry(prefix) is not None:
-        return
-    _start_background_refresh(prefix, fetch)
+    """Populate the cache off the request path (startup); returns at once. A
+    persisted snapshot is served meanwhile, else reads get partials or wait."""
+    entry = _current()
+    if entry is None or not _is_fresh(entry):
+        _start_background_refresh(prefix, fetch)
@@ -0,0 +1,101 @@
+"""Checkpoints that let a failed root scan resume instead of starting over.
+
+A scan is a chain of dependent page requests per range (`b2_scan`), and until
+now one `ClientError` on page 14 of 16 threw all of them away: the retry (the
+next read, or the next background refresh) began at page 1 again, so on a
+flaky link a large bucket might never finish a scan at all. Now each range of
+the root scan records its pages and its continuation token as they land, in a
+`ScanCheckpoint`. When the scan fails the checkpoint is kept; the next scan
+within `LIST_RESUME_MAX_AGE_SECONDS` of the first one's start takes it over —
+same boundaries, finished ranges reused, the rest continued from their last
+good page.
+
+Resuming merges pages listed minutes apart, so the result is only as fresh as
+the checkpoint's start — hence the bound. The app's own uploads and deletes
+in the meantime are `record()`ed on the checkpoint and patched onto the
+resumed result (`patch_snapshot` is idempotent, so a write the later pages
+already saw is harmless). `discard()` (on `list_cache.invalidate()`) drops it.
+
+Only the root scan is checkpointed, as only it is cached; the state is
+module-level because `list_cache` runs one root scan at a time. Held in memory
+only — a checkpoint costs what the page dicts it holds do, until it is resumed
+or expires.
+"""
+
+import time
+from threading import Lock
+
+from app.repo.list_builder import Delta
+
+
+class RangeProgress:
+    """One range's pages so far, and where to continue. Touched only by the
+    thread listing that range."""
+
+    __slots__ = ("contents", "done", "token")
+
+    def __init__(self) -> None:
+        self.contents: list[dict] = []
+        self.token: str | None = None  # NextContinuationToken of the last page kept
+        self.done = False
+
+
+class ScanCheckpoint:
+    """A root scan's boundaries and per-range progress, plus the writes made
+    since it started (`deltas`, in order)."""
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.boundaries: list[str] | None = None  # None until the scan picks them
+        self.ranges: list[RangeProgress] = []
+        self.deltas: list[Delta] = []
+
+    def plan(self, boundaries: list[str]) -> list[RangeProgress]:
+        """The ranges' progress for `boundaries`, fixed by the first scan that
+        used this checkpoint; a resumed scan gets the same boundaries back via
+        `self.boundaries`."""
+        if self.boundaries is None:
+            self.boundaries = list(boundaries)
+            self.ranges = [RangeProgress() for _ in range(len(boundaries) + 1)]
+        return self.ranges
+
+    @property
+    def resumed_objects(self) -> int:
+        return sum(len(progress.contents) for progress in self.ranges)
+
+
+_lock = Lock()  # guards `_checkpoint`
+_checkpoint: ScanCheckpoint | None = None  # the running or last failed root scan's
+
+
+def begin(max_age: float) -> ScanCheckpoint:
+    """The checkpoint for a root scan about to run: the last failed scan's if it
+    started under `max_age` seconds ago, else a new one."""
+    global _checkpoint
+    with _lock:
+        current = _checkpoint
+        if current is None or max_age <= 0 or time.monotonic() - current.started > max_age:
+            current = _checkpoint = ScanCheckpoint()
+        return current
+
+
+def finish(checkpoint: ScanCheckpoint) -> None:
+    """The scan using `checkpoint` succeeded; nothing is left to resume."""
+    global _checkpoint
+    with _lock:
+        if _checkpoint is checkpoint:
+            _checkpoint = None
+
+
+def record(delta: Delta) -> None:
+    """An upload/delete the app wrote through: replay it onto a resumed scan."""
+    with _lock:
+        if _checkpoint is not None:
+            _checkpoint.deltas.append(delta)
+
+
+def discard() -> None:
+    """Forget any checkpoint (the listing was invalidated)."""
+    global _checkpoint
+    with _lock:
+        _checkpoint = None
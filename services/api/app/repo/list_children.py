@@ -0,0 +1,79 @@
+"""One folder level of a `ListingSnapshot`, like a `Delimiter="/"` listing.
+
+Expanding a folder in the browser needs only its immediate children: the
+files directly in it and its subfolders (S3's `CommonPrefixes`). Walked from
+the root snapshot's key order, a subfolder's whole subtree is one contiguous
+run of keys, so each subfolder costs one bisect to skip, however many objects
+are under it — a page of `limit` children is O(limit x log n).
+
+Pages resume after a marker, S3 `StartAfter`-style: the last key or subfolder
+returned. Markers are keys, not positions, so they stay meaningful across
+generations; a marker ending in `/` (a subfolder) skips that subfolder's
+subtree. The folder's own placeholder object (key == folder), which some
+clients create for "empty folders", is not listed as a child file.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import NamedTuple
+
+from app.repo.list_snapshot import ListingSnapshot
+
+# Past the last UTF-8 character: `StartAfter` a subfolder plus this skips the
+# whole subfolder, as a subfolder marker does here.
+_SUBTREE_END = "\U0010ffff"
+
+
+class Children(NamedTuple):
+    folders: list[str]  # immediate subfolders, full paths ending in "/"
+    rows: list[int]  # snapshot rows of the files directly in the folder
+    after: str | None  # the marker to resume from, or None after the last page
+
+
+def children(snapshot: ListingSnapshot, folder: str, after: str | None, limit: int) -> Children:
+    """Up to `limit` immediate children of `folder` ("" or ending in "/") in
+    key order, starting after the marker `after` (None for the first page)."""
+    lo, hi = snapshot.prefix_range(folder)
+    keys = snapshot.keys()
+    if after is not None and after.endswith("/") and after != folder:
+        lo = max(lo, snapshot.prefix_range(after)[1])  # past that subfolder
+    elif after is not None:
+        lo = max(lo, bisect_right(keys, after, lo, hi))
+    folders: list[str] = []
+    rows: list[int] = []
+    last = None
+    i = lo
+    while i < hi and len(folders) + len(rows) < limit:
+        key = keys[i]
+        slash = key.find("/", len(folder))
+        if slash >= 0:
+            last = key[: slash + 1]
+            folders.append(last)
+            i = snapshot.prefix_range(last)[1]
+            continue
+        if key != folder:
+            last = key
+            rows.append(i)
+        i += 1
+    return Children(folders, rows, last if i < hi else None)
+
+
+def start_after(folder: str, after: str) -> str:
+    """The S3 `StartAfter` resuming a B2 `Delimiter="/"` listing of `folder`
+    after the marker `after`. The folder's own placeholder (`after == folder`)
+    is a plain key, not a subfolder to skip."""
+    return after + _SUBTREE_END if after.endswith("/") and after != folder else after
+
+
+def page_marker(response: dict) -> str | None:
+    """The marker after a B2 `Delimiter="/"` page, or None after the last.
+
+    Taken from the raw page, placeholder included: a truncated page can hold
+    nothing but the placeholder, and must still resume.
+    """
+    if not response.get("IsTruncated"):
+        return None
+    folders = [p["Prefix"] for p in response.get("CommonPrefixes", [])[-1:]]
+    keys = [o["Key"] for o in response.get("Contents", [])[-1:]]
+    return max([*folders, *keys], default=None)
@@ -0,0 +1,97 @@
+"""Precomputed sort orders over a `ListingSnapshot`.
+
+`GET /files` used to materialize every object as a `FileMetadata` and sort the
+whole list on each request just to return the newest 100. An order index is a
+packed array of row numbers, built once per snapshot — so once per generation:
+a rescan or a write-through patch produces a new snapshot, and its indexes are
+rebuilt on first use — and memoized on it (`ListingSnapshot.memo`). Answering a
+request is then walking the first `limit` entries of the index, forwards or
+backwards, and materializing only those rows.
+
+A `?prefix=` listing is a slice of the root snapshot. When the slice holds a
+good share of the root it walks the root's index and skips rows outside its
+range (at most `_DENSE` root rows per hit on average); a small slice is cheaper
+to sort on its own, in O(k log k) for its k rows.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Callable, Iterator
+
+from app.repo.list_snapshot import ListingSnapshot
+
+SORT_FIELDS = ("uploaded_at", "name", "size", "key")
+
+# A slice covering at least 1/_DENSE of its root walks the root's index.
+_DENSE = 8
+
+
+def _names(snapshot: ListingSnapshot) -> list[str]:
+    """Case-folded filenames (the key after its folder), as a file browser sorts."""
+    return [key[len(folder):].casefold() for key, folder, *_ in snapshot.rows()]
+
+
+def _sort_key(snapshot: ListingSnapshot, field: str) -> Callable[[int], object]:
+    if field == "uploaded_at":
+        return snapshot.mtimes.__getitem__
+    if field == "size":
+        return snapshot.sizes.__getitem__
+    if field == "name":
+        return _names(snapshot).__getitem__
+    raise ValueError(f"sort must be one of {SORT_FIELDS}, got {field!r}")
+
+
+def build_order(snapshot: ListingSnapshot, field: str) -> array:
+    """Row numbers ordered by `field` ascending; ties stay in key order."""
+    n = len(snapshot)
+    # Rows are stored in key order already.
+    order = range(n) if field == "key" else sorted(range(n), key=_sort_key(snapshot, field))
+    return array("I" if n < 2**32 else "Q", order)
+
+
+def order_index(snapshot: ListingSnapshot, field: str) -> array:
+    """`build_order` memoized on the snapshot."""
+    return snapshot.memo(f"order:{field}", lambda s: build_order(s, field))
+
+
+def page(
+    snapshot: ListingSnapshot, field: str, descending: bool, start: int, limit: int
+) -> tuple[list[int], int | None]:
+    """Up to `limit` rows of `snapshot` in `ordered` order, resuming at walk
+    position `start`; and the position of the next row, or None after the last.
+
+    Positions count steps of the index walk — the root's index for a dense
+    slice, the slice's own order otherwise — so resuming is O(limit) (times
+    the density bound for a slice) instead of re-walking every earlier page.
+    """
+    root, offset = snapshot.origin
+    dense = root is snapshot or len(snapshot) * _DENSE >= len(root)
+    index = order_index(root, field) if dense else build_order(snapshot, field)
+    if not dense:
+        root, offset = snapshot, 0
+    end, n = offset + len(snapshot), len(index)
+    rows: list[int] = []
+    pos = start
+    while pos < n:
+        i = index[n - 1 - pos] if descending else index[pos]
+        if offset <= i < end:
+            if len(rows) == limit:
+                return rows, pos  # the next page starts at this row
+            rows.append(i - offset)
+        pos += 1
+    return rows, None
+
+
+def ordered(snapshot: ListingSnapshot, field: str, descending: bool) -> Iterator[int]:
+    """Row numbers of `snapshot` sorted by `field`, lazily: take what you need."""
+    root, offset = snapshot.origin
+    if root is snapshot or len(snapshot) * _DENSE >= len(root):
+        index = order_index(root, field)
+        rows = reversed(index) if descending else iter(index)
+        if root is snapshot:
+            return rows
+        end = offset + len(snapshot)
+        return (i - offset for i in rows if offset <= i < end)
+    index = build_order(snapshot, field)
+    return reversed(index) if descending else iter(index)
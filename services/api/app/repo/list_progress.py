@@ -0,0 +1,119 @@
+"""Partial snapshots of a cold root scan, for progressive listing.
+
+On a cold (or invalidated) cache the first `/files` caller used to block until
+the scan's last page arrived, so the dashboard's first paint scaled with the
+bucket. Instead, while a root scan runs its pages are collected here, and a
+reader that would otherwise block (`list_cache.cached_listing(progressive=True)`)
+is handed a partial `ListingSnapshot` of everything seen so far — at once if a
+page has landed, else after the first. Partial snapshots say so
+(`ListingSnapshot.complete`), and the API reports it so clients can poll until
+the real snapshot is cached.
+
+Building a snapshot costs O(k log k) for the k objects seen, so it is done
+lazily and sparingly: nothing is built until a reader asks, and after that only
+once the scan has doubled what the last partial held — so all partials together
+cost about one more build of the final listing, and a background refresh nobody
+waits on costs nothing extra.
+
+Only one root scan runs at a time (`list_cache` is single-flight), so the state
+is module-level. Thread-safe: pages arrive from every range of a partitioned
+scan concurrently.
+"""
+
+import logging
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from threading import Condition
+
+from app.repo.list_builder import snapshot_from_objects
+from app.repo.list_snapshot import ListingSnapshot
+
+logger = logging.getLogger(__name__)
+
+_cond = Condition()  # guards every module global below
+_objects: list[dict] | None = None  # the tracked scan's objects so far; None when none
+_partial: ListingSnapshot | None = None  # the newest published partial snapshot
+_wanted = False  # a reader has asked for partial results
+_building = False  # one build at a time; pages keep landing meanwhile
+_failed = False  # a build raised: stop trying for the rest of this scan
+
+
+@contextmanager
+def tracking() -> Iterator[Callable[[list[dict]], None]]:
+    """Track one root scan; yields the `on_page` callback to pass to it."""
+    _begin([])
+    try:
+        yield _add_page
+    finally:
+        _begin(None)  # waiters fall back to the finished (or failed) scan
+
+
+def _begin(objects: list[dict] | None) -> None:
+    global _objects, _partial, _wanted, _building, _failed
+    with _cond:
+        _objects, _partial, _wanted, _building, _failed = objects, None, False, False, False
+        _cond.notify_all()
+
+
+def _add_page(page: list[dict]) -> None:
+    with _cond:
+        if _objects is None:
+            return
+        _objects.extend(page)
+        source, objects = _objects, _claim_build()
+    if objects is not None:
+        _build(source, objects)
+
+
+def _claim_build() -> list[dict] | None:
+    """Under `_cond`: the objects to build a partial from, if one is due."""
+    global _building
+    if not _wanted or _building or _failed or not _objects:
+        return None
+    if _partial is not None and len(_objects) < 2 * len(_partial):
+        return None
+    _building = True
+    return list(_objects)
+
+
+def _build(source: list[dict], objects: list[dict]) -> None:
+    """Build and publish a partial from `objects`, a copy of scan `source`."""
+    global _building, _failed, _partial
+    snapshot = None
+    try:
+        snapshot = snapshot_from_objects(objects).mark_partial()
+    except Exception:
+        logger.exception("Building a partial listing failed; readers wait for the scan")
+    with _cond:
+        if _objects is not source:
+            return  # that scan is over; this one's state is not ours to touch
+        _building = False
+        _failed = snapshot is None
+        _partial = snapshot or _partial
+        _cond.notify_all()
+
+
+def await_partial(pending: Callable[[], bool], poll: float = 0.1) -> ListingSnapshot | None:
+    """The newest partial snapshot of the running root scan; if there is none
+    yet, the caller builds one from the pages so far, or waits for the first.
+    None once `pending()` says the scan is over (its result is cached, or it
+    failed) — the caller then reads the cache."""
+    global _wanted
+    while True:
+        with _cond:
+            if not pending():
+                return None
+            if _partial is not None:
+                return _partial
+            if _objects is not None:
+                _wanted = True
+            source, objects = _objects, _claim_build()
+            if objects is None or source is None:
+                _cond.wait(poll)
+                continue
+        _build(source, objects)
+
+
+def _reset_state() -> None:
+    """Test helper: forget any tracked scan."""
+    _begin(None)
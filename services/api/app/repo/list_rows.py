@@ -0,0 +1,124 @@
+"""File-list results as a view over `ListingSnapshot` rows.
+
+A list route used to turn each returned row into a validated `FileMetadata`
+and hand the list to FastAPI, which validated it again against the route's
+`response_model` and serialized it field by field — most of the CPU of a
+1000-row `/files`. `FileRows` keeps the snapshot and row numbers instead and
+builds only what the response needs: JSON-ready values (`objects`/`values`)
+for the routes to dump in one call, or `FileMetadata` models (it is a
+`Sequence[FileMetadata]`) for everything else.
+
+The derived fields are cheap per row: content types are interned per
+snapshot already, `size_human` and the timestamp's date are
+memoized, and a public URL is its folder's (memoized) URL plus the quoted
+filename. `benchmarks/bench_list_rows.py` measures both paths.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable, Iterator, Sequence
+from functools import lru_cache
+from typing import overload
+from urllib.parse import quote
+
+from app.config import settings
+from app.repo.list_snapshot import ListingSnapshot, from_epoch_ms
+from app.types import FILE_FIELDS, FileField, FileMetadata
+from app.types.formatting import humanize_bytes
+
+_size_human = lru_cache(maxsize=4096)(humanize_bytes)
+
+
+@lru_cache(maxsize=4096)
+def _utc_date(epoch_day: int) -> str:
+    return time.strftime("%Y-%m-%dT", time.gmtime(epoch_day * 86_400))
+
+
+_TWO_DIGITS = tuple(f"{n:02d}" for n in range(60))
+# Pydantic prints microseconds, and only when nonzero.
+_FRACTION = ("Z", *(f".{ms:03d}000Z" for ms in range(1, 1000)))
+
+
+def iso_utc(ms: int) -> str:
+    """`from_epoch_ms(ms)` as pydantic serializes it: UTC with a `Z`, and
+    microseconds only when there are any."""
+    seconds, millis = divmod(ms, 1000)
+    day, seconds = divmod(seconds, 86_400)
+    hh, mm, ss = seconds // 3600, seconds // 60 % 60, seconds % 60
+    return (
+        f"{_utc_date(day)}{_TWO_DIGITS[hh]}:{_TWO_DIGITS[mm]}:{_TWO_DIGITS[ss]}"
+        f"{_FRACTION[millis]}"
+    )
+
+
+@lru_cache(maxsize=4096)
+def _folder_url(base: str, folder: str) -> str:
+    return f"{base}/{quote(folder, safe='/')}"
+
+
+class FileRows(Sequence[FileMetadata]):
+    """The files at `rows` of `snapshot`, in that order."""
+
+    __slots__ = ("_rows", "_snapshot")
+
+    def __init__(self, snapshot: ListingSnapshot, rows: Iterable[int] | None = None):
+        self._snapshot = snapshot
+        self._rows = list(range(len(snapshot)) if rows is None else rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @overload
+    def __getitem__(self, i: int) -> FileMetadata: ...
+    @overload
+    def __getitem__(self, i: slice) -> list[FileMetadata]: ...
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self._models(self._rows[i])
+        return self._models([self._rows[i]])[0]
+
+    def __iter__(self) -> Iterator[FileMetadata]:
+        return iter(self._models(self._rows))
+
+    def _models(self, rows: Iterable[int]) -> list[FileMetadata]:
+        base = settings.b2_public_url
+        return [
+            FileMetadata(
+                key=key,
+                filename=key[len(folder):],
+                folder=folder,
+                size_bytes=size,
+                size_human=_size_human(size),
+                content_type=content_type,
+                uploaded_at=from_epoch_ms(mtime_ms),
+                url=_folder_url(base, folder) + quote(key[len(folder):]) if base else None,
+            )
+            for key, folder, size, mtime_ms, content_type in self._snapshot.rows(rows)
+        ]
+
+    def objects(self, columns: Sequence[FileField] = FILE_FIELDS) -> list[dict]:
+        """Each file as a JSON-ready object with just `columns` — what
+        `FileMetadata.model_dump(mode="json", include=columns)` gives, without
+        building the models."""
+        base = settings.b2_public_url
+        files = [
+            {
+                "key": key,
+                "filename": key[len(folder):],
+                "folder": folder,
+                "size_bytes": size,
+                "size_human": _size_human(size),
+                "content_type": content_type,
+                "uploaded_at": iso_utc(mtime_ms),
+                "url": _folder_url(base, folder) + quote(key[len(folder):]) if base else None,
+            }
+            for key, folder, size, mtime_ms, content_type in self._snapshot.rows(self._rows)
+        ]
+        if tuple(columns) == FILE_FIELDS:
+            return files
+        return [{column: file[column] for column in columns} for file in files]
+
+    def values(self, columns: Sequence[FileField] = FILE_FIELDS) -> list[list]:
+        """Each file's `columns` as a JSON-ready array (the compact encoding)."""
+        return [[file[column] for column in columns] for file in self.objects()]
@@ -0,0 +1,138 @@
+"""Adaptive refresh interval for the cached root listing.
+
+The cached listing used to go stale after a fixed `LIST_CACHE_TTL_SECONDS`
+whether or not the bucket had changed: an idle bucket was rescanned every five
+minutes for nothing, while one written to by another app showed those writes
+up to five minutes late. Instead, every refresh is compared with the snapshot
+it replaces (`count_changes`: objects added, removed or changed), and the
+interval adapts to the churn it finds, changes per second between the scans:
+
+- at least `LIST_REFRESH_CHURN_HIGH` — the interval halves, down to
+  `LIST_REFRESH_MIN_SECONDS`;
+- at most `LIST_REFRESH_CHURN_LOW` — it doubles, up to
+  `LIST_REFRESH_MAX_SECONDS`, so a quiet bucket backs off exponentially;
+- in between — it holds. The dead band keeps a write or two per interval
+  from collapsing it: an upload an hour is not a busy bucket.
+
+The app's own uploads and deletes are written through to both snapshots, so
+only changes made outside the app count as churn. A written-through row's
+mtime is the app's, though — a HEAD's whole-second Last-Modified or the local
+clock — never the millisecond timestamp the next scan lists, so the mtime of
+a key written through since the last scan is not compared. The interval is
+kept as a power-of-two multiple of `LIST_CACHE_TTL_SECONDS`, which stays the
+starting point (and the fixed interval with `LIST_REFRESH_ADAPTIVE=false`).
+
+Per process: with a shared cache (`list_shared`) each worker adapts on the
+scans it runs itself. `refresh_schedule()` is exported on `/metrics`.
+"""
+
+import logging
+from threading import Lock
+from typing import NamedTuple
+
+from app.config import settings
+from app.repo.list_snapshot import ListingSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshSchedule(NamedTuple):
+    interval_seconds: float  # how long a root snapshot is fresh for now
+    last_changes: int  # objects added, removed or changed at the last refresh
+    churn_per_second: float  # last_changes over the time between the two scans
+
+
+_lock = Lock()  # guards the globals below
+_scale = 1.0  # the interval, as a multiple of LIST_CACHE_TTL_SECONDS
+_last_changes = 0
+_churn = 0.0
+
+
+def _bounds(base: float) -> tuple[float, float]:
+    # A TTL set outside the bounds widens them, so the setting is always reachable.
+    return (min(settings.list_refresh_min_seconds, base),
+            max(settings.list_refresh_max_seconds, base))
+
+
+def interval() -> float:
+    """Seconds a root snapshot stays fresh. Read per call: tests and env
+    overrides change the settings."""
+    base = float(settings.list_cache_ttl_seconds)
+    if not settings.list_refresh_adaptive:
+        return base
+    low, high = _bounds(base)
+    return min(max(base * _scale, low), high)
+
+
+def observe(previous: ListingSnapshot, current: ListingSnapshot, elapsed: float) -> int:
+    """Adapt the interval to a refresh: `current` replaced `previous`, scanned
+    `elapsed` seconds apart. Returns the number of changes found."""
+    global _scale, _last_changes, _churn
+    changes = count_changes(previous, current)
+    base = float(settings.list_cache_ttl_seconds)
+    with _lock:
+        _last_changes = changes
+        _churn = changes / elapsed if elapsed > 0 else 0.0
+        if base > 0:
+            low, high = _bounds(base)
+            if _churn >= settings.list_refresh_churn_high:
+                scale = _scale / 2
+            elif _churn <= settings.list_refresh_churn_low:
+                scale = _scale * 2
+            else:
+                scale = _scale
+            _scale = min(max(scale, low / base), high / base)
+    logger.info("Listing refresh found %d changes; next refresh in %.0fs", changes, interval())
+    return changes
+
+
+def refresh_schedule() -> RefreshSchedule:
+    with _lock:
+        last_changes, churn = _last_changes, _churn
+    return RefreshSchedule(interval(), last_changes, churn)
+
+
+def count_changes(previous: ListingSnapshot, current: ListingSnapshot) -> int:
+    """Objects added, removed, or with a new size or LastModified.
+
+    Two scans of an unchanged bucket are byte-identical, so the common quiet
+    case is a handful of C-level column comparisons. Otherwise an O(n) merge of
+    the two key-sorted listings, on the raw UTF-8 keys (same order, no decode).
+    Keys `previous` had written through (`patch_snapshot`) are compared by
+    size only: their mtime was never B2's.
+    """
+    if previous is current:
+        return 0
+    written = previous.memoized("written") or frozenset()
+    old = previous.segment(0, len(previous))
+    new = current.segment(0, len(current))
+    if (previous.blob == current.blob and old.starts == new.starts and old.lengths == new.lengths
+            and old.sizes == new.sizes and old.mtimes == new.mtimes):
+        return 0
+    old_blob, new_blob = previous.blob, current.blob
+    i = j = changes = 0
+    n, m = len(previous), len(current)
+    while i < n and j < m:
+        a = old_blob[old.starts[i] : old.starts[i] + old.lengths[i]]
+        b = new_blob[new.starts[j] : new.starts[j] + new.lengths[j]]
+        if a == b:
+            if old.sizes[i] != new.sizes[j] or (
+                old.mtimes[i] != new.mtimes[j] and a.decode("utf-8") not in written
+            ):
+                changes += 1
+            i += 1
+            j += 1
+        elif a < b:
+            changes += 1  # removed
+            i += 1
+        else:
+            changes += 1  # added
+            j += 1
+    return changes + (n - i) + (m - j)
+
+
+def _reset_state() -> None:
+    """Test helper: back to the configured TTL, no observations."""
+    global _scale, _last_changes, _churn
+    with _lock:
+        _scale, _last_changes, _churn = 1.0, 0, 0.0
@@ -0,0 +1,276 @@
+"""Filename search over a `ListingSnapshot` (`GET /files/search`).
+
+The web app could only filter the rows `/files` had already sent, so an older
+file could not be found at all. A linear scan of the snapshot would find it,
+but costs O(bucket) per keystroke; instead each snapshot gets a `SearchIndex`:
+
+- a trigram index: every 3-character substring of each case-folded filename
+  (the key after its folder) maps to the ascending ids of the files containing
+  it, so a substring query intersects a few posting lists instead of scanning;
+- the file ids sorted by case-folded filename, so a prefix query is a bisect;
+- the file ids sorted by folder, then case-folded filename, so the files
+  directly in a folder whose name starts with a prefix are one bisected run.
+
+Folders are not indexed per file: a bucket has far fewer folders than files,
+so the query is matched against the interned folder strings, and the files
+under a matching folder are one `prefix_range` of the snapshot. A query with a
+`/` also matches across the last one (folder ends with the part before it,
+filename starts with the rest): a bisect of the folder-then-filename order,
+since a folder's direct files are not contiguous in key order (`a/b.txt`,
+`a/b/c.txt`, `a/c.txt`).
+
+Results are ranked in tiers — the filename starts with the query, then it
+contains it, then only the folder path does — and each tier is produced
+lazily, so a query stops as soon as it has `limit` results. Substring matches
+need at least 3 characters; shorter queries match filename prefixes and
+folders.
+
+A file id ("doc") is the file's offset order in the key buffer, not its row. A
+write-through patch (`list_builder.patch_snapshot`) keeps every untouched key's
+buffer offset and appends new keys at the end, so the patched snapshot's index
+is the previous one plus the new keys (`carry`), in O(changes) Python work plus
+three O(n) array copies — not a rebuild. Replaced and deleted keys are marked
+dead until a full scan's snapshot builds a fresh index. The scan builds it
+(in the refresh thread, before the snapshot is served) once the snapshot it
+replaces had one; until the bucket's first search, none is built at all, so
+`/files` reads that never search don't wait on it. That first search builds
+it, under a lock so concurrent ones wait for that build rather than repeat it.
+
+Memory: ~85 bytes per object on top of the snapshot's ~50, nearly all of it
+the posting lists (one 4-byte id per distinct trigram of each filename).
+`benchmarks/bench_search.py` measures build and query times.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, insort
+from collections.abc import Callable, Iterable, Iterator
+from itertools import chain, islice
+from threading import Lock
+
+from app.repo.list_snapshot import ListingSnapshot
+
+_GRAM = 3
+
+
+def _name(key: str) -> str:
+    """Case-folded filename: what the index and every tier match against."""
+    return key[key.rfind("/") + 1 :].casefold()
+
+
+def _grams(text: str) -> set[str]:
+    return {text[i : i + _GRAM] for i in range(len(text) - _GRAM + 1)}
+
+
+class SearchIndex:
+    """The index of one snapshot. A patched view shares the append-only arrays
+    with the view it extends, which only ever reads docs below its `count`."""
+
+    __slots__ = ("_blob", "count", "dead", "grams", "lengths", "names", "paths", "starts")
+
+    def __init__(self, blob: bytes, starts: array, lengths: array,
+                 grams: dict[str, array], names: array, paths: array, dead: bytearray):
+        self._blob = blob
+        self.starts = starts  # doc -> key buffer offset, ascending
+        self.lengths = lengths  # doc -> key length in bytes
+        self.grams = grams  # trigram -> ascending docs
+        self.names = names  # docs ordered by case-folded filename
+        self.paths = paths  # docs ordered by folder, then case-folded filename
+        self.dead = dead  # doc -> 1 once no row points at it
+        self.count = len(dead)
+
+    @classmethod
+    def build(cls, snapshot: ListingSnapshot) -> SearchIndex:
+        """O(total filename length); see the module docstring for when."""
+        segment = snapshot.segment(0, len(snapshot))
+        rows = sorted(range(len(snapshot)), key=segment.starts.__getitem__)
+        # Appends past 4 GiB of keys would overflow "I": size for the blob's
+        # headroom. S3 keys are at most 1024 bytes.
+        code = "I" if len(snapshot.blob) < 2**31 else "Q"
+        starts = array(code, (segment.starts[i] for i in rows))
+        lengths = array("H", (segment.lengths[i] for i in rows))
+        index = cls(snapshot.blob, starts, lengths, {}, array("I"), array("I"),
+                    bytearray(len(rows)))
+        paths = [index.path(doc) for doc in range(index.count)]
+        for doc, (_, name) in enumerate(paths):
+            index._post(doc, name)
+        docs = range(index.count)
+        index.names = array("I", sorted(docs, key=lambda doc: paths[doc][1]))
+        index.paths = array("I", sorted(docs, key=paths.__getitem__))
+        return index
+
+    def _post(self, doc: int, name: str) -> None:
+        for gram in _grams(name):
+            posting = self.grams.get(gram)
+            if posting is None:
+                posting = self.grams[gram] = array("I")
+            posting.append(doc)
+
+    def key(self, doc: int) -> str:
+        start = self.starts[doc]
+        return self._blob[start : start + self.lengths[doc]].decode("utf-8")
+
+    def name(self, doc: int) -> str:
+        return _name(self.key(doc))
+
+    def path(self, doc: int) -> tuple[str, str]:
+        """`(folder, case-folded filename)`: the `paths` order."""
+        key = self.key(doc)
+        return key[: key.rfind("/") + 1], _name(key)
+
+    def _doc(self, start: int) -> int | None:
+        doc = bisect_left(self.starts, start, 0, self.count)
+        return doc if doc < self.count and self.starts[doc] == start else None
+
+    def patched(self, old: ListingSnapshot, new: ListingSnapshot,
+                changed: Iterable[str], added: Iterable[str]) -> SearchIndex | None:
+        """This index for `new`: `old` patched with `changed` keys (upserted or
+        deleted), of which `added` are upserts. None when another view already
+        extends this one — the shared arrays have moved on; rebuild instead."""
+        if self.count != len(self.starts):
+            return None
+        dead = bytearray(self.dead)
+        for key in changed:
+            row = old.find(key)
+            doc = None if row is None else self._doc(old.segment(row, row + 1).starts[0])
+            if doc is not None:
+                dead[doc] = 1
+        rows = [row for row in map(new.find, added) if row is not None]
+        fresh = sorted((seg.starts[0], seg.lengths[0]) for seg in
+                       (new.segment(row, row + 1) for row in rows))
+        for start, length in fresh:
+            self.starts.append(start)
+            self.lengths.append(length)
+            dead.append(0)
+        view = SearchIndex(new.blob, self.starts, self.lengths, self.grams,
+                           array("I", self.names), array("I", self.paths), dead)
+        for doc in range(self.count, view.count):
+            view._post(doc, view.name(doc))
+            insort(view.names, doc, key=view.name)
+            insort(view.paths, doc, key=view.path)
+        return view
+
+    def prefixed(self, q: str) -> Iterator[int]:
+        """Live docs whose filename starts with `q`, by filename."""
+        names = self.names
+        for i in range(bisect_left(names, q, key=self.name), len(names)):
+            doc = names[i]
+            if not self.name(doc).startswith(q):
+                return
+            if not self.dead[doc]:
+                yield doc
+
+    def in_folder(self, folder: str, q: str) -> Iterator[int]:
+        """Live docs directly in `folder` whose filename starts with `q`."""
+        paths = self.paths
+        for i in range(bisect_left(paths, (folder, q), key=self.path), len(paths)):
+            doc = paths[i]
+            at, name = self.path(doc)
+            if at != folder or not name.startswith(q):
+                return
+            if not self.dead[doc]:
+                yield doc
+
+    def containing(self, q: str) -> Iterator[int]:
+        """Live docs whose filename contains `q` past its start, in doc order."""
+        postings = [self.grams.get(gram) for gram in _grams(q)]
+        if not postings or None in postings:
+            return
+        # Walk the rarest gram's docs, filtered by the next rarest; the name
+        # check below is exact, so the other grams need not be consulted.
+        first, *rest = sorted(postings, key=len)
+        also = _contains(rest[0]) if rest else None
+        for doc in first:
+            if doc >= self.count:
+                return
+            if self.dead[doc] or (also is not None and not also(doc)):
+                continue
+            name = self.name(doc)
+            if q in name and not name.startswith(q):
+                yield doc
+
+
+# A posting list up to this long is probed as a set; a longer one by bisect,
+# so a common gram never costs a set build.
+_SET_PROBE = 65_536
+
+
+def _contains(posting: array) -> Callable[[int], bool]:
+    if len(posting) <= _SET_PROBE:
+        return set(posting).__contains__
+
+    def has(doc: int) -> bool:
+        i = bisect_left(posting, doc)
+        return i < len(posting) and posting[i] == doc
+
+    return has
+
+
+_build_lock = Lock()
+
+
+def search_index(snapshot: ListingSnapshot) -> SearchIndex:
+    """`SearchIndex.build` memoized on the snapshot, built at most once."""
+    index = snapshot.memoized("search")
+    if index is None:
+        with _build_lock:
+            index = snapshot.memo("search", SearchIndex.build)
+    return index
+
+
+def carry(old: ListingSnapshot, new: ListingSnapshot,
+          changed: Iterable[str], added: Iterable[str]) -> None:
+    """Give `new` (`old` patched) `old`'s index, patched — if `old` had one."""
+    index = old.memoized("search")
+    view = index.patched(old, new, changed, added) if index is not None else None
+    if view is not None:
+        new.memo("search", lambda _: view)
+
+
+def _folders(snapshot: ListingSnapshot) -> list[tuple[str, str]]:
+    """`(folder, case-folded)` in key order, once per snapshot."""
+    return snapshot.memo("search:folders",
+                         lambda s: sorted((f, f.casefold()) for f in s.folders))
+
+
+def _in_folders(snapshot: ListingSnapshot, index: SearchIndex, q: str,
+               limit: int) -> Iterator[int]:
+    """Up to `limit` rows whose folder path contains `q`, or — for a `q` with a
+    `/` — whose match straddles the last `/`. Folder by folder, in key order.
+    `limit` is enough: at most as many of them as the filename tiers found
+    repeat a row already ranked."""
+    return islice(_folder_rows(snapshot, index, q), limit)
+
+
+def _folder_rows(snapshot: ListingSnapshot, index: SearchIndex, q: str) -> Iterator[int]:
+    slash = q.rfind("/") + 1
+    head, rest = q[:slash], q[slash:]
+    covered = None  # the last folder whose whole subtree was yielded
+    for folder, folded in _folders(snapshot):
+        if covered is not None and folder.startswith(covered):
+            continue
+        if q in folded:
+            covered = folder
+            yield from range(*snapshot.prefix_range(folder))
+        elif head and folded.endswith(head):
+            for doc in index.in_folder(folder, rest):
+                yield snapshot.find(index.key(doc))
+
+
+def search(snapshot: ListingSnapshot, query: str, limit: int) -> list[int]:
+    """Rows of root `snapshot` matching `query` (case-insensitive), best first."""
+    q = query.casefold()
+    index = search_index(snapshot)
+    named = (snapshot.find(index.key(doc))
+             for doc in chain(index.prefixed(q), index.containing(q)))
+    rows: list[int] = []
+    seen: set[int] = set()
+    for row in chain(named, _in_folders(snapshot, index, q, limit)):
+        if row is not None and row not in seen:
+            seen.add(row)
+            rows.append(row)
+            if len(rows) == limit:
+                break
+    return rows
+
@@ -0,0 +1,193 @@
+"""One root listing shared by every worker process on a host.
+
+`uvicorn --workers N` (or gunicorn) runs N processes, and each used to keep its
+own listing cache: N cold scans of the same bucket after a deploy, N refreshes
+per TTL, and an upload through one worker invisible to the others until their
+next scan. With `LIST_SHARED_CACHE` the workers share the persisted snapshot
+file (`list_store`) instead:
+
+- **Single-flight across processes.** A root scan runs under an exclusive
+  `flock` on `<snapshot>.scan.lock`, so exactly one worker scans; the others
+  block on the lock and, once it is theirs, adopt the winner's file instead of
+  scanning again.
+- **One generation.** Every write — a finished scan, or an upload/delete
+  patch — happens under a short `flock` on `<snapshot>.lock` and takes the
+  next generation after the newest any worker has written, so generations are
+  comparable across processes.
+- **Writes without rewriting the file.** A scan replaces the snapshot file; an
+  upload or delete only appends its delta to the journal `<snapshot>.deltas`.
+  Each read checks both with a `stat` and catches up: a replaced file is loaded
+  (by `mmap`, see `list_store`), newer journal entries are patched on. A scan
+  replays the entries written while it ran, then starts a fresh journal.
+
+Sharing is by file on purpose: no external service, and it degrades like the
+snapshot file does — an unreadable file or journal costs a scan, never a
+request. Same host only (advisory locks on a local filesystem); POSIX only
+(`fcntl`), elsewhere the setting is ignored. Disabled, every function here is a
+cheap no-op and each process keeps its own cache.
+"""
+
+import contextlib
+import json
+import logging
+import os
+from collections.abc import Iterator
+from pathlib import Path
+from threading import Lock
+
+from app.config import settings
+from app.repo import list_store
+from app.repo.list_builder import Delta, patch_snapshot
+from app.repo.list_snapshot import ListingSnapshot
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so no sharing
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_lock = Lock()  # guards the two globals below
+_file_seen: tuple[int, int, int] | None = None  # (inode, mtime ns, size) last loaded/written
+_journal_seen: tuple[int, int] = (0, 0)  # (inode, bytes consumed) of the journal
+
+
+def enabled() -> bool:
+    return bool(settings.list_shared_cache and settings.list_snapshot_file and fcntl)
+
+
+def _sibling(suffix: str) -> Path:
+    path = list_store.snapshot_path()
+    assert path is not None  # enabled() checked
+    return path.with_name(path.name + suffix)
+
+
+def _signature(path: Path) -> tuple[int, int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+@contextlib.contextmanager
+def _flock(suffix: str) -> Iterator[None]:
+    path = _sibling(suffix)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)  # released when the file closes
+        yield
+
+
+@contextlib.contextmanager
+def scan_lock() -> Iterator[None]:
+    """Held for a whole root scan: one scanning worker per host."""
+    if not enabled():
+        yield
+        return
+    with _flock(".scan.lock"):
+        yield
+
+
+@contextlib.contextmanager
+def write_lock() -> Iterator[int]:
+    """Held around a write; yields the newest generation any worker has written
+    (the floor for the next one) — 0 when sharing is off."""
+    if not enabled():
+        yield 0
+        return
+    with _flock(".lock"):
+        journal = _read_journal(0)[0]
+        yield max([list_store.read_generation()] + [generation for generation, _ in journal])
+
+
+def record(generation: int, delta: Delta) -> None:
+    """Journal an upload/delete for the other workers. Under `write_lock`."""
+    if not enabled():
+        return
+    line = json.dumps([generation, delta.upserts, sorted(delta.deletes)], separators=(",", ":"))
+    try:
+        with open(_sibling(".deltas"), "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError as e:
+        logger.warning("Failed to journal a listing write: %s", e)
+
+
+def replay(listing: ListingSnapshot) -> ListingSnapshot:
+    """A finished scan with the journal patched on, in order: the writes any
+    worker made since the last published scan, some of them while this one
+    ran. Those it already saw are no-ops. Under `write_lock`."""
+    if not enabled():
+        return listing
+    for _, delta in _read_journal(0)[0]:
+        listing = patch_snapshot(listing, delta)
+    return listing
+
+
+def publish(listing: ListingSnapshot, generation: int, scanned_at: float) -> None:
+    """Persist a finished scan (`list_store.save`); shared, also start a fresh
+    journal, since the scan includes everything in it. Under `write_lock`."""
+    global _file_seen
+    list_store.save(listing, generation, scanned_at)
+    if not enabled():
+        return
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(_sibling(".deltas"))
+    with _lock:
+        _file_seen = _signature(_sibling(""))  # our own write: nothing to load
+
+
+def catch_up(current: list_store.StoredListing | None) -> list_store.StoredListing | None:
+    """The newest root listing the workers have written, if newer than
+    `current` (this process's): a replaced snapshot file with a higher
+    generation, then the journal entries past it patched on. None if nothing
+    is newer — two `stat`s when nothing changed. Never raises."""
+    global _file_seen, _journal_seen
+    if not enabled():
+        return None
+    newest = current
+    with _lock:
+        signature = _signature(_sibling(""))
+        if signature != _file_seen:
+            _file_seen, _journal_seen = signature, (0, 0)
+            stored = list_store.load()
+            if stored is not None and (newest is None or stored.generation > newest.generation):
+                newest = stored
+        inode, consumed = _journal_seen
+        deltas, _journal_seen = _read_journal(consumed, inode)
+    try:
+        for generation, delta in deltas:
+            if newest is not None and generation > newest.generation:
+                listing = patch_snapshot(newest.listing, delta)
+                newest = newest._replace(generation=generation, listing=listing)
+    except Exception:
+        logger.exception("Replaying the listing journal failed; the next scan catches up")
+    return None if newest is current else newest
+
+
+def _read_journal(consumed: int, inode: int = 0) -> tuple[list[tuple[int, Delta]], tuple[int, int]]:
+    """Journal entries after byte `consumed` of journal file `inode` (all of
+    them if it was since replaced), and the new read position."""
+    try:
+        with open(_sibling(".deltas"), "rb") as f:
+            current = os.fstat(f.fileno()).st_ino
+            if current != inode:
+                consumed = 0
+            f.seek(consumed)
+            data = f.read()
+    except FileNotFoundError:
+        return [], (0, 0)
+    except OSError as e:
+        logger.warning("Failed to read the listing journal: %s", e)
+        return [], (inode, consumed)
+    data = data[: data.rfind(b"\n") + 1]  # a line still being appended waits
+    entries = []
+    for line in data.splitlines():
+        try:
+            generation, upserts, deletes = json.loads(line)
+            delta = Delta({k: (size, ms) for k, (size, ms) in upserts.items()}, frozenset(deletes))
+        except (ValueError, TypeError) as e:
+            logger.warning("Skipping a malformed listing journal entry: %s", e)
+            continue
+        entries.append((generation, delta))
+    return entries, (current, consumed + len(data))
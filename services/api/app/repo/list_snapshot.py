@@ -0,0 +1,299 @@
+"""Columnar, read-only in-memory form of a bucket listing.
+
+The listing cache used to hold botocore's `list[dict]`: per object a dict, a
+timezone-aware datetime and several strings — several hundred bytes each, so a
+1M-object bucket did not fit a small container. `ListingSnapshot` stores the
+same facts as parallel arrays instead, one row per object in key (S3) order:
+
+- every key in one UTF-8 buffer, addressed by start-offset and length columns
+- size and LastModified (epoch milliseconds) as packed int64 columns
+- the folder as an id into one interned tuple of folder strings
+- the content type as an id per extension, into a short tuple of MIME types
+
+so an object costs ~20 bytes of columns plus its key bytes (see `nbytes` and
+`benchmarks/bench_snapshot_memory.py`). Keys are addressed by (start, length)
+rather than end offsets so a patched copy (`list_builder.patch_snapshot`) can
+reuse the buffer and every untouched offset as-is: a write is a few column
+copies, not a per-row rebase. The buffer may therefore hold bytes no row points
+at until the next full scan rebuilds it. It lives next to `list_cache` (which
+re-exports it) because `list_cache.py` is near the 300-line ceiling.
+
+Snapshots are immutable once built: readers share one without locking. They
+are built by `list_builder`. Anything derived from a snapshot (a sort order, an
+aggregate) is therefore valid for exactly as long as the snapshot itself, and is
+memoized on it (`memo`): a new generation is a new snapshot, so it starts empty.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from datetime import UTC, datetime
+from typing import Any, NamedTuple, TypeVar
+
+_BODY_HEADER = struct.Struct("<QQ4s")  # count, key bytes, index typecodes
+
+T = TypeVar("T")
+
+
+def _little_endian(column: array) -> array:
+    if sys.byteorder != "little" and column.itemsize > 1:
+        column.byteswap()
+    return column
+
+
+def epoch_ms(when: datetime) -> int:
+    """LastModified as integer epoch milliseconds (S3's own precision)."""
+    return round(when.timestamp() * 1000)
+
+
+def from_epoch_ms(ms: int) -> datetime:
+    # Integer math: `ms / 1000` through a float can land a microsecond off.
+    return datetime.fromtimestamp(ms // 1000, UTC).replace(microsecond=ms % 1000 * 1000)
+
+
+class Segment(NamedTuple):
+    """The raw columns of a run of rows. Starts index the owning snapshot's
+    key buffer; folder and content-type ids index its string tables."""
+
+    starts: array
+    lengths: array
+    sizes: array
+    mtimes: array
+    folder_ids: array
+    type_ids: array
+
+
+class _Keys(Sequence[str]):
+    """A read-only `Sequence[str]` view over a snapshot's keys (bisectable)."""
+
+    __slots__ = ("_snapshot",)
+
+    def __init__(self, snapshot: ListingSnapshot):
+        self._snapshot = snapshot
+
+    def __len__(self) -> int:
+        return len(self._snapshot)
+
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return [self._snapshot.key(j) for j in range(*i.indices(len(self)))]
+        return self._snapshot.key(i)
+
+
+class ListingSnapshot:
+    """An immutable, key-sorted listing. Index `i` addresses one object."""
+
+    __slots__ = (
+        "_blob",
+        "_complete",
+        "_folder_ids",
+        "_lengths",
+        "_memo",
+        "_mtimes",
+        "_origin",
+        "_sizes",
+        "_starts",
+        "_type_ids",
+        "content_types",
+        "folders",
+    )
+
+    def __init__(self, blob: bytes, segment: Segment, folders: tuple[str, ...],
+                 content_types: tuple[str, ...]):
+        self._blob = blob
+        (self._starts, self._lengths, self._sizes, self._mtimes,
+         self._folder_ids, self._type_ids) = segment
+        self.folders = folders
+        self.content_types = content_types
+        self._memo: dict[str, Any] = {}
+        self._origin: tuple[ListingSnapshot, int] | None = None
+        self._complete = True
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    @property
+    def blob(self) -> bytes:
+        """The shared key buffer. `segment` starts index into it."""
+        return self._blob
+
+    @property
+    def origin(self) -> tuple[ListingSnapshot, int]:
+        """`(root, offset)`: the snapshot this one was sliced from, and where
+        row 0 sits in it. A snapshot that is not a slice is its own root."""
+        return self._origin or (self, 0)
+
+    @property
+    def complete(self) -> bool:
+        """False for a partial snapshot of a scan still running (or a slice of
+        one); `len(self.origin[0])` is how many objects that scan has seen."""
+        return self.origin[0]._complete
+
+    def mark_partial(self) -> ListingSnapshot:
+        """Flag a just-built snapshot as partial (`list_progress`); returns it."""
+        self._complete = False
+        return self
+
+    def memo(self, name: str, build: Callable[[ListingSnapshot], T]) -> T:
+        """`build(self)`, computed once per snapshot (so once per generation).
+
+        Unlocked: two readers racing on a cold entry may both build it, and the
+        later one wins — harmless, since both results are equal.
+        """
+        try:
+            return self._memo[name]
+        except KeyError:
+            value = self._memo[name] = build(self)
+            return value
+
+    def memoized(self, name: str) -> Any:
+        """The `memo` value for `name` if it has been built, else None."""
+        return self._memo.get(name)
+
+    def key(self, i: int) -> str:
+        start = self._starts[i]
+        return self._blob[start : start + self._lengths[i]].decode("utf-8")
+
+    def keys(self) -> Sequence[str]:
+        return _Keys(self)
+
+    def size(self, i: int) -> int:
+        return self._sizes[i]
+
+    def mtime_ms(self, i: int) -> int:
+        return self._mtimes[i]
+
+    def uploaded_at(self, i: int) -> datetime:
+        return from_epoch_ms(self._mtimes[i])
+
+    def folder(self, i: int) -> str:
+        return self.folders[self._folder_ids[i]]
+
+    def content_type(self, i: int) -> str:
+        return self.content_types[self._type_ids[i]]
+
+    def find(self, key: str) -> int | None:
+        """The index of `key`, or None: one bisect."""
+        i = bisect_left(self.keys(), key)
+        return i if i < len(self) and self.key(i) == key else None
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.find(key) is not None
+
+    def prefix_range(self, prefix: str) -> tuple[int, int]:
+        """Index range `[lo, hi)` of the keys starting with `prefix`: two bisects."""
+        keys = self.keys()
+        lo = bisect_left(keys, prefix)
+        hi = bisect_right(keys, prefix, lo=lo, key=lambda key: key[: len(prefix)])
+        return lo, hi
+
+    def segment(self, lo: int, hi: int) -> Segment:
+        """Rows `[lo, hi)` as raw columns: slice copies, no per-row work."""
+        return Segment(
+            self._starts[lo:hi],
+            self._lengths[lo:hi],
+            self._sizes[lo:hi],
+            self._mtimes[lo:hi],
+            self._folder_ids[lo:hi],
+            self._type_ids[lo:hi],
+        )
+
+    def slice(self, lo: int, hi: int) -> ListingSnapshot:
+        """A snapshot of objects `[lo, hi)`, in O(hi - lo). Shares the key buffer
+        and string tables, and remembers its `origin`."""
+        part = ListingSnapshot(self._blob, self.segment(lo, hi), self.folders,
+                               self.content_types)
+        root, offset = self.origin
+        part._origin = (root, offset + lo)
+        return part
+
+    def with_prefix(self, prefix: str) -> ListingSnapshot:
+        """The objects under `prefix`, in O(log n + k)."""
+        return self.slice(*self.prefix_range(prefix))
+
+    @property
+    def sizes(self) -> array:
+        """The size column. Shared — treat as read-only."""
+        return self._sizes
+
+    @property
+    def mtimes(self) -> array:
+        """The LastModified column (epoch ms). Shared — treat as read-only."""
+        return self._mtimes
+
+    @property
+    def type_ids(self) -> array:
+        """The content-type id column (into `content_types`). Shared — read-only."""
+        return self._type_ids
+
+    def rows(self, indices: Iterable[int] | None = None) -> Iterator[tuple]:
+        """Yield `(key, folder, size, mtime_ms, content_type)` per object."""
+        blob, starts, lengths = self._blob, self._starts, self._lengths
+        folders, fids = self.folders, self._folder_ids
+        types, tids = self.content_types, self._type_ids
+        for i in range(len(self)) if indices is None else indices:
+            start = starts[i]
+            yield (
+                blob[start : start + lengths[i]].decode("utf-8"),
+                folders[fids[i]],
+                self._sizes[i],
+                self._mtimes[i],
+                types[tids[i]],
+            )
+
+    def _columns(self) -> tuple[array, ...]:
+        return (self._sizes, self._mtimes, self._starts, self._lengths,
+                self._folder_ids, self._type_ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Resident bytes: every column, the key buffer and the interned strings."""
+        return (
+            sys.getsizeof(self._blob)
+            + sum(sys.getsizeof(c) for c in self._columns())
+            + sum(sys.getsizeof(s) for s in (*self.folders, *self.content_types))
+        )
+
+    @property
+    def bytes_per_object(self) -> float:
+        return self.nbytes / len(self) if len(self) else 0.0
+
+    def to_bytes(self) -> bytes:
+        """Serialize every column (little-endian) for `list_store`."""
+        columns = self._columns()
+        codes = "".join(c.typecode for c in columns[2:]).encode()
+        header = _BODY_HEADER.pack(len(self), len(self._blob), codes)
+        strings = json.dumps([self.folders, self.content_types]).encode("utf-8")
+        parts = [header, *(_little_endian(array(c.typecode, c)).tobytes() for c in columns)]
+        return b"".join([*parts, self._blob, strings])
+
+    @classmethod
+    def from_bytes(cls, data: bytes | memoryview) -> ListingSnapshot:
+        """Inverse of `to_bytes`: a few `frombytes` copies, no per-object work.
+
+        Raises ValueError (or struct.error) on malformed input.
+        """
+        view = memoryview(data)
+        count, nkey, codes = _BODY_HEADER.unpack_from(view)
+        offset = _BODY_HEADER.size
+        columns = []
+        for code in "qq" + codes.decode("ascii"):
+            column = array(code)
+            end = offset + column.itemsize * count
+            if end > len(view):
+                raise ValueError("snapshot columns are truncated")
+            column.frombytes(view[offset:end])
+            columns.append(_little_endian(column))
+            offset = end
+        blob = bytes(view[offset : offset + nkey])
+        folders, types = json.loads(bytes(view[offset + nkey :]).decode("utf-8"))
+        sizes, mtimes, starts, lengths, folder_ids, type_ids = columns
+        if len(blob) != nkey:
+            raise ValueError("snapshot key buffer is truncated")
+        segment = Segment(starts, lengths, sizes, mtimes, folder_ids, type_ids)
+        return cls(blob, segment, tuple(folders), tuple(types))
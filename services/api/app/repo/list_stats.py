@@ -0,0 +1,65 @@
+"""Aggregates over a `ListingSnapshot`, computed once per generation.
+
+`/files/stats` used to re-sum every object per request, and the activity chart
+re-materialized a `FileMetadata` per object just to bucket dates by day. Both
+now read a `ListingStats` computed in one pass over the snapshot's columns and
+memoized on it (`ListingSnapshot.memo`), so each generation pays for it once
+and every request after that is a few dict lookups: O(days), not O(n).
+
+The per-day histogram is read off the newest-first order index `/files` already
+keeps (`list_index`): with rows in LastModified order, each day is one bisect
+for where the next day starts, so it costs O(distinct days x log n) instead of
+hashing every object's day.
+
+Days are UTC calendar days, as everywhere else in the stats.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter
+from datetime import date
+from typing import NamedTuple
+
+from app.repo.list_index import order_index
+from app.repo.list_snapshot import ListingSnapshot
+
+_DAY_MS = 86_400_000
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class ListingStats(NamedTuple):
+    total_files: int
+    total_size_bytes: int
+    uploads_by_day: dict[date, int]  # UTC day of LastModified -> objects
+    files_by_content_type: dict[str, int]
+
+
+def _uploads_by_day(snapshot: ListingSnapshot) -> dict[date, int]:
+    mtimes = snapshot.mtimes
+    by_time = order_index(snapshot, "uploaded_at")
+    counts: dict[date, int] = {}
+    lo = 0
+    while lo < len(by_time):
+        day = mtimes[by_time[lo]] // _DAY_MS
+        hi = bisect_left(by_time, (day + 1) * _DAY_MS, lo=lo, key=mtimes.__getitem__)
+        counts[date.fromordinal(_EPOCH_ORDINAL + day)] = hi - lo
+        lo = hi
+    return counts
+
+
+def build_stats(snapshot: ListingSnapshot) -> ListingStats:
+    types = Counter(snapshot.type_ids)
+    return ListingStats(
+        total_files=len(snapshot),
+        total_size_bytes=sum(snapshot.sizes),
+        uploads_by_day=_uploads_by_day(snapshot),
+        files_by_content_type={
+            snapshot.content_types[tid]: n for tid, n in types.most_common()
+        },
+    )
+
+
+def listing_stats(snapshot: ListingSnapshot) -> ListingStats:
+    """`build_stats` memoized on the snapshot. Shared — treat as read-only."""
+    return snapshot.memo("stats", build_stats)
@@ -0,0 +1,147 @@
+"""On-disk snapshot of the root bucket listing, so a restart skips the cold scan.
+
+Every deploy or restart used to start with an empty listing cache, so each
+replica paid the full-bucket scan again (or watched the startup warm-up do it).
+`list_cache` now writes each root scan here and, on its first cold read (or the
+startup prewarm), loads it back and serves it as *stale* while the normal
+stale-while-revalidate refresh runs — so time-to-first-`/files` after a restart
+is a disk read, not B2 pagination.
+
+Format: one compact binary file, written atomically (tmp file + rename, like
+the download counter). A fixed header — magic, version, generation, wall-clock
+scan time, body length, CRC32 of the body — then the body of
+`ListingSnapshot.to_bytes()`: the snapshot's packed little-endian columns, its
+key buffer and its interned folder/content-type strings. Loading is a few
+`frombytes` calls with no per-object work, straight out of an `mmap` of the
+file, so a load never holds a second full copy of it. Files of an older format
+version are ignored, which costs one cold scan.
+
+With `LIST_SHARED_CACHE` the same file is also how `uvicorn --workers N` share
+one listing (`list_shared`).
+
+Best-effort on purpose: a missing, truncated, corrupt or unwritable file is
+logged and treated as "no snapshot" — it can cost a cold scan, never a request.
+Set `LIST_SNAPSHOT_FILE` empty to disable.
+"""
+
+import contextlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from pathlib import Path
+from typing import NamedTuple
+
+from app.config import settings
+from app.repo.counter import state_path
+from app.repo.list_snapshot import ListingSnapshot
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"VCSKLIST"
+_VERSION = 3
+# magic, version, generation, scanned_at, body bytes, body crc32
+_HEADER = struct.Struct("<8sHqdQI")
+
+
+class StoredListing(NamedTuple):
+    generation: int
+    scanned_at: float  # wall-clock `time.time()` of the scan
+    listing: ListingSnapshot
+
+
+def _encode(listing: ListingSnapshot, generation: int, scanned_at: float) -> bytes:
+    body = listing.to_bytes()
+    header = _HEADER.pack(
+        _MAGIC, _VERSION, generation, scanned_at, len(body), zlib.crc32(body)
+    )
+    return header + body
+
+
+def _decode(data: bytes) -> StoredListing:
+    """Parse a snapshot file. Raises ValueError on any structural problem."""
+    if len(data) < _HEADER.size:
+        raise ValueError("truncated header")
+    magic, version, generation, scanned_at, size, crc = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"unknown snapshot format {magic!r} v{version}")
+    body = memoryview(data)[_HEADER.size:]
+    if len(body) != size or zlib.crc32(body) != crc:
+        raise ValueError("snapshot body is truncated or corrupt")
+    return StoredListing(generation, scanned_at, ListingSnapshot.from_bytes(body))
+
+
+def snapshot_path() -> Path | None:
+    """The snapshot file, or None when persistence is disabled."""
+    if not settings.list_snapshot_file:
+        return None
+    return state_path(settings.list_snapshot_file)
+
+
+def save(listing: ListingSnapshot, generation: int, scanned_at: float) -> None:
+    """Atomically persist the root listing. Never raises."""
+    path = snapshot_path()
+    if path is None:
+        return
+    try:
+        data = _encode(listing, generation, scanned_at)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(
+            dir=path.parent, prefix=path.name + ".", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except Exception:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+            raise
+    except (OSError, KeyError, ValueError, AttributeError, struct.error) as e:
+        # Persistence is an optimization — a failed write costs one cold scan
+        # after the next restart, so log and move on.
+        logger.warning("Failed to persist listing snapshot: %s", e)
+
+
+def load() -> StoredListing | None:
+    """Read the persisted root listing, or None if absent/unusable. Never raises."""
+    path = snapshot_path()
+    if path is None:
+        return None
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                error = "empty file"  # mmap cannot map zero bytes
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    # Decoding copies the columns out of the map. On failure
+                    # only the message leaves the `except`, so no traceback
+                    # keeps a view into the map alive while it closes.
+                    try:
+                        return _decode(data)
+                    except (ValueError, struct.error) as e:  # incl. UnicodeDecodeError
+                        error = str(e)
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning("Failed to read listing snapshot %s: %s", path, e)
+        return None
+    logger.warning("Ignoring unreadable listing snapshot %s: %s", path, error)
+    return None
+
+
+def read_generation() -> int:
+    """The generation of the persisted listing from its header alone; 0 if
+    there is no usable file. Never raises."""
+    path = snapshot_path()
+    if path is None:
+        return 0
+    try:
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+        magic, version, generation, *_ = _HEADER.unpack(header)
+    except (OSError, struct.error):
+        return 0
+    return generation if magic == _MAGIC and version == _VERSION else 0
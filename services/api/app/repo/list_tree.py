@@ -0,0 +1,91 @@
+"""Per-folder totals over a `ListingSnapshot`, computed once per generation.
+
+The web app builds its folder tree in the browser from the flat `/files` list
+(`apps/web/src/lib/file-tree.ts`), so showing a deep bucket's structure meant
+shipping every object to the client. `GET /files/tree` answers from a
+`FolderTree` instead: for every folder, du-style totals of everything under
+it (object count, bytes, newest LastModified) and its direct subfolders.
+
+One pass over the snapshot's folder-id, size and mtime columns sums each
+folder's own objects; each folder's totals are then added to its ancestors,
+O(folders x depth) — far fewer than objects. Memoized on the snapshot like
+`list_stats`, so each generation pays for it once, and a root scan builds it
+in the scan (see `b2_listing`).
+
+Folders are the key up to its last `/`, as everywhere else; "" is the bucket.
+A folder appears only while some object is under it (S3 has no empty folders).
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import NamedTuple
+
+from app.repo.list_snapshot import ListingSnapshot, from_epoch_ms
+
+
+class FolderTotals(NamedTuple):
+    files: int  # objects anywhere under the folder
+    size_bytes: int
+    newest_uploaded_at: datetime  # the newest LastModified among them
+
+
+class FolderTree(NamedTuple):
+    totals: dict[str, FolderTotals]  # folder path ("" = bucket) -> totals
+    children: dict[str, tuple[str, ...]]  # folder -> direct subfolders, by name
+
+
+def parent(folder: str) -> str:
+    """`"a/b/"` -> `"a/"`, `"a/"` -> `""`."""
+    return folder[: folder.rfind("/", 0, len(folder) - 1) + 1]
+
+
+def folder_name(folder: str) -> str:
+    """The last segment of a folder path, without its `/` ("" for the bucket)."""
+    return folder[len(parent(folder)) : -1]
+
+
+def build_tree(snapshot: ListingSnapshot) -> FolderTree:
+    count = len(snapshot.folders)
+    # Each folder's own objects, by folder id.
+    own_files, own_sizes, own_newest = [0] * count, [0] * count, [0] * count
+    columns = snapshot.segment(0, len(snapshot))
+    for fid, size, mtime in zip(columns.folder_ids, columns.sizes, columns.mtimes, strict=True):
+        own_files[fid] += 1
+        own_sizes[fid] += size
+        if mtime > own_newest[fid]:
+            own_newest[fid] = mtime
+
+    sums: dict[str, list[int]] = {}
+    for fid, folder in enumerate(snapshot.folders):
+        if not own_files[fid]:
+            continue  # a folder every object was deleted from
+        path = folder
+        while True:
+            total = sums.setdefault(path, [0, 0, 0])
+            total[0] += own_files[fid]
+            total[1] += own_sizes[fid]
+            total[2] = max(total[2], own_newest[fid])
+            if not path:
+                break
+            path = parent(path)
+
+    subfolders: dict[str, list[str]] = {}
+    for path in sums:
+        if path:
+            subfolders.setdefault(parent(path), []).append(path)
+    return FolderTree(
+        totals={
+            path: FolderTotals(files, size, from_epoch_ms(newest))
+            for path, (files, size, newest) in sums.items()
+        },
+        children={
+            path: tuple(sorted(subs, key=lambda p: (folder_name(p).casefold(), p)))
+            for path, subs in subfolders.items()
+        },
+    )
+
+
+def folder_tree(snapshot: ListingSnapshot) -> FolderTree:
+    """`build_tree` memoized on the snapshot. Shared — treat as read-only."""
+    return snapshot.memo("tree", build_tree)
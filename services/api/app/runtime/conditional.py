@@ -0,0 +1,52 @@
+"""Conditional GETs (`ETag` / `If-None-Match`) for the listing-derived routes.
+
+The web app refetches `/files` and the stats on every window focus and poll,
+and used to get the whole JSON body back each time even when nothing had
+changed — for `/files`, up to 1000 serialized `FileMetadata` records. Those
+routes now send a strong `ETag` naming the listing version they were built
+from (`service.files.get_listing_version`) plus their query parameters, and a
+request whose `If-None-Match` carries it gets `304 Not Modified` before the
+service builds, or FastAPI serializes, anything.
+
+Responses built from a partial listing (a cold scan in progress) get no
+`ETag`: they are about to change, and clients poll them anyway.
+"""
+
+import hashlib
+
+from fastapi import Request, Response
+
+# For the `responses=` of each conditional route, so the OpenAPI contract shows it.
+NOT_MODIFIED = {304: {"description": "Not Modified: the `If-None-Match` ETag is current"}}
+
+# Revalidate on every use: the tag is cheap to check, the data is not static.
+_CACHE_CONTROL = "no-cache"
+
+
+def etag(version: str, *parts: object) -> str:
+    """A strong entity tag for the representation `parts` of listing `version`."""
+    digest = hashlib.blake2b(repr((version, *parts)).encode(), digest_size=12)
+    return f'"{digest.hexdigest()}"'
+
+
+def _matches(if_none_match: str | None, tag: str) -> bool:
+    # If-None-Match uses weak comparison: a W/ prefix doesn't matter.
+    if not if_none_match:
+        return False
+    return tag in {c.strip().removeprefix("W/") for c in if_none_match.split(",")}
+
+
+def not_modified(
+    request: Request, response: Response, version: str | None, *parts: object
+) -> Response | None:
+    """Tag `response` for listing `version` and `parts` (the query); return the
+    304 to send instead if the client already holds that representation. None
+    — answer normally — when it doesn't, or when `version` is None."""
+    if version is None:
+        return None
+    tag = etag(version, request.url.path, *parts)
+    headers = {"ETag": tag, "Cache-Control": _CACHE_CONTROL}
+    if _matches(request.headers.get("if-none-match"), tag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
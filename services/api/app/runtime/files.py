@@ -1,12 +1,19 @@
 import logging
 
-# NOTE: the B2-backed handlers below are intentionally sync `def`, not
-# `async def`. The whole call chain is blocking boto3, and an `async def`
-# handler runs directly on the event loop — a single slow bucket scan would
-# then stall every other request (Railway runs one worker). Starlette runs
-# sync handlers in its threadpool, giving real concurrency for B2 I/O.
-from fastapi import APIRouter, HTTPException
-
+# NOTE: the per-object handlers (metadata, download/preview URLs, delete) and
+# the batch presign are `async def`: their B2 calls are coroutines on one
+# pooled HTTP client (repo/b2_async.py), so a slow HEAD waits on the event
+# loop instead of holding one of the threadpool's ~40 slots. Everything else
+# here stays sync `def` on purpose — the listing reads can wait on a blocking
+# bucket scan, /detail downloads and parses a whole object, and the bulk
+# deletes wait on boto3 `DeleteObjects` calls — and an `async def` doing that
+# would stall every other request (Railway runs one worker).
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from app.runtime.conditional import NOT_MODIFIED, not_modified
+from app.runtime.listing import flag_partial_listing
+from app.service.bulk_delete import remove_files, remove_prefix
+from app.service.file_pages import CursorError
 from app.service.files import (
     FileKeyError,
     FileNotFoundServiceError,
@@ -14,16 +21,27 @@ from app.service.files import (
     get_download_url,
     get_file,
     get_file_detail,
-    get_files,
+    get_listing_version,
     get_preview_url,
     get_stats,
+    get_stats_version,
     get_upload_activity,
     remove_file,
 )
+from app.service.folders import get_folder_children, get_folder_tree_summary
+from app.service.presign import presign_batch
 from app.types import (
     DailyUploadCount,
+    DeleteBatchRequest,
+    DeleteBatchResponse,
+    DeletePrefixRequest,
+    DeletePrefixResponse,
     FileMetadata,
     FileMetadataDetail,
+    FolderChildren,
+    FolderSummary,
+    PresignBatchRequest,
+    PresignBatchResponse,
     UploadStats,
 )
 
@@ -39,9 +57,9 @@ router = APIRouter()
 # read and delete another user's files.
 
 
-def _file_url_response(key: str, *, preview: bool) -> dict[str, str]:
+async def _file_url_response(key: str, *, preview: bool) -> dict[str, str]:
     try:
-        url = get_preview_url(key) if preview else get_download_url(key)
+        url = await (get_preview_url(key) if preview else get_download_url(key))
     except FileKeyError as e:
         raise HTTPException(status_code=400, detail=e.detail) from None
     except FileNotFoundServiceError as e:
@@ -49,9 +67,9 @@ def _file_url_response(key: str, *, preview: bool) -> dict[str, str]:
     return {"url": url}
 
 
-def _file_metadata_response(key: str) -> FileMetadata:
+async def _file_metadata_response(key: str) -> FileMetadata:
     try:
-        return get_file(key)
+        return await get_file(key)
     except FileKeyError as e:
         raise HTTPException(status_code=400, detail=e.detail) from None
     except FileNotFoundServiceError as e:
@@ -73,9 +91,9 @@ def _file_detail_response(key: str) -> FileMetadataDetail:
         ) from None
 
 
-def _delete_file_response(key: str) -> dict[str, bool | str]:
+async def _delete_file_response(key: str) -> dict[str, bool | str]:
     try:
-        remove_file(key)
+        await remove_file(key)
     except FileKeyError as e:
         raise HTTPException(status_code=400, detail=e.detail) from None
     except RuntimeError:
@@ -84,40 +102,125 @@ def _delete_file_response(key: str) -> dict[str, bool | str]:
     return {"deleted": True, "key": key}
 
 
-@router.get("/files", response_model=list[FileMetadata])
-def list_files_endpoint(prefix: str = "", limit: int = 100):
+@router.get("/files/tree", response_model=FolderSummary, responses=NOT_MODIFIED)
+def folder_tree_endpoint(
+    request: Request, response: Response, prefix: str = "", depth: int = 2
+):
+    """Folder `prefix` (the bucket by default) with du-style totals — objects,
+    bytes, newest upload — and its subfolders, `depth` levels down."""
+    cached = not_modified(request, response, get_listing_version(), prefix, depth)
+    if cached is not None:
+        return cached
+    try:
+        tree = get_folder_tree_summary(prefix=prefix, depth=depth)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+    flag_partial_listing(response)
+    return tree
+
+
+@router.get("/files/children", response_model=FolderChildren)
+def folder_children_endpoint(folder: str = "", limit: int = 200, cursor: str | None = None):
+    """One level of `folder`: its subfolders and the files directly in it, up
+    to `limit` entries per page. Cheap whether or not the bucket listing is
+    cached — a cold cache lists just this level from B2."""
     try:
-        return get_files(prefix=prefix, limit=limit)
+        return get_folder_children(folder=folder, limit=limit, cursor=cursor)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from None
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=e.detail) from None
 
 
-@router.get("/files/stats", response_model=UploadStats)
-def stats_endpoint():
-    return get_stats()
+@router.get("/files/stats", response_model=UploadStats, responses=NOT_MODIFIED)
+def stats_endpoint(request: Request, response: Response):
+    cached = not_modified(request, response, get_stats_version())
+    if cached is not None:
+        return cached
+    stats = get_stats()
+    flag_partial_listing(response)
+    return stats
 
 
-@router.get("/files/stats/activity", response_model=list[DailyUploadCount])
-def upload_activity_endpoint(days: int = 7):
+@router.get(
+    "/files/stats/activity", response_model=list[DailyUploadCount], responses=NOT_MODIFIED
+)
+def upload_activity_endpoint(request: Request, response: Response, days: int = 7):
     if days < 1 or days > 90:
         raise HTTPException(status_code=400, detail="Days must be between 1 and 90")
-    return get_upload_activity(days=days)
+    cached = not_modified(request, response, get_listing_version(), days)
+    if cached is not None:
+        return cached
+    activity = get_upload_activity(days=days)
+    flag_partial_listing(response)
+    return activity
+
+
+@router.post("/files/presign-batch", response_model=PresignBatchResponse)
+async def presign_batch_endpoint(req: PresignBatchRequest):
+    """Presigned URLs for up to 100 keys in one request (one rate-limit hit).
+
+    Existence is read from the cached listing rather than a HEAD per key, and
+    the URLs are signed locally. Keys with no object come back in `missing`;
+    `attachment` URLs count as downloads.
+    """
+    try:
+        return await presign_batch(req.keys, req.disposition)
+    except FileKeyError as e:
+        raise HTTPException(status_code=400, detail=e.detail) from None
+
+
+@router.post("/files/delete-batch", response_model=DeleteBatchResponse)
+def delete_batch_endpoint(req: DeleteBatchRequest):
+    """Delete up to 10,000 keys in one request (one rate-limit hit).
+
+    B2 is sent up to 1000 keys per call, several calls at once. Keys B2
+    refused come back in `errors`; a key with no object counts as deleted.
+    """
+    try:
+        result = remove_files(req.keys)
+    except FileKeyError as e:
+        raise HTTPException(status_code=400, detail=e.detail) from None
+    logger.info("Files deleted: count=%d errors=%d", len(result.deleted), len(result.errors))
+    return result
+
+
+@router.post("/files/delete-prefix", response_model=DeletePrefixResponse)
+def delete_prefix_endpoint(req: DeletePrefixRequest):
+    """Delete every object under `prefix` — a folder, or the bucket for `""`
+    (only with `confirm` set to the bucket name).
+
+    The keys are listed fresh from B2 and deleted a page at a time, so this
+    also removes objects the cached listing hasn't seen yet. Answers with
+    counts, and the first 10,000 errors, rather than every deleted key.
+    """
+    try:
+        result = remove_prefix(req.prefix, req.confirm)
+    except FileKeyError as e:
+        raise HTTPException(status_code=400, detail=e.detail) from None
+    except RuntimeError:
+        raise HTTPException(status_code=500, detail="Failed to delete files") from None
+    logger.info(
+        "Prefix deleted: prefix=%s count=%d errors=%d",
+        req.prefix, result.deleted, result.failed,
+    )
+    return result
 
 
 @router.get("/files-by-key/download")
-def download_file_by_key_endpoint(key: str):
-    return _file_url_response(key, preview=False)
+async def download_file_by_key_endpoint(key: str):
+    return await _file_url_response(key, preview=False)
 
 
 @router.get("/files-by-key/preview")
-def preview_file_by_key_endpoint(key: str):
+async def preview_file_by_key_endpoint(key: str):
     """Return a presigned URL for inline preview. Does not count as a download."""
-    return _file_url_response(key, preview=True)
+    return await _file_url_response(key, preview=True)
 
 
 @router.get("/files-by-key/metadata", response_model=FileMetadata)
-def get_file_by_key_endpoint(key: str):
-    return _file_metadata_response(key)
+async def get_file_by_key_endpoint(key: str):
+    return await _file_metadata_response(key)
 
 
 @router.get("/files-by-key/detail", response_model=FileMetadataDetail)
@@ -132,26 +235,26 @@ def get_file_detail_by_key_endpoint(key: str):
 
 
 @router.delete("/files-by-key")
-def delete_file_by_key_endpoint(key: str):
-    return _delete_file_response(key)
+async def delete_file_by_key_endpoint(key: str):
+    return await _delete_file_response(key)
 
 
 @router.get("/files/{key:path}/download")
-def download_file_endpoint(key: str):
-    return _file_url_response(key, preview=False)
+async def download_file_endpoint(key: str):
+    return await _file_url_response(key, preview=False)
 
 
 @router.get("/files/{key:path}/preview")
-def preview_file_endpoint(key: str):
+async def preview_file_endpoint(key: str):
     """Return a presigned URL for inline preview. Does not count as a download."""
-    return _file_url_response(key, preview=True)
+    return await _file_url_response(key, preview=True)
 
 
 @router.get("/files/{key:path}", response_model=FileMetadata)
-def get_file_endpoint(key: str):
-    return _file_metadata_response(key)
+async def get_file_endpoint(key: str):
+    return await _file_metadata_response(key)
 
 
 @router.delete("/files/{key:path}")
-def delete_file_endpoint(key: str):
-    return _delete_file_response(key)
+async def delete_file_endpoint(key: str):
+    return await _delete_file_response(key)
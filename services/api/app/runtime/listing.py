@@ -0,0 +1,151 @@
+"""The file-list routes: `/files`, `/files/page` and `/files/search`.
+
+Each answers in `FileMetadata` objects by default, or projected to `fields=`
+and/or in `format=compact`, serialized straight from snapshot rows (see
+runtime/projection.py). Registered before `runtime/files.py`, whose
+`/files/{key:path}` would otherwise match `/files/page` and `/files/search`
+as object keys.
+"""
+
+# Sync `def` handlers for the same reason as runtime/files.py: the call chain
+# is blocking boto3, which must not run on the event loop.
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from app.runtime.conditional import NOT_MODIFIED, not_modified
+from app.runtime.projection import (
+    FILE_LIST_RESPONSE,
+    FILE_PAGE_RESPONSE,
+    file_list,
+    file_page,
+    parse_fields,
+)
+from app.service.file_pages import CursorError, StaleCursorError, get_files_page
+from app.service.files import (
+    by_key,
+    find_files,
+    get_files,
+    get_listing_progress,
+    get_listing_version,
+    resolve_order,
+)
+from app.types import FileSort, ListFormat, SortOrder
+
+router = APIRouter()
+
+_CURSOR_GONE = {410: {"description": "The listing changed since the cursor was issued"}}
+
+# SECURITY: unauthenticated and bucket-wide, like every route in
+# runtime/files.py — see the note there and docs/SECURITY.md.
+
+
+def flag_partial_listing(response: Response) -> None:
+    """Mark a response answered from a cold scan still in progress, so clients
+    know to poll (the first request no longer waits for the whole bucket)."""
+    scanned = get_listing_progress()
+    if scanned is not None:
+        response.headers["X-Listing-Complete"] = "false"
+        response.headers["X-Listing-Scanned-Objects"] = str(scanned)
+
+
+@router.get("/files", response_model=FILE_LIST_RESPONSE, responses=NOT_MODIFIED)
+def list_files_endpoint(
+    request: Request,
+    response: Response,
+    prefix: str = "",
+    limit: int = 100,
+    sort: FileSort = "uploaded_at",
+    order: SortOrder | None = None,
+    fields: str | None = None,
+    format: ListFormat = "objects",
+):
+    """Up to `limit` files under `prefix`, by `sort`.
+
+    `order` defaults to `desc` for `uploaded_at` and `size`, `asc` for `name`
+    (the filename, case-insensitive) and `key` (the whole key, byte order).
+    `sort=key` ascending is B2's own order, so before the first bucket scan
+    finishes it is answered by a single B2 request, complete, not partial.
+    `fields` (comma-separated) keeps only those `FileMetadata` fields;
+    `format=compact` sends `{columns, rows}` instead of one object per file.
+    During the first bucket scan the result covers only the objects listed so
+    far, flagged by `X-Listing-Complete: false` and `X-Listing-Scanned-Objects`.
+    Otherwise it carries an `ETag`; send it back in `If-None-Match` for a 304.
+    """
+    columns = parse_fields(fields)
+    version = get_listing_version(prefix, wait=not by_key(sort, resolve_order(sort, order)))
+    cached = not_modified(request, response, version, prefix, limit, sort, order, columns, format)
+    if cached is not None:
+        return cached
+    try:
+        files = get_files(prefix=prefix, limit=limit, sort=sort, order=order)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+    flag_partial_listing(response)
+    return file_list(response, files, columns, format)
+
+
+@router.get(
+    "/files/page",
+    response_model=FILE_PAGE_RESPONSE,
+    responses={**NOT_MODIFIED, **_CURSOR_GONE},
+)
+def list_files_page_endpoint(
+    request: Request,
+    response: Response,
+    prefix: str = "",
+    limit: int = 100,
+    sort: FileSort = "uploaded_at",
+    order: SortOrder | None = None,
+    cursor: str | None = None,
+    fields: str | None = None,
+    format: ListFormat = "objects",
+):
+    """`/files` a page at a time: the first `limit` files, then the next
+    `limit` after each `next_cursor` (sent back with the same query).
+
+    A cursor is tied to the listing it was issued from; once an upload, delete
+    or rescan changes that listing it gets `410 Gone` — restart without one.
+    Except for `sort=key` ascending: its cursor is the last key served, so it
+    never goes stale, and each page is one B2 request on a cold cache.
+    `fields` and `format` work as on `/files`.
+    """
+    columns = parse_fields(fields)
+    version = get_listing_version(prefix, wait=not by_key(sort, resolve_order(sort, order)))
+    cached = not_modified(
+        request, response, version, prefix, limit, sort, order, cursor, columns, format
+    )
+    if cached is not None:
+        return cached
+    try:
+        page = get_files_page(prefix=prefix, limit=limit, sort=sort, order=order, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=e.detail) from None
+    except StaleCursorError as e:
+        raise HTTPException(status_code=410, detail=e.detail) from None
+    flag_partial_listing(response)
+    return file_page(response, page.files, page.next_cursor, columns, format)
+
+
+@router.get("/files/search", response_model=FILE_LIST_RESPONSE, responses=NOT_MODIFIED)
+def search_files_endpoint(
+    request: Request,
+    response: Response,
+    q: str,
+    limit: int = 20,
+    fields: str | None = None,
+    format: ListFormat = "objects",
+):
+    """Up to `limit` files whose key contains `q` (case-insensitive), best
+    first: filename starts with `q`, then contains it, then only the folder
+    does. Substring matches need 3+ characters. Searches the whole bucket.
+    `fields` and `format` work as on `/files`."""
+    columns = parse_fields(fields)
+    cached = not_modified(request, response, get_listing_version(), q, limit, columns, format)
+    if cached is not None:
+        return cached
+    try:
+        files = find_files(q, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+    return file_list(response, files, columns, format)
@@ -6,6 +6,7 @@ from threading import Lock
 from fastapi import APIRouter, Request, Response
 from fastapi.responses import JSONResponse
 
+from app.service.files import get_listing_refresh_schedule
 from app.types import ErrorResponse
 
 logger = logging.getLogger(__name__)
@@ -71,6 +72,17 @@ async def metrics():
         lines.append("# TYPE upload_errors_total counter")
         lines.append(f"upload_errors_total {_upload_errors}")
 
+    refresh = get_listing_refresh_schedule()
+    lines.append("# HELP listing_refresh_interval_seconds Current adaptive refresh interval of the bucket listing")
+    lines.append("# TYPE listing_refresh_interval_seconds gauge")
+    lines.append(f"listing_refresh_interval_seconds {refresh.interval_seconds:.3f}")
+    lines.append("# HELP listing_refresh_changes Objects added, removed or changed at the last refresh")
+    lines.append("# TYPE listing_refresh_changes gauge")
+    lines.append(f"listing_refresh_changes {refresh.last_changes}")
+    lines.append("# HELP listing_churn_per_second Bucket changes per second seen by the last refresh")
+    lines.append("# TYPE listing_churn_per_second gauge")
+    lines.append(f"listing_churn_per_second {refresh.churn_per_second:.6f}")
+
     return Response(content="\n".join(lines) + "\n", media_type="text/plain")
 
 
@@ -0,0 +1,88 @@
+"""Encoding the file-list routes' bodies: every `FileMetadata` field or just
+`fields=`, as objects or in `format=compact`.
+
+Each `FileMetadata` in a listing carries `filename`, `folder`, `size_human`
+and `url`, all derivable from `key`/`size_bytes` on the client, and repeats
+every key name per file; at `limit=1000` that is most of the body. A client
+can ask for just the fields it renders (`fields=key,size_bytes,uploaded_at`),
+for a header row plus one value array per file (`format=compact`), or both.
+
+Every form, the default included, is built from the service's `FileRows`
+(snapshot rows, never `FileMetadata` models — see repo/list_rows.py) and
+dumped to JSON in one call here, then returned as a `Response`: FastAPI
+neither validates nor serializes it again, so each route's union
+`response_model` only documents the forms for the OpenAPI contract.
+"""
+
+from collections.abc import Sequence
+from typing import Annotated
+
+from fastapi import HTTPException, Response
+from pydantic import Field
+from pydantic_core import to_json
+
+from app.service import FileRows
+from app.types import (
+    FILE_FIELDS,
+    CompactFilePage,
+    CompactFiles,
+    FileField,
+    FileFields,
+    FileMetadata,
+    FilePage,
+    FilePageFields,
+    ListFormat,
+)
+
+# For `response_model=`: the default body first, then its projected and
+# compact forms.
+FILE_LIST_RESPONSE = Annotated[
+    list[FileMetadata] | list[FileFields] | CompactFiles, Field(union_mode="left_to_right")
+]
+FILE_PAGE_RESPONSE = Annotated[
+    FilePage | FilePageFields | CompactFilePage, Field(union_mode="left_to_right")
+]
+
+
+def parse_fields(fields: str | None) -> tuple[FileField, ...]:
+    """The columns a request asked for, in its order — every field without
+    `fields=`. Raises a 400 for an unknown or empty field list."""
+    if fields is None:
+        return FILE_FIELDS
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in FILE_FIELDS]
+    if not names or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"fields must be a comma-separated subset of: {', '.join(FILE_FIELDS)}",
+        )
+    return names
+
+
+def _json(response: Response, body: object) -> Response:
+    # A returned Response replaces the injected one, so carry its headers
+    # (ETag, X-Listing-*) across.
+    return Response(to_json(body), media_type="application/json", headers=dict(response.headers))
+
+
+def file_list(
+    response: Response, files: FileRows, columns: Sequence[FileField], fmt: ListFormat
+) -> Response:
+    """`files` as a list of objects with `columns`, or as `CompactFiles`."""
+    if fmt == "compact":
+        return _json(response, {"columns": columns, "rows": files.values(columns)})
+    return _json(response, files.objects(columns))
+
+
+def file_page(
+    response: Response,
+    files: FileRows,
+    next_cursor: str | None,
+    columns: Sequence[FileField],
+    fmt: ListFormat,
+) -> Response:
+    """A page as `FilePage`-shaped objects with `columns`, or `CompactFilePage`."""
+    if fmt == "compact":
+        body = {"columns": columns, "rows": files.values(columns), "next_cursor": next_cursor}
+        return _json(response, body)
+    return _json(response, {"files": files.objects(columns), "next_cursor": next_cursor})
@@ -1,7 +1,6 @@
 import logging
 
 from fastapi import APIRouter, HTTPException
-from fastapi.concurrency import run_in_threadpool
 
 from app.runtime.metrics import record_upload
 from app.service.upload import UploadError, create_presigned_upload, verify_upload
@@ -26,10 +25,8 @@ async def presign_upload(req: PresignUploadRequest):
     ceiling. Size and content-type are signed into the URL (see the service).
     """
     try:
-        # generate_presigned_url does blocking (botocore) work; keep it off the
-        # event loop.
-        return await run_in_threadpool(
-            create_presigned_upload,
+        # Presigning is local CPU (no B2 round trip), so it needs no thread.
+        return create_presigned_upload(
             filename=req.filename,
             content_type=req.content_type,
             size_bytes=req.size_bytes,
@@ -44,7 +41,7 @@ async def presign_upload(req: PresignUploadRequest):
 async def verify_upload_route(req: VerifyUploadRequest):
     """Confirm an object just uploaded directly to B2 is valid and visible."""
     try:
-        result = await run_in_threadpool(verify_upload, req.key)
+        result = await verify_upload(req.key)
     except UploadError as e:
         logger.warning("Upload verification rejected: %s", e.detail)
         record_upload(success=False)
@@ -0,0 +1,5 @@
+# Row views the service layer returns, re-exported so runtime can type and
+# encode them without importing repo (runtime calls service, never repo).
+from app.repo import FileRows
+
+__all__ = ["FileRows"]
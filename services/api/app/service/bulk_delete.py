@@ -0,0 +1,49 @@
+"""Deleting many files in one call (`POST /files/delete-batch`, `/delete-prefix`).
+
+Clearing a multi-select or a folder through `DELETE /files-by-key` is one
+request, one rate-limit hit, one B2 call and one listing-cache patch per file.
+Here B2 gets up to 1000 keys per request and the cache is patched once.
+"""
+
+from app.config import settings
+from app.repo import delete_files, delete_prefix
+from app.service.files import FileKeyError, validate_key
+from app.types import MAX_DELETE_BATCH, DeleteBatchResponse, DeletePrefixResponse
+
+
+def remove_files(keys: list[str]) -> DeleteBatchResponse:
+    """Delete each of `keys`; the ones deleted and a per-key error for the rest.
+
+    Duplicates are deleted once. Raises FileKeyError if any key is invalid,
+    before anything is deleted.
+    """
+    unique = list(dict.fromkeys(keys))
+    for key in unique:
+        validate_key(key)
+    deleted, errors = delete_files(unique)
+    return DeleteBatchResponse(deleted=deleted, errors=errors)
+
+
+def remove_prefix(prefix: str, confirm: str | None = None) -> DeletePrefixResponse:
+    """Delete every file under `prefix`; `""` means the whole bucket.
+
+    A non-empty prefix must end in "/", as the folder routes require: a bare
+    `uploads` would also match `uploads-old/` and `uploads2/`. It is checked
+    like a key, so with `ALLOWED_KEY_PREFIX` set it must lie inside that
+    prefix — and the whole bucket is off limits. Otherwise the whole bucket
+    needs `confirm` to name it: one stray empty string must not wipe it.
+    Raises FileKeyError for a bad prefix or a missing confirmation, and
+    RuntimeError if B2 can't list it.
+    """
+    if prefix:
+        if not prefix.endswith("/"):
+            raise FileKeyError("Prefix must be empty or end with '/'")
+        validate_key(prefix)
+    elif settings.allowed_key_prefix:
+        raise FileKeyError()
+    elif confirm != settings.b2_bucket_name:
+        raise FileKeyError("Deleting the whole bucket needs confirm set to the bucket name")
+    deleted, errors = delete_prefix(prefix)
+    return DeletePrefixResponse(
+        deleted=len(deleted), failed=len(errors), errors=errors[:MAX_DELETE_BATCH]
+    )
@@ -0,0 +1,118 @@
+"""Cursor pagination over the file listing (`GET /files/page`).
+
+`GET /files` caps out at 1000 rows, so a client wanting the rest of a large
+bucket had nothing to ask for. A page here is a slice of the listing's
+precomputed order index (`repo.list_index.page`): the cursor records where the
+previous page stopped in that index, so each page costs O(page size) rather
+than re-sorting, or re-walking, everything before it.
+
+The cursor is opaque to clients: URL-safe base64 of the listing version it was
+cut from, the query it belongs to, and the index position. A position only
+means something against the snapshot it came from — after a rescan or any
+upload/delete rows shift — so a cursor from an older version is refused with
+`StaleCursorError` (410) and the client restarts from the first page instead
+of silently skipping or repeating files.
+
+`sort=key&order=asc` is the exception: its cursor holds the last key served,
+not a position, and the next page is the keys after it — one B2 request with
+`StartAfter` on a cold cache (`list_files_after`). That stays well defined
+across writes and rescans, so such a cursor never goes stale.
+"""
+
+import base64
+import binascii
+import json
+from typing import NamedTuple
+
+from app.repo import FileRows, list_files_after, list_files_page
+from app.service.files import by_key, resolve_order
+from app.types import FileSort, SortOrder
+
+
+class CursorError(Exception):
+    """Raised when a cursor is malformed or belongs to a different query."""
+
+    def __init__(self, detail: str = "Invalid cursor"):
+        self.detail = detail
+        super().__init__(detail)
+
+
+class StaleCursorError(Exception):
+    """Raised when the listing changed since the cursor was issued."""
+
+    def __init__(self, detail: str = "Listing changed; restart from the first page"):
+        self.detail = detail
+        super().__init__(detail)
+
+
+class FileRowsPage(NamedTuple):
+    """A `FilePage` before serialization: its files are still snapshot rows."""
+
+    files: FileRows
+    next_cursor: str | None = None
+
+
+def encode_cursor(fields: list) -> str:
+    """An opaque cursor carrying JSON-serializable `fields`."""
+    raw = json.dumps(fields, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> list:
+    """The fields `encode_cursor` packed. Raises CursorError if it didn't."""
+    try:
+        fields = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise CursorError() from None
+    if not isinstance(fields, list):
+        raise CursorError()
+    return fields
+
+
+def _decode(cursor: str, query: list, keyed: bool = False) -> tuple[str | None, int | str]:
+    """The version and position in `cursor`, which must have been issued for
+    `query` — for a `keyed` query, no version and the last key served. Raises
+    CursorError otherwise."""
+    fields = decode_cursor(cursor)
+    if len(fields) != len(query) + 2:
+        raise CursorError()
+    version, *issued_for, position = fields
+    if keyed:
+        if version is not None or not isinstance(position, str):
+            raise CursorError()
+    elif not isinstance(version, str) or type(position) is not int or position < 0:
+        raise CursorError()
+    if issued_for != query:
+        raise CursorError("Cursor does not match this query")
+    return version, position
+
+
+def get_files_page(
+    prefix: str = "",
+    limit: int = 100,
+    sort: FileSort = "uploaded_at",
+    order: SortOrder | None = None,
+    cursor: str | None = None,
+) -> FileRowsPage:
+    """A page of `get_files`' order, starting after `cursor` (the first page
+    without one). Raises ValueError (bad limit), CursorError or
+    StaleCursorError; RuntimeError on S3 failure."""
+    # SECURITY: bucket-wide like `get_files` — see docs/SECURITY.md.
+    if limit < 1 or limit > 1000:
+        raise ValueError("Limit must be between 1 and 1000")
+    resolved = resolve_order(sort, order)
+    query = [prefix, sort, resolved]
+    if by_key(sort, resolved):
+        after = _decode(cursor, query, keyed=True)[1] if cursor else None
+        files, last = list_files_after(prefix, limit, after)
+        return FileRowsPage(files, encode_cursor([None, *query, last]) if last else None)
+    expected, start = _decode(cursor, query) if cursor else (None, 0)
+    files, next_start, version = list_files_page(
+        prefix, limit, sort, resolved == "desc", start
+    )
+    if expected is not None and version != expected:
+        raise StaleCursorError()
+    # A partial listing (cold scan running) has no version to pin positions to.
+    if next_start is None or version is None:
+        return FileRowsPage(files)
+    return FileRowsPage(files, encode_cursor([version, *query, next_start]))
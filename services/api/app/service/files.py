@@ -1,22 +1,39 @@
 import logging
 import re
-from collections import defaultdict
 from datetime import UTC, datetime, timedelta
 
+import anyio
+
 from app.config import settings
 from app.repo import (
-    delete_file,
+    FileRows,
+    RefreshSchedule,
+    close_async_client,
+    delete_file_async,
+    get_daily_uploads,
     get_download_count,
     get_file_metadata,
+    get_file_metadata_async,
     get_object_bytes,
     get_presigned_url,
     get_upload_stats,
     increment_download_count,
-    list_files,
+    list_files_after,
+    list_files_sorted,
+    listing_progress,
+    listing_version,
     prewarm_listing,
+    refresh_schedule,
+    search_files,
 )
 from app.service.metadata import extract_metadata
-from app.types import FileMetadata, FileMetadataDetail, UploadStats
+from app.types import (
+    FileMetadata,
+    FileMetadataDetail,
+    FileSort,
+    SortOrder,
+    UploadStats,
+)
 from app.types.formatting import humanize_bytes
 from app.types.stats import DailyUploadCount
 
@@ -89,18 +106,89 @@ def warm_listing_cache() -> None:
     prewarm_listing()
 
 
-def get_files(prefix: str = "", limit: int = 100) -> list[FileMetadata]:
+# The order each sort means when `order` is omitted: newest and largest first,
+# names and keys A to Z.
+_DEFAULT_ORDER: dict[str, SortOrder] = {
+    "uploaded_at": "desc", "name": "asc", "size": "desc", "key": "asc"
+}
+
+
+def by_key(sort: FileSort, order: SortOrder) -> bool:
+    """Whether a listing is in S3's own order, which B2 can answer a page of
+    directly (`list_files_after`) instead of from a whole-bucket scan."""
+    return sort == "key" and order == "asc"
+
+
+def resolve_order(sort: FileSort, order: SortOrder | None) -> SortOrder:
+    """`order`, or the default for `sort` when it is omitted."""
+    return order or _DEFAULT_ORDER[sort]
+
+
+def get_files(
+    prefix: str = "",
+    limit: int = 100,
+    sort: FileSort = "uploaded_at",
+    order: SortOrder | None = None,
+) -> FileRows:
     # SECURITY: this lists the whole bucket (or `prefix`) with no per-user
     # filter — see docs/SECURITY.md. A multi-tenant clone must scope this to
     # the caller's own prefixes, or users see each other's files.
     if limit < 1 or limit > 1000:
         raise ValueError("Limit must be between 1 and 1000")
-    # list_files paginates the whole prefix (not just the first 1000 keys).
-    # Sort newest-first here so the endpoint's "recent uploads" contract holds
-    # regardless of repo ordering, then slice to the requested limit.
-    files = list_files(prefix=prefix)
-    files.sort(key=lambda f: f.uploaded_at, reverse=True)
-    return files[:limit]
+    # The repo covers the whole prefix (not just the first 1000 keys) and
+    # answers from a precomputed index for `sort`, so only `limit` rows are
+    # built however large the bucket; the default is newest-first ("recent
+    # uploads"), regardless of key order.
+    resolved = resolve_order(sort, order)
+    if by_key(sort, resolved):
+        return list_files_after(prefix, limit, None)[0]
+    return list_files_sorted(prefix, limit, sort, resolved == "desc")
+
+
+_MAX_QUERY_LENGTH = 256
+
+
+def find_files(query: str, limit: int = 20) -> FileRows:
+    """Files whose key contains `query`, case-insensitively, best match first:
+    filename prefix matches, then filename substrings, then folder matches."""
+    # SECURITY: bucket-wide like `get_files` — see docs/SECURITY.md.
+    query = query.strip()
+    if not query:
+        raise ValueError("Query must not be empty")
+    if len(query) > _MAX_QUERY_LENGTH:
+        raise ValueError(f"Query must be at most {_MAX_QUERY_LENGTH} characters")
+    if limit < 1 or limit > 100:
+        raise ValueError("Limit must be between 1 and 100")
+    return search_files(query, limit)
+
+
+def get_listing_progress() -> int | None:
+    """None if the listings this request read were complete; else the number of
+    objects the still-running cold scan had seen (call after the read)."""
+    return listing_progress()
+
+
+def get_listing_version(prefix: str = "", wait: bool = True) -> str | None:
+    """What the listing-derived responses for `prefix` depend on, as a token
+    for conditional requests: the listing's version and the UTC day (which
+    moves "today" and the activity window). None while no stable listing
+    exists yet — such responses are not cacheable. `wait=False` doesn't wait
+    on a cold scan to find out (see `by_key`)."""
+    version = listing_version(prefix, wait=wait)
+    if version is None:
+        return None
+    return f"{version}:{datetime.now(UTC).date().isoformat()}"
+
+
+def get_stats_version() -> str | None:
+    """`get_listing_version` for `get_stats`, which also reports downloads."""
+    version = get_listing_version()
+    return None if version is None else f"{version}:{get_download_count()}"
+
+
+def get_listing_refresh_schedule() -> RefreshSchedule:
+    """The adaptive listing refresh interval and the churn it is based on."""
+    return refresh_schedule()
 
 
 def get_stats() -> UploadStats:
@@ -109,9 +197,14 @@ def get_stats() -> UploadStats:
     return UploadStats(**data)
 
 
-def get_file(key: str) -> FileMetadata:
+async def close_storage_client() -> None:
+    """Close the pooled async B2 client (at shutdown, see `main.lifespan`)."""
+    await close_async_client()
+
+
+async def get_file(key: str) -> FileMetadata:
     validate_key(key)
-    metadata = get_file_metadata(key)
+    metadata = await get_file_metadata_async(key)
     if not metadata:
         raise FileNotFoundServiceError()
     return metadata
@@ -145,10 +238,11 @@ def get_file_detail(key: str) -> FileMetadataDetail:
     )
 
 
-def _presigned_url_for(key: str, disposition: str) -> str:
-    """Validate `key`, confirm the object exists, and presign it."""
+async def _presigned_url_for(key: str, disposition: str) -> str:
+    """Validate `key`, confirm the object exists, and presign it (signing is
+    local, so it needs no thread)."""
     validate_key(key)
-    metadata = get_file_metadata(key)
+    metadata = await get_file_metadata_async(key)
     if not metadata:
         raise FileNotFoundServiceError()
     return get_presigned_url(
@@ -156,7 +250,7 @@ def _presigned_url_for(key: str, disposition: str) -> str:
     )
 
 
-def get_preview_url(key: str) -> str:
+async def get_preview_url(key: str) -> str:
     """Return an *inline* presigned URL without recording a download.
 
     Used by the preview modal for rendering images / PDFs inline, so the URL
@@ -165,39 +259,31 @@ def get_preview_url(key: str) -> str:
     the PDF preview pane stays blank. Opening a preview is also not a
     user-initiated download, so it must not inflate the download counter.
     """
-    return _presigned_url_for(key, "inline")
+    return await _presigned_url_for(key, "inline")
 
 
-def get_download_url(key: str) -> str:
+async def get_download_url(key: str) -> str:
     """Return an *attachment* presigned URL and record it as a download."""
-    url = _presigned_url_for(key, "attachment")
-    increment_download_count()
+    url = await _presigned_url_for(key, "attachment")
+    # The counter is persisted with a file write; keep it off the event loop.
+    await anyio.to_thread.run_sync(increment_download_count)
     return url
 
 
-def remove_file(key: str) -> None:
+async def remove_file(key: str) -> None:
     """Validate key and delete the file. Raises RuntimeError on B2 failure."""
     validate_key(key)
-    delete_file(key)
+    await delete_file_async(key)
 
 
 def get_upload_activity(days: int = 7) -> list[DailyUploadCount]:
-    """Return daily upload counts for the last N days."""
-    files = list_files(prefix="")
-    today = datetime.now(UTC).date()
-    cutoff = today - timedelta(days=days - 1)
-
-    counts: dict[str, int] = defaultdict(int)
-    for f in files:
-        d = f.uploaded_at.date()
-        if d >= cutoff:
-            counts[d.isoformat()] += 1
-
-    # Fill in missing days with zero
+    """Return daily upload counts for the last N days.
+
+    O(days): one lookup per day in the listing's per-generation histogram.
+    """
+    by_day = get_daily_uploads()
+    cutoff = datetime.now(UTC).date() - timedelta(days=days - 1)
     return [
-        DailyUploadCount(
-            date=(cutoff + timedelta(days=i)).isoformat(),
-            uploads=counts.get((cutoff + timedelta(days=i)).isoformat(), 0),
-        )
-        for i in range(days)
+        DailyUploadCount(date=day.isoformat(), uploads=by_day.get(day, 0))
+        for day in (cutoff + timedelta(days=i) for i in range(days))
     ]
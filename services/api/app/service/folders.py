@@ -0,0 +1,72 @@
+"""Folder views: summaries for `GET /files/tree`, one level for `GET /files/children`.
+
+Split out of `service/files.py` to keep that module under the 300-line
+ceiling. The tree totals are computed once per listing generation in the repo
+(`repo/list_tree.py`); this only picks the requested subtree and shapes it, so
+a request costs the nodes it returns, not the objects under them. A children
+page is one bounded read (`repo.list_children`); its cursor is the last child
+returned, so unlike `/files/page` it stays valid across listing changes.
+"""
+
+from app.repo import FolderTree, folder_name, get_folder_tree, list_children
+from app.service.file_pages import CursorError, decode_cursor, encode_cursor
+from app.types import FolderChildren, FolderSummary
+from app.types.formatting import humanize_bytes
+
+_MAX_TREE_DEPTH = 16
+
+
+def _check_folder(folder: str, name: str) -> None:
+    if folder and not folder.endswith("/"):
+        raise ValueError(f"{name} must be empty or end with '/'")
+
+
+def get_folder_tree_summary(prefix: str = "", depth: int = 2) -> FolderSummary:
+    """The folder `prefix` ("" for the bucket, else ending in "/") with totals,
+    and its subfolders `depth` levels down. Read from the listing's
+    per-generation `FolderTree`. An unknown folder is returned empty. Raises
+    ValueError on a bad prefix or depth; RuntimeError on S3 failure."""
+    # SECURITY: bucket-wide like `get_files` — see docs/SECURITY.md.
+    _check_folder(prefix, "Prefix")
+    if depth < 0 or depth > _MAX_TREE_DEPTH:
+        raise ValueError(f"Depth must be between 0 and {_MAX_TREE_DEPTH}")
+    return _folder_summary(get_folder_tree(), prefix, depth)
+
+
+def _folder_summary(tree: FolderTree, path: str, depth: int) -> FolderSummary:
+    totals = tree.totals.get(path)
+    subfolders = tree.children.get(path, ())
+    size = totals.size_bytes if totals else 0
+    return FolderSummary(
+        path=path,
+        name=folder_name(path),
+        file_count=totals.files if totals else 0,
+        size_bytes=size,
+        size_human=humanize_bytes(size),
+        newest_uploaded_at=totals.newest_uploaded_at if totals else None,
+        subfolder_count=len(subfolders),
+        children=[_folder_summary(tree, sub, depth - 1) for sub in subfolders] if depth else [],
+    )
+
+
+def get_folder_children(
+    folder: str = "", limit: int = 200, cursor: str | None = None
+) -> FolderChildren:
+    """Up to `limit` immediate children of `folder` ("" for the bucket root),
+    after `cursor`. Raises ValueError (bad folder or limit), CursorError;
+    RuntimeError on S3 failure."""
+    # SECURITY: bucket-wide like `get_files` — see docs/SECURITY.md.
+    _check_folder(folder, "Folder")
+    if limit < 1 or limit > 1000:
+        raise ValueError("Limit must be between 1 and 1000")
+    after = None
+    if cursor:
+        fields = decode_cursor(cursor)
+        if len(fields) != 2 or not all(isinstance(f, str) for f in fields):
+            raise CursorError()
+        issued_for, after = fields
+        if issued_for != folder:
+            raise CursorError("Cursor does not match this query")
+    folders, files, marker = list_children(folder, after, limit)
+    next_cursor = encode_cursor([folder, marker]) if marker is not None else None
+    return FolderChildren(folder=folder, folders=folders, files=files, next_cursor=next_cursor)
@@ -4,11 +4,11 @@ from typing import NoReturn
 
 from app.config import settings
 from app.repo import (
-    delete_file,
+    add_to_listing_async,
+    delete_file_async,
     generate_presigned_upload,
-    get_file_metadata,
-    get_object_head_bytes,
-    invalidate_listing,
+    get_file_metadata_async,
+    get_object_head_bytes_async,
 )
 from app.service.files import FileKeyError, validate_key
 from app.types import FileUploadResponse, PresignUploadResponse
@@ -220,7 +220,7 @@ def create_presigned_upload(
     )
 
 
-def verify_upload(key: str) -> FileUploadResponse:
+async def verify_upload(key: str) -> FileUploadResponse:
     """Inspect an object just uploaded directly to B2 and confirm it is valid.
 
     A HEAD covers size/type; a Range-GET of the leading bytes recovers the
@@ -243,39 +243,39 @@ def verify_upload(key: str) -> FileUploadResponse:
     except FileKeyError as e:
         raise UploadError(e.detail) from None
 
-    metadata = get_file_metadata(key)  # HEAD
+    metadata = await get_file_metadata_async(key)  # HEAD
     if not metadata:
         raise UploadError("Uploaded object not found", status_code=404)
 
-    def _reject(detail: str, status_code: int) -> NoReturn:
+    async def _reject(detail: str, status_code: int) -> NoReturn:
         # The object exists but is invalid, so remove it before failing.
-        delete_file(key)
+        await delete_file_async(key)
         raise UploadError(detail, status_code=status_code)
 
     if metadata.size_bytes == 0:
-        _reject("Empty file", 400)
+        await _reject("Empty file", 400)
     if metadata.size_bytes > settings.max_file_size:
-        _reject(
+        await _reject(
             f"File too large. Max size: {humanize_bytes(settings.max_file_size)}",
             413,
         )
     if metadata.content_type not in ALLOWED_TYPES:
-        _reject(f"File type '{metadata.content_type}' not allowed", 415)
+        await _reject(f"File type '{metadata.content_type}' not allowed", 415)
     if not validate_extension_matches_type(metadata.filename, metadata.content_type):
-        _reject("File extension does not match declared content type", 415)
+        await _reject("File extension does not match declared content type", 415)
 
     # Only fetch header bytes for types that actually have a signature — text
     # and container types would just pass unconditionally, so the Range-GET is
     # pure waste on the (common) data-file upload path.
     if content_type_has_signature(metadata.content_type):
-        head = get_object_head_bytes(key, _SNIFF_BYTES)
+        head = await get_object_head_bytes_async(key, _SNIFF_BYTES)
         if head is None:
             raise UploadError("Uploaded object not found", status_code=404)
         if not matches_content_signature(head, metadata.content_type):
-            _reject("File contents do not match the declared type", 415)
+            await _reject("File contents do not match the declared type", 415)
 
-    # The browser stored the object, so the shared listing cache is now stale.
-    invalidate_listing()
+    # The browser stored the object, so the shared listing cache doesn't have it.
+    await add_to_listing_async(metadata)
     return FileUploadResponse(
         key=metadata.key,
         filename=metadata.filename,
@@ -1,5 +1,29 @@
 from app.types.errors import ErrorResponse
-from app.types.files import FileMetadata, FileMetadataDetail
+from app.types.files import (
+    FILE_FIELDS,
+    MAX_DELETE_BATCH,
+    CompactFilePage,
+    CompactFiles,
+    DeleteBatchRequest,
+    DeleteBatchResponse,
+    DeleteError,
+    DeletePrefixRequest,
+    DeletePrefixResponse,
+    Disposition,
+    FileField,
+    FileFields,
+    FileMetadata,
+    FileMetadataDetail,
+    FilePage,
+    FilePageFields,
+    FileSort,
+    FolderChildren,
+    FolderSummary,
+    ListFormat,
+    PresignBatchRequest,
+    PresignBatchResponse,
+    SortOrder,
+)
 from app.types.stats import DailyUploadCount, UploadStats
 from app.types.upload import (
     FileUploadResponse,
@@ -9,13 +33,34 @@ from app.types.upload import (
 )
 
 __all__ = [
+    "FILE_FIELDS",
+    "MAX_DELETE_BATCH",
+    "CompactFilePage",
+    "CompactFiles",
     "DailyUploadCount",
+    "DeleteBatchRequest",
+    "DeleteBatchResponse",
+    "DeleteError",
+    "DeletePrefixRequest",
+    "DeletePrefixResponse",
+    "Disposition",
     "ErrorResponse",
+    "FileField",
+    "FileFields",
     "FileMetadata",
     "FileMetadataDetail",
+    "FilePage",
+    "FilePageFields",
+    "FileSort",
     "FileUploadResponse",
+    "FolderChildren",
+    "FolderSummary",
+    "ListFormat",
+    "PresignBatchRequest",
+    "PresignBatchResponse",
     "PresignUploadRequest",
     "PresignUploadResponse",
+    "SortOrder",
     "UploadStats",
     "VerifyUploadRequest",
 ]
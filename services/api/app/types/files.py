@@ -1,6 +1,28 @@
 from datetime import datetime
+from typing import Literal, get_args
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+# `GET /files` orderings. Each is answered from a precomputed per-snapshot
+# index (see repo/list_index.py), so adding one means adding its index too.
+# `name` is the case-folded filename, as a file browser sorts; `key` is the
+# whole key in S3's own (byte) order.
+FileSort = Literal["uploaded_at", "name", "size", "key"]
+SortOrder = Literal["asc", "desc"]
+
+# `FileMetadata` fields a list route can project to with `fields=`, and the
+# encodings it can answer in (see runtime/projection.py).
+FileField = Literal[
+    "key", "filename", "folder", "size_bytes", "size_human", "content_type", "uploaded_at", "url"
+]
+FILE_FIELDS: tuple[FileField, ...] = get_args(FileField)  # in `FileMetadata` order
+ListFormat = Literal["objects", "compact"]
+
+# How a presigned GET asks B2 to serve the object: saved, or shown in place.
+Disposition = Literal["attachment", "inline"]
+MAX_PRESIGN_BATCH = 100
+# Ten `DeleteObjects` requests' worth (B2 takes at most 1000 keys per request).
+MAX_DELETE_BATCH = 10_000
 
 
 class FileMetadata(BaseModel):
@@ -14,6 +36,75 @@ class FileMetadata(BaseModel):
     url: str | None = None
 
 
+class FilePage(BaseModel):
+    """One page of `GET /files/page`. Pass `next_cursor` back as `cursor` (with
+    the same query) for the next page; None after the last one — or while the
+    first bucket scan is still running, when there is no stable order to page."""
+
+    files: list[FileMetadata]
+    next_cursor: str | None = None
+
+
+class FileFields(BaseModel):
+    """A `FileMetadata` cut down by `fields=`: only the requested keys are sent."""
+
+    key: str | None = None
+    filename: str | None = None
+    folder: str | None = None
+    size_bytes: int | None = None
+    size_human: str | None = None
+    content_type: str | None = None
+    uploaded_at: datetime | None = None
+    url: str | None = None
+
+
+class FilePageFields(BaseModel):
+    """`FilePage` with its files cut down by `fields=`."""
+
+    files: list[FileFields]
+    next_cursor: str | None = None
+
+
+class CompactFiles(BaseModel):
+    """`format=compact`: a header row naming each column once, then one array of
+    values per file in that order, instead of repeating every key per file."""
+
+    columns: list[FileField]
+    rows: list[list[str | int | datetime | None]]
+
+
+class CompactFilePage(CompactFiles):
+    """`FilePage` in `format=compact`."""
+
+    next_cursor: str | None = None
+
+
+class FolderChildren(BaseModel):
+    """One page of `GET /files/children`: a folder's immediate subfolders (full
+    paths, like S3 `CommonPrefixes`) and the files directly in it. Pass
+    `next_cursor` back as `cursor` for the next page; None after the last."""
+
+    folder: str
+    folders: list[str]
+    files: list[FileMetadata]
+    next_cursor: str | None = None
+
+
+class FolderSummary(BaseModel):
+    """A folder in `GET /files/tree`, with du-style totals of everything under
+    it. `children` stops at the requested depth; `subfolder_count` says how
+    many direct subfolders there are either way."""
+
+    path: str  # "" for the bucket root, else ends with "/"
+    name: str
+    file_count: int
+    size_bytes: int
+    size_human: str
+    newest_uploaded_at: datetime | None = None  # None for an empty folder
+    subfolder_count: int = 0
+    children: list["FolderSummary"] = []
+
+
 class FileMetadataDetail(BaseModel):
     filename: str
     size_bytes: int
@@ -40,3 +131,62 @@ class FileMetadataDetail(BaseModel):
     duration_seconds: float | None = None
     codec: str | None = None
     bitrate: int | None = None
+
+
+class PresignBatchRequest(BaseModel):
+    """Keys to presign in one `POST /files/presign-batch` call."""
+
+    keys: list[str] = Field(min_length=1, max_length=MAX_PRESIGN_BATCH)
+    disposition: Disposition = "inline"
+
+
+class PresignBatchResponse(BaseModel):
+    """A presigned URL per existing key, and the keys with no object."""
+
+    urls: dict[str, str]
+    missing: list[str]
+
+
+class DeleteBatchRequest(BaseModel):
+    """Keys to delete in one `POST /files/delete-batch` call."""
+
+    keys: list[str] = Field(min_length=1, max_length=MAX_DELETE_BATCH)
+
+
+class DeletePrefixRequest(BaseModel):
+    """Folder to empty with `POST /files/delete-prefix`.
+
+    Required, with no default: `""` deletes the whole bucket, so it has to be
+    asked for — and confirmed, with `confirm` set to the bucket's name.
+    """
+
+    prefix: str
+    confirm: str | None = None
+
+
+class DeleteError(BaseModel):
+    """A key B2 refused to delete, with its S3 error code and message."""
+
+    key: str
+    code: str
+    message: str
+
+
+class DeleteBatchResponse(BaseModel):
+    """The keys deleted, and a `DeleteError` for each one that wasn't."""
+
+    deleted: list[str]
+    errors: list[DeleteError]
+
+
+class DeletePrefixResponse(BaseModel):
+    """How many objects a prefix delete removed and how many it couldn't.
+
+    A folder can hold far more keys than a response should carry, so the
+    deleted keys are counted, not listed; `errors` holds the first
+    `MAX_DELETE_BATCH` failures.
+    """
+
+    deleted: int
+    failed: int
+    errors: list[DeleteError]
@@ -12,3 +12,8 @@ class UploadStats(BaseModel):
     total_size_human: str
     uploads_today: int
     total_downloads: int
+    # Objects per content type, most common first.
+    files_by_content_type: dict[str, int] = {}
+    # False while the first bucket scan is still running: the numbers so far
+    # cover only the objects it has listed. Poll until it turns True.
+    complete: bool = True
@@ -0,0 +1,138 @@
+"""Benchmark: metadata-route latency under load, sync handler vs. async.
+
+Runs the app under uvicorn (one worker, as Railway runs it) and the S3
+stand-in (`s3_standin.py`) each in its own process, fires `--concurrency`
+simultaneous requests at the metadata route from this one, and reports
+p50/p99/max latency over `--rounds` bursts. The stand-in holds every HEAD
+`--latency` seconds. Two shapes of the route, on the same app and middleware:
+
+- sync: the handler as it was, a `def` run in Starlette's threadpool calling
+  boto3's `head_object` — at most 40 at once (AnyIO's thread limiter);
+- async: the app's `/files-by-key/metadata` today, an `async def` awaiting
+  `get_file_metadata_async` on the pooled aiohttp session
+  (`B2_ASYNC_MAX_CONNECTIONS`, 100 by default).
+
+    cd services/api
+    .venv/bin/python benchmarks/bench_async_load.py --concurrency 500 --latency 0.1
+
+Loopback only; see docs/RELIABILITY.md ("Async object calls") for numbers.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import socket
+import statistics
+import sys
+import time
+from pathlib import Path
+
+API_ROOT = Path(__file__).resolve().parents[1]
+if str(API_ROOT) not in sys.path:
+    sys.path.insert(0, str(API_ROOT))
+
+import aiohttp  # noqa: E402
+from s3_standin import StandinS3  # noqa: E402
+
+_KEY = "uploads/bench.png"
+_ROUTES = {"sync": "/bench/sync-metadata", "async": "/files-by-key/metadata"}
+
+
+def _serve_standin(latency: float, conn) -> None:
+    with StandinS3([_KEY], latency=latency) as standin:
+        conn.send((standin.endpoint, standin.bucket))
+        conn.recv()  # until the benchmark is done
+
+
+def _serve_app(endpoint: str, bucket: str, conn) -> None:
+    import uvicorn
+
+    from app.config import settings
+    from app.repo import get_file_metadata
+    from main import app
+
+    settings.b2_endpoint, settings.b2_bucket_name = endpoint, bucket
+    settings.b2_key_id = settings.b2_application_key = "standin"
+    settings.rate_limit_per_minute = 10**9
+    settings.warm_list_cache_on_startup = False
+    logging.getLogger().setLevel(logging.ERROR)  # boto3's pool-full warnings
+
+    def sync_metadata(key: str):
+        """The metadata route's previous shape: a threadpool handler on boto3."""
+        return get_file_metadata(key)
+
+    # Same app, same middleware: only the handler differs.
+    app.add_api_route(_ROUTES["sync"], sync_metadata)
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    conn.send(f"http://127.0.0.1:{sock.getsockname()[1]}")
+    config = uvicorn.Config(app, log_level="warning", access_log=False, backlog=4096)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+async def _burst(base: str, path: str, concurrency: int) -> list[float]:
+    """One burst, after a small warm-up (connections, first-request imports)."""
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(base, connector=connector) as client:
+
+        async def timed() -> float:
+            started = time.perf_counter()
+            async with client.get(path, params={"key": _KEY}) as response:
+                await response.read()
+                response.raise_for_status()
+            return time.perf_counter() - started
+
+        await asyncio.gather(*(timed() for _ in range(10)))
+        return await asyncio.gather(*(timed() for _ in range(concurrency)))
+
+
+def _percentile(values: list[float], q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))]
+
+
+def _start(target, *args):
+    """Run `target(*args, conn)` in a child process; return it, `conn`'s other
+    end and the first thing it sends."""
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=target, args=(*args, child), daemon=True)
+    process.start()
+    return process, parent, parent.recv()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds per HEAD")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    standin, standin_conn, (endpoint, bucket) = _start(_serve_standin, args.latency)
+    server, _, base = _start(_serve_app, endpoint, bucket)
+    time.sleep(1.0)  # uvicorn startup
+    out = sys.stdout
+    out.write(
+        f"{args.concurrency} concurrent requests, {args.latency * 1000:.0f} ms per HEAD, "
+        f"{args.rounds} rounds\n\n"
+        f"{'handler':>8} {'p50':>8} {'p99':>8} {'max':>8}\n"
+    )
+    try:
+        for name, path in _ROUTES.items():
+            latencies: list[float] = []
+            for _ in range(args.rounds):
+                latencies += asyncio.run(_burst(base, path, args.concurrency))
+            out.write(
+                f"{name:>8} {statistics.median(latencies):>7.3f}s "
+                f"{_percentile(latencies, 0.99):>7.3f}s {max(latencies):>7.3f}s\n"
+            )
+    finally:
+        server.terminate()
+        standin_conn.send("done")
+        standin.join()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
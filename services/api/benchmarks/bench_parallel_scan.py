@@ -0,0 +1,83 @@
+"""Benchmark: full-bucket scan time vs. partition count.
+
+Runs `app.repo.b2_scan.scan_listing` — the code the listing cache's fetch calls
+— against the local S3 stand-in (`s3_standin.py`) through a real boto3 client,
+once per partition count, and reports wall time, list calls and speedup over
+the sequential paginator. Each count is measured twice: a *first* scan (no
+previous snapshot, boundaries from a delimiter listing) and a *warm* rescan
+(boundaries from the first scan's key quantiles), which is the steady state of
+the stale-while-revalidate refresh.
+
+    cd services/api
+    .venv/bin/python benchmarks/bench_parallel_scan.py --objects 16000 --latency 0.5
+
+`--latency` is the per-request delay; ~0.5-1.2s reproduces the measured 8-20s
+for a 16k-object B2 bucket. Loopback only — nothing leaves the machine.
+
+Expect the speedup to flatten well below the partition count: botocore spends
+~0.13s of CPU parsing each 1000-key page under the GIL, so once the round trips
+overlap, parsing is the floor. At 0.5s/request, 16k objects measured 10.6s
+sequential, 5.6s at 4 partitions and 4.9s at 8.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+API_ROOT = Path(__file__).resolve().parents[1]
+if str(API_ROOT) not in sys.path:
+    sys.path.insert(0, str(API_ROOT))
+
+from s3_standin import StandinS3, synthetic_keys  # noqa: E402
+
+from app.repo.b2_scan import scan_listing  # noqa: E402
+
+
+def _timed_scan(standin: StandinS3, client, partitions: int, previous):
+    before = standin.requests
+    started = time.perf_counter()
+    listing = scan_listing(client, standin.bucket, "", partitions, previous=previous)
+    elapsed = time.perf_counter() - started
+    return listing, elapsed, standin.requests - before
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--objects", type=int, default=16_000)
+    parser.add_argument("--folders", type=int, default=1, help="top-level folders")
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds per request")
+    parser.add_argument("--partitions", default="1,2,4,8,16,32")
+    args = parser.parse_args(argv)
+    counts = [int(p) for p in args.partitions.split(",")]
+
+    keys = synthetic_keys(args.objects, args.folders)
+    out = sys.stdout
+    out.write(
+        f"{args.objects} objects, {args.folders} top-level folder(s), "
+        f"{args.latency * 1000:.0f} ms per request\n\n"
+        f"{'partitions':>10} {'first scan':>11} {'calls':>6} "
+        f"{'warm rescan':>12} {'calls':>6} {'speedup':>8}\n"
+    )
+    baseline = None
+    with StandinS3(keys, latency=args.latency) as standin:
+        client = standin.client(max_pool_connections=max(counts) + 1)
+        for partitions in counts:
+            first, t_first, c_first = _timed_scan(standin, client, partitions, None)
+            previous = [obj["Key"] for obj in first]
+            warm, t_warm, c_warm = _timed_scan(standin, client, partitions, previous)
+            if [obj["Key"] for obj in warm] != keys or previous != keys:
+                out.write(f"partitions={partitions}: listing mismatch!\n")
+                return 1
+            baseline = baseline or t_warm
+            out.write(
+                f"{partitions:>10} {t_first:>10.2f}s {c_first:>6} "
+                f"{t_warm:>11.2f}s {c_warm:>6} {baseline / t_warm:>7.1f}x\n"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
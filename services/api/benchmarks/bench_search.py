@@ -0,0 +1,89 @@
+"""Benchmark: `/files/search` from the trigram index vs. a linear key scan.
+
+Builds a synthetic snapshot, times the search index build (paid by the
+bucket's first search, then by each rescan), then per query the indexed
+`list_search.search` against a case-folded substring scan of every key, and
+finally one write-through patch carrying the index forward.
+
+    cd services/api
+    .venv/bin/python benchmarks/bench_search.py --objects 1000000
+
+Measured at 1M objects (hex names, 20 folders): index build ~11s; queries
+0.03-1ms indexed vs ~1.5s scanned — a folder/filename query ~0.1ms, down from
+~85ms when it walked the folder's keys; a one-key write-through patch,
+carrying the index forward, ~75ms (the O(n) column copies dominate).
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+API_ROOT = Path(__file__).resolve().parents[1]
+if str(API_ROOT) not in sys.path:
+    sys.path.insert(0, str(API_ROOT))
+
+from s3_standin import synthetic_keys  # noqa: E402
+
+from app.repo.list_builder import Delta, SnapshotBuilder, patch_snapshot  # noqa: E402
+from app.repo.list_search import search, search_index  # noqa: E402
+
+
+def _ms(run, repeat: int = 5) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--objects", type=int, default=200_000)
+    parser.add_argument("--folders", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    keys = synthetic_keys(args.objects, args.folders)
+    builder = SnapshotBuilder()
+    for i, key in enumerate(keys):
+        builder.add(key, 1024 + i, 1_767_225_600_000 + i)
+    snapshot = builder.build()
+
+    started = time.perf_counter()
+    search_index(snapshot)
+    build_s = time.perf_counter() - started
+
+    sample = keys[len(keys) // 2]
+    name = sample[sample.rfind("/") + 1 :]
+    queries = {
+        "exact filename": name,
+        "filename prefix": name[:5],
+        "substring": name[3:9],
+        "common trigram": name[4:7],
+        "folder path": sample[: sample.rfind("/") + 1],
+        "folder/filename": sample[sample.rfind("/") - 2 : sample.rfind("/") + 5],
+        "no match": "zzzz",
+    }
+    sys.stdout.write(f"{args.objects} objects, index built in {build_s:.2f}s\n")
+    for label, q in queries.items():
+        indexed = _ms(lambda q=q: search(snapshot, q, args.limit))
+        scanned = _ms(lambda q=q: [k for k, *_ in snapshot.rows() if q in k.casefold()], repeat=1)
+        hits = len(search(snapshot, q, args.limit))
+        sys.stdout.write(
+            f"{label:<16} {q!r:<22} {hits:>3} hits  indexed {indexed:8.3f}ms  "
+            f"scan {scanned:8.1f}ms\n"
+        )
+
+    delta = Delta({"folder-000/benchmark-upload.bin": (1, 0)}, frozenset())
+    patch_ms = _ms(lambda: patch_snapshot(snapshot, delta), repeat=1)
+    sys.stdout.write(f"write-through patch (carries the index) {patch_ms:.0f}ms\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+"""Benchmark: resident bytes per object, dict listing vs. columnar snapshot.
+
+Builds a synthetic listing the way botocore returns it (one dict per object
+with a str key, int size and aware datetime), measures its traced allocation
+with `tracemalloc`, then converts it to a `ListingSnapshot` and measures that,
+plus the conversion time and the snapshot's own `nbytes` estimate.
+
+    cd services/api
+    .venv/bin/python benchmarks/bench_snapshot_memory.py --objects 1000000
+
+Measured at 1M objects (27-byte keys): ~340 bytes/object as dicts, ~50 as a
+snapshot — the key bytes plus ~20 bytes of columns. The conversion runs in the
+refresh thread at ~3.7s per million objects (slower here: tracemalloc is on),
+small next to botocore's ~0.13s of parsing per 1000-key page.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+API_ROOT = Path(__file__).resolve().parents[1]
+if str(API_ROOT) not in sys.path:
+    sys.path.insert(0, str(API_ROOT))
+
+from s3_standin import synthetic_keys  # noqa: E402
+
+from app.repo.list_builder import snapshot_from_objects  # noqa: E402
+
+
+def _dict_listing(keys: list[str]) -> list[dict]:
+    start = datetime(2026, 1, 1, tzinfo=UTC)
+    return [
+        {"Key": key, "Size": 1000 + i, "LastModified": start + timedelta(seconds=i)}
+        for i, key in enumerate(keys)
+    ]
+
+
+def _traced(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, after - before
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--objects", type=int, default=200_000)
+    parser.add_argument("--folders", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    # Key strings are shared by both forms, so build them outside either trace.
+    keys = sorted(synthetic_keys(args.objects, args.folders))
+    listing, dict_bytes = _traced(lambda: _dict_listing(keys))
+    started = time.perf_counter()
+    snapshot, snap_bytes = _traced(lambda: snapshot_from_objects(listing))
+    elapsed = time.perf_counter() - started
+    key_bytes = sum(sys.getsizeof(key) for key in keys)
+
+    n = args.objects
+    sys.stdout.write(
+        f"{n} objects, {args.folders} folders\n"
+        f"dict listing  {(dict_bytes + key_bytes) / n:>7.1f} bytes/object\n"
+        f"snapshot      {snap_bytes / n:>7.1f} bytes/object "
+        f"(nbytes {snapshot.bytes_per_object:.1f}), built in {elapsed:.2f}s\n"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,169 @@
+"""A local, in-process S3 stand-in for the listing benchmarks.
+
+Serves just enough of the S3 REST API for boto3 to list a bucket — path-style
+`GET /<bucket>?list-type=2` with `prefix`, `delimiter`, `start-after`,
+`continuation-token` and `max-keys` — over a synthetic sorted key set, plus a
+`HEAD /<bucket>/<key>` that finds any key, from a loopback
+`ThreadingHTTPServer`. Every response waits `latency` seconds first so
+round-trip cost (which dominates a real B2 listing) is modelled explicitly.
+
+Not a test fixture and not a B2 emulator: no auth checks, no writes.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+_NS = "http://s3.amazonaws.com/doc/2006-03-01/"
+
+
+def synthetic_keys(count: int, folders: int = 1) -> list[str]:
+    """`count` sorted keys spread across `folders` top-level folders.
+
+    Names start with a spread of characters, like real uploads do, rather than
+    a shared `file-` stem that would put every key behind one split point.
+    """
+    names = ("uploads/",) if folders <= 1 else [f"folder-{i:03d}/" for i in range(folders)]
+    return sorted(
+        f"{names[i % len(names)]}{hashlib.blake2b(str(i).encode(), digest_size=6).hexdigest()}.bin"
+        for i in range(count)
+    )
+
+
+def _contents_xml(key: str, index: int) -> str:
+    return (
+        f"<Contents><Key>{escape(key)}</Key>"
+        f"<LastModified>2026-01-{1 + index % 28:02d}T12:00:00.000Z</LastModified>"
+        f'<ETag>"{index:032x}"</ETag><Size>{1024 + index}</Size>'
+        "<StorageClass>STANDARD</StorageClass></Contents>"
+    )
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for the load benchmark's hundreds of concurrent connects.
+    request_queue_size = 1024
+
+
+class StandinS3:
+    """Owns the key set and the server thread. Use as a context manager."""
+
+    def __init__(self, keys: list[str], latency: float = 0.05, bucket: str = "bench"):
+        self.keys = sorted(keys)
+        self.latency = latency
+        self.bucket = bucket
+        self.requests = 0
+        self._lock = threading.Lock()
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, as clients pool connections
+
+            def do_HEAD(self):
+                standin.count_request()
+                self.send_response(200)
+                self.send_header("Content-Type", "image/png")
+                self.send_header("Content-Length", "1024")
+                self.send_header("Last-Modified", "Thu, 01 Jan 2026 12:00:00 GMT")
+                self.end_headers()
+
+            def do_GET(self):
+                body = standin.list_body(urlparse(self.path))
+                self.send_response(200)
+                self.send_header("Content-Type", "application/xml")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_args):
+                pass
+
+        self._server = _Server(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> StandinS3:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def count_request(self) -> None:
+        """Count a request, then wait out the modelled round trip."""
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def list_body(self, url) -> bytes:
+        """Render one ListObjectsV2 page for the request `url`."""
+        self.count_request()
+        q = {k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()}
+        prefix = q.get("prefix", "")
+        delimiter = q.get("delimiter", "")
+        max_keys = int(q.get("max-keys", "1000"))
+        after = max(q.get("continuation-token", ""), q.get("start-after", ""), prefix)
+        i = bisect.bisect_right(self.keys, after) if after else 0
+        if after == prefix:
+            i = bisect.bisect_left(self.keys, prefix)
+        elif delimiter and after.endswith(delimiter):
+            # Resuming after a rolled-up folder: skip everything inside it.
+            i = bisect.bisect_left(self.keys, after[:-1] + chr(ord(delimiter) + 1))
+
+        items: list[str] = []
+        folders: list[str] = []
+        last = ""
+        while i < len(self.keys) and len(items) + len(folders) < max_keys:
+            key = self.keys[i]
+            if not key.startswith(prefix):
+                break
+            rest = key[len(prefix):]
+            if delimiter and delimiter in rest:
+                folder = prefix + rest.split(delimiter, 1)[0] + delimiter
+                folders.append(f"<CommonPrefixes><Prefix>{escape(folder)}</Prefix></CommonPrefixes>")
+                # Skip the whole folder, like S3 does.
+                i = bisect.bisect_left(self.keys, folder[:-1] + chr(ord(delimiter) + 1))
+                last = folder
+                continue
+            items.append(_contents_xml(key, i))
+            last = key
+            i += 1
+        truncated = i < len(self.keys) and self.keys[i].startswith(prefix)
+        token = f"<NextContinuationToken>{escape(last)}</NextContinuationToken>" if truncated else ""
+        return (
+            f'<?xml version="1.0" encoding="UTF-8"?><ListBucketResult xmlns="{_NS}">'
+            f"<Name>{self.bucket}</Name><Prefix>{escape(prefix)}</Prefix>"
+            f"<KeyCount>{len(items) + len(folders)}</KeyCount><MaxKeys>{max_keys}</MaxKeys>"
+            f"<IsTruncated>{'true' if truncated else 'false'}</IsTruncated>"
+            f"{''.join(items)}{''.join(folders)}{token}</ListBucketResult>"
+        ).encode()
+
+    def client(self, max_pool_connections: int = 32):
+        """A boto3 S3 client pointed at this stand-in (dummy credentials)."""
+        import boto3
+        from botocore.config import Config
+
+        return boto3.client(
+            "s3",
+            endpoint_url=self.endpoint,
+            aws_access_key_id="standin",
+            aws_secret_access_key="standin",
+            region_name="us-west-004",
+            config=Config(
+                s3={"addressing_style": "path"},
+                max_pool_connections=max_pool_connections,
+                retries={"mode": "standard", "total_max_attempts": 1},
+            ),
+        )
@@ -23,8 +23,8 @@ from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
 from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
 
 from app.config import settings  # noqa: E402
-from app.runtime import files, health, metrics, ratelimit, upload  # noqa: E402
-from app.service.files import warm_listing_cache  # noqa: E402
+from app.runtime import files, health, listing, metrics, ratelimit, upload  # noqa: E402
+from app.service.files import close_storage_client, warm_listing_cache  # noqa: E402
 
 # --- Startup validation ---
 # Required B2 settings are declared with empty-string defaults so that
@@ -83,6 +83,7 @@ async def lifespan(_app: "FastAPI"):
     if settings.warm_list_cache_on_startup:
         warm_listing_cache()
     yield
+    await close_storage_client()
 
 # --- Structured JSON logging ---
 
@@ -169,9 +170,14 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
     allow_headers=["Content-Type", "Authorization"],
+    # Progress of a cold bucket scan, and the conditional-GET validator, on
+    # listing responses (runtime/listing.py, runtime/conditional.py).
+    expose_headers=["ETag", "X-Listing-Complete", "X-Listing-Scanned-Objects"],
 )
 
 app.include_router(health.router, tags=["health"])
 app.include_router(upload.router, tags=["upload"])
+# Before `files`: its `/files/{key:path}` would swallow `/files/page` etc.
+app.include_router(listing.router, tags=["files"])
 app.include_router(files.router, tags=["files"])
 app.include_router(metrics.router, tags=["metrics"])
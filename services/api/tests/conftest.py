@@ -37,15 +37,20 @@ async def client():
 
 
 @pytest.fixture(autouse=True)
-def clear_list_cache():
+def clear_list_cache(monkeypatch):
     """Clear the repo's bucket-listing cache before each test so cached
     listings never leak across tests (keeps the pagination tests hermetic).
 
     Uses `_reset_state()` rather than `invalidate()` so a background
     stale-while-revalidate refresh from an earlier test can't leave the prefix
-    marked as "refreshing" and suppress the next test's refresh."""
+    marked as "refreshing" and suppress the next test's refresh.
+
+    Also disables the on-disk snapshot, so no test restores a listing another
+    test (or a dev server) wrote; test_list_store.py opts back in per test."""
+    from app.config import settings
     from app.repo import list_cache
 
+    monkeypatch.setattr(settings, "list_snapshot_file", "")
     list_cache._reset_state()
     yield
 
@@ -65,11 +70,14 @@ def reset_shared_module_state():
     """Reset the remaining shared module state (B2 connectivity cache and the
     in-process metrics counters) so absolute-value assertions can't become
     order-dependent across the suite."""
-    from app.repo import b2_client
+    from app.repo import b2_client, b2_presign
     from app.runtime import metrics
 
     cached_get_s3_client = b2_client.get_s3_client
     cached_get_s3_client.cache_clear()
+    cached_get_presigner = b2_presign.get_presigner
+    cached_get_presigner.cache_clear()
+    b2_presign._bucketed_url.cache_clear()
     b2_client._health_cache = None
     with metrics._lock:
         metrics._request_count.clear()
@@ -78,6 +86,7 @@ def reset_shared_module_state():
         metrics._upload_errors = 0
     yield
     cached_get_s3_client.cache_clear()
+    cached_get_presigner.cache_clear()
 
 
 @pytest.fixture(autouse=True)
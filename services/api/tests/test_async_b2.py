@@ -0,0 +1,156 @@
+"""Tests for `repo/b2_async.py`, the per-object B2 calls without a thread.
+
+Each coroutine must send the signed request its boto3 counterpart would and
+return or raise the same things; the routes built on them must not queue
+behind the threadpool.
+"""
+
+import asyncio
+import time
+from datetime import UTC, datetime
+
+import anyio
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from botocore.exceptions import ClientError
+
+from app.config import settings
+from app.repo import b2_async, list_cache
+from app.repo.b2_presign import Presigner
+from app.repo.list_builder import snapshot_from_objects
+
+_HEADERS = {
+    "Content-Length": "2048",
+    "Content-Type": "image/png",
+    "Last-Modified": "Wed, 04 Mar 2026 12:34:56 GMT",
+}
+
+
+class _B2:
+    """A loopback server answering from `routes[(method, path)]`: a list of
+    `(status, headers, body)`, consumed one per call (the last one repeats)."""
+
+    def __init__(self):
+        self.routes: dict[tuple[str, str], list[tuple]] = {}
+        self.delay = 0.0
+        self.requests: list[dict] = []
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        self.requests.append(
+            {"path": request.path, "query": dict(request.query), "headers": dict(request.headers)}
+        )
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        responses = self.routes[(request.method, request.path)]
+        status, headers, body = responses.pop(0) if len(responses) > 1 else responses[0]
+        response = web.StreamResponse(status=status, headers=headers)
+        await response.prepare(request)
+        if body:
+            await response.write(body)
+        return response
+
+
+@pytest.fixture
+async def b2(monkeypatch):
+    fake = _B2()
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", fake.handle)
+    server = TestServer(app, host="127.0.0.1")
+    await server.start_server()
+    presigner = Presigner(str(server.make_url("")), "us-west-004", "test", "test")
+    monkeypatch.setattr(b2_async, "get_presigner", lambda: presigner)
+    monkeypatch.setattr(settings, "b2_bucket_name", "bucket")
+    monkeypatch.setattr(b2_async, "_RETRY_BASE_SECONDS", 0)
+    yield fake
+    await b2_async.close_async_client()
+    await server.close()
+
+
+async def test_metadata_is_a_signed_head(b2):
+    b2.routes[("HEAD", "/bucket/uploads/a b.png")] = [(200, _HEADERS, b"")]
+
+    metadata = await b2_async.get_file_metadata_async("uploads/a b.png")
+
+    assert (metadata.key, metadata.filename, metadata.folder) == (
+        "uploads/a b.png", "a b.png", "uploads/"
+    )
+    assert (metadata.size_bytes, metadata.content_type) == (2048, "image/png")
+    assert metadata.uploaded_at == datetime(2026, 3, 4, 12, 34, 56, tzinfo=UTC)
+    assert b2.requests[0]["query"]["X-Amz-Algorithm"] == "AWS4-HMAC-SHA256"
+
+
+async def test_metadata_of_a_missing_object_is_none_and_other_errors_raise(b2):
+    b2.routes[("HEAD", "/bucket/gone.txt")] = [(404, {}, b"")]
+    b2.routes[("HEAD", "/bucket/secret.txt")] = [(403, {}, b"")]
+
+    assert await b2_async.get_file_metadata_async("gone.txt") is None
+    with pytest.raises(ClientError) as e:
+        await b2_async.get_file_metadata_async("secret.txt")
+    assert e.value.response["Error"]["Code"] == "403"
+
+
+async def test_server_errors_are_retried(b2):
+    b2.routes[("HEAD", "/bucket/a.png")] = [(503, {}, b""), (500, {}, b""), (200, _HEADERS, b"")]
+
+    assert (await b2_async.get_file_metadata_async("a.png")).size_bytes == 2048
+    assert len(b2.requests) == 3
+
+
+async def test_delete_writes_through_to_the_listing(b2):
+    when = datetime(2026, 1, 1, tzinfo=UTC)
+    snapshot = snapshot_from_objects(
+        {"Key": k, "Size": 1, "LastModified": when} for k in ("a.txt", "b.txt")
+    )
+    list_cache.cached_listing("", lambda prefix: snapshot)
+    b2.routes[("DELETE", "/bucket/a.txt")] = [(204, {}, b"")]
+
+    await b2_async.delete_file_async("a.txt")
+
+    assert len(b2.requests) == 1
+    assert list(list_cache.cached_listing("", lambda prefix: snapshot).keys()) == ["b.txt"]
+
+
+async def test_a_failed_delete_raises_runtime_error(b2):
+    body = b"<Error><Code>AccessDenied</Code><Message>no</Message></Error>"
+    b2.routes[("DELETE", "/bucket/a.txt")] = [(403, {}, body)]
+
+    with pytest.raises(RuntimeError, match="AccessDenied"):
+        await b2_async.delete_file_async("a.txt")
+
+
+async def test_head_bytes_is_a_range_get(b2):
+    b2.routes[("GET", "/bucket/a.png")] = [(206, {}, b"\x89PNG")]
+    b2.routes[("GET", "/bucket/gone.png")] = [(404, {}, b"<Error><Code>NoSuchKey</Code></Error>")]
+
+    assert await b2_async.get_object_head_bytes_async("a.png", 4) == b"\x89PNG"
+    assert await b2_async.get_object_head_bytes_async("gone.png", 4) is None
+    assert b2.requests[0]["headers"]["Range"] == "bytes=0-3"
+
+
+async def test_close_async_client(b2):
+    session = b2_async._session()
+
+    await b2_async.close_async_client()
+
+    assert session.closed
+    assert b2_async._session() is not session
+
+
+async def test_slow_heads_do_not_queue_on_the_threadpool(b2, client):
+    """With one thread to go round, ten 200ms HEADs still overlap."""
+    b2.routes[("HEAD", "/bucket/a.png")] = [(200, _HEADERS, b"")]
+    b2.delay = 0.2
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    tokens, limiter.total_tokens = limiter.total_tokens, 1
+    try:
+        started = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.get("/files-by-key/metadata", params={"key": "a.png"}) for _ in range(10))
+        )
+        elapsed = time.perf_counter() - started
+    finally:
+        limiter.total_tokens = tokens
+
+    assert [r.status_code for r in responses] == [200] * 10
+    assert elapsed < 1.0
@@ -0,0 +1,142 @@
+"""Tests for conditional GETs on the listing routes (`runtime/conditional.py`).
+
+A client that already holds the current `/files` or stats body must get a
+bodiless 304 — without the service materializing a single `FileMetadata` —
+and any change to the listing, the query or the download count must produce a
+new tag.
+"""
+
+import threading
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.repo import b2_listing, counter, list_cache, list_progress
+from app.repo.list_builder import Delta, snapshot_from_objects
+
+
+def _objects(count: int) -> list[dict]:
+    now = datetime.now(UTC)
+    return [
+        {"Key": f"uploads/file-{i:05d}.txt", "Size": 1000 + i, "LastModified": now - timedelta(minutes=i)}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    """Serve a 1000-object bucket through the real listing cache."""
+    snapshot = snapshot_from_objects(_objects(1000))
+    monkeypatch.setattr(b2_listing, "_fetch_all_objects", lambda prefix: snapshot)
+    return snapshot
+
+
+@pytest.fixture
+def materialized(monkeypatch):
+    """Count the file rows the repo hands out."""
+    rows: list[int] = []
+    real = b2_listing.FileRows
+
+    def counting(snapshot, indices=None):
+        files = real(snapshot, indices)
+        rows.append(len(files))
+        return files
+
+    monkeypatch.setattr(b2_listing, "FileRows", counting)
+    return rows
+
+
+@pytest.mark.asyncio
+async def test_an_unchanged_listing_costs_no_body(client, bucket, materialized):
+    first = await client.get("/files?limit=1000")
+    tag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert tag.startswith('"') and not tag.startswith('W/')
+    assert first.headers["Cache-Control"] == "no-cache"
+    assert materialized == [1000]
+
+    polls = [await client.get("/files?limit=1000", headers={"If-None-Match": tag}) for _ in range(10)]
+
+    assert {r.status_code for r in polls} == {304}
+    assert all(r.headers["ETag"] == tag for r in polls)
+    sent = sum(len(r.content) for r in polls)
+    saved = len(first.content) * len(polls) - sent
+    assert sent == 0
+    assert saved > 1_000_000  # ~190 bytes of JSON per file, 1000 files, 10 polls
+    assert materialized == [1000]  # nothing built for the 304s
+
+
+@pytest.mark.asyncio
+async def test_the_tag_names_the_query(client, bucket):
+    tags = set()
+    for query in ("", "?limit=5", "?sort=name", "?sort=name&order=desc", "?prefix=uploads/"):
+        response = await client.get(f"/files{query}")
+        tags.add(response.headers["ETag"])
+    assert len(tags) == 5
+
+    other = (await client.get("/files?limit=5")).headers["ETag"]
+    response = await client.get("/files?limit=6", headers={"If-None-Match": other})
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_a_write_through_changes_the_tag(client, bucket):
+    before = await client.get("/files")
+    tag = before.headers["ETag"]
+
+    list_cache.apply(Delta({"uploads/zz-new.txt": (5, 1_900_000_000_000)}, frozenset()))
+    after = await client.get("/files", headers={"If-None-Match": tag})
+
+    assert after.status_code == 200
+    assert after.headers["ETag"] != tag
+    assert after.json()[0]["key"] == "uploads/zz-new.txt"
+
+
+@pytest.mark.asyncio
+async def test_stats_revalidate_and_track_downloads(client, bucket, monkeypatch):
+    monkeypatch.setattr(counter, "_count", 0)
+    first = await client.get("/files/stats")
+    tag = first.headers["ETag"]
+
+    again = await client.get("/files/stats", headers={"If-None-Match": f'W/{tag}, "other"'})
+    assert again.status_code == 304
+    assert again.content == b""
+
+    counter.increment_download_count()
+    changed = await client.get("/files/stats", headers={"If-None-Match": tag})
+    assert changed.status_code == 200
+    assert changed.json()["total_downloads"] == 1
+
+
+@pytest.mark.asyncio
+async def test_activity_revalidates_per_window(client, bucket):
+    week = await client.get("/files/stats/activity?days=7")
+    tag = week.headers["ETag"]
+
+    same = await client.get("/files/stats/activity?days=7", headers={"If-None-Match": tag})
+    other = await client.get("/files/stats/activity?days=30", headers={"If-None-Match": tag})
+
+    assert same.status_code == 304
+    assert other.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_partial_listings_are_not_tagged(client, monkeypatch):
+    release = threading.Event()
+    objects = _objects(3)
+
+    def gated(prefix: str):
+        with list_progress.tracking() as on_page:
+            on_page(objects[:2])
+            assert release.wait(5)
+            on_page(objects[2:])
+        return snapshot_from_objects(objects)
+
+    monkeypatch.setattr(b2_listing, "_fetch_all_objects", gated)
+    try:
+        response = await client.get("/files")
+    finally:
+        release.set()
+
+    assert response.headers["X-Listing-Complete"] == "false"
+    assert "ETag" not in response.headers
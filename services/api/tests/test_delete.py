@@ -1,6 +1,7 @@
 """Tests for file deletion error propagation."""
 
 from datetime import UTC, datetime
+from unittest.mock import AsyncMock
 
 import pytest
 
@@ -8,7 +9,7 @@ from app.service import files as files_service
 from app.types import FileMetadata
 
 
-def _fake_metadata(key: str) -> FileMetadata:
+async def _fake_metadata(key: str) -> FileMetadata:
     return FileMetadata(
         key=key,
         filename="test.txt",
@@ -23,12 +24,11 @@ def _fake_metadata(key: str) -> FileMetadata:
 
 @pytest.mark.asyncio
 async def test_delete_propagates_error(client, monkeypatch):
-    monkeypatch.setattr(files_service, "get_file_metadata", _fake_metadata)
-    monkeypatch.setattr(
-        files_service,
-        "delete_file",
-        lambda key: (_ for _ in ()).throw(RuntimeError("B2 delete failed")),
-    )
+    async def failing_delete(key):
+        raise RuntimeError("B2 delete failed")
+
+    monkeypatch.setattr(files_service, "get_file_metadata_async", _fake_metadata)
+    monkeypatch.setattr(files_service, "delete_file_async", failing_delete)
 
     response = await client.delete("/files/uploads/test.txt")
     assert response.status_code == 500
@@ -37,8 +37,8 @@ async def test_delete_propagates_error(client, monkeypatch):
 
 @pytest.mark.asyncio
 async def test_delete_success(client, monkeypatch):
-    monkeypatch.setattr(files_service, "get_file_metadata", _fake_metadata)
-    monkeypatch.setattr(files_service, "delete_file", lambda key: None)
+    monkeypatch.setattr(files_service, "get_file_metadata_async", _fake_metadata)
+    monkeypatch.setattr(files_service, "delete_file_async", AsyncMock())
 
     response = await client.delete("/files/uploads/test.txt")
     assert response.status_code == 200
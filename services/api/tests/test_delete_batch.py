@@ -0,0 +1,218 @@
+"""Tests for `POST /files/delete-batch` and `POST /files/delete-prefix`.
+
+Keys must reach B2 in `DeleteObjects` requests of at most 1000, failures must
+be reported per key, and the listing cache must be patched exactly once per
+call — not once per deleted object — with every key that was deleted.
+"""
+
+import threading
+from datetime import UTC, datetime
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app.config import settings
+from app.repo import b2_delete, list_cache
+from app.repo.list_builder import snapshot_from_objects
+
+_WHEN = datetime(2026, 3, 4, tzinfo=UTC)
+
+
+class _FakeS3:
+    """`delete_objects` / `list_objects_v2` over an in-memory key set."""
+
+    def __init__(self, keys, refuse=(), fail_chunk_with=None):
+        self.keys = sorted(keys)
+        self.refuse = set(refuse)
+        self.fail_chunk_with = fail_chunk_with
+        self.chunks: list[list[str]] = []
+        self.lock = threading.Lock()
+
+    def delete_objects(self, Bucket, Delete):
+        keys = [obj["Key"] for obj in Delete["Objects"]]
+        assert Delete["Quiet"] is True
+        with self.lock:
+            self.chunks.append(keys)
+        if self.fail_chunk_with in keys:
+            raise ClientError(
+                {"Error": {"Code": "ServiceUnavailable", "Message": "try later"}}, "DeleteObjects"
+            )
+        errors = [{"Key": k, "Code": "AccessDenied", "Message": "no"} for k in keys if k in self.refuse]
+        with self.lock:
+            gone = set(keys) - self.refuse
+            self.keys = [k for k in self.keys if k not in gone]
+        return {"Errors": errors} if errors else {}
+
+    def list_objects_v2(self, Bucket, Prefix, MaxKeys, ContinuationToken=None):
+        matching = [k for k in self.keys if k.startswith(Prefix) and k > (ContinuationToken or "")]
+        page = matching[:MaxKeys]
+        response = {"Contents": [{"Key": k} for k in page], "IsTruncated": len(matching) > MaxKeys}
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = page[-1]
+        return response
+
+
+@pytest.fixture
+def patches(monkeypatch):
+    applied = []
+    original = b2_delete._apply_to_list_cache
+
+    def apply(delta):
+        applied.append(delta)
+        original(delta)
+
+    monkeypatch.setattr(b2_delete, "_apply_to_list_cache", apply)
+    return applied
+
+
+def _use(monkeypatch, fake):
+    monkeypatch.setattr(b2_delete, "get_s3_client", lambda: fake)
+    snapshot = snapshot_from_objects(
+        {"Key": key, "Size": 1, "LastModified": _WHEN} for key in fake.keys
+    )
+    list_cache.cached_listing("", lambda prefix: snapshot)
+
+
+async def test_keys_are_deleted_in_chunks_of_1000(client, monkeypatch, patches):
+    keys = [f"uploads/{i:05}.png" for i in range(2500)]
+    fake = _FakeS3(keys)
+    _use(monkeypatch, fake)
+
+    response = await client.post("/files/delete-batch", json={"keys": keys})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert sorted(body["deleted"]) == keys
+    assert body["errors"] == []
+    assert sorted(len(chunk) for chunk in fake.chunks) == [500, 1000, 1000]
+    assert len(patches) == 1 and patches[0].deletes == frozenset(keys)
+    assert (await client.get("/files/stats")).json()["total_files"] == 0
+
+
+async def test_refused_keys_are_reported_and_stay_listed(client, monkeypatch, patches):
+    keys = ["a.txt", "b.txt", "c.txt", "a.txt"]
+    fake = _FakeS3(keys, refuse={"b.txt"})
+    _use(monkeypatch, fake)
+
+    body = (await client.post("/files/delete-batch", json={"keys": keys})).json()
+
+    assert body["deleted"] == ["a.txt", "c.txt"]
+    assert body["errors"] == [{"key": "b.txt", "code": "AccessDenied", "message": "no"}]
+    assert fake.chunks == [["a.txt", "b.txt", "c.txt"]]
+    assert patches[0].deletes == frozenset({"a.txt", "c.txt"})
+
+
+async def test_a_failed_request_fails_only_its_own_keys(client, monkeypatch, patches):
+    keys = [f"k{i:04}" for i in range(1500)]
+    fake = _FakeS3(keys, fail_chunk_with="k1200")
+    _use(monkeypatch, fake)
+
+    body = (await client.post("/files/delete-batch", json={"keys": keys})).json()
+
+    assert body["deleted"] == keys[:1000]
+    assert [e["key"] for e in body["errors"]] == keys[1000:]
+    assert body["errors"][0]["code"] == "ServiceUnavailable"
+    assert len(patches) == 1
+
+
+async def test_prefix_delete_pages_a_fresh_listing(client, monkeypatch, patches):
+    inside = [f"photos/{i:05}.jpg" for i in range(2100)]
+    fake = _FakeS3([*inside, "photosets/x.jpg", "docs/a.pdf"])
+    _use(monkeypatch, fake)
+    fake.keys.append("photos/zz-new.jpg")  # written elsewhere since the scan
+
+    body = (await client.post("/files/delete-prefix", json={"prefix": "photos/"})).json()
+
+    assert body == {"deleted": len(inside) + 1, "failed": 0, "errors": []}
+    assert sorted(patches[0].deletes) == [*inside, "photos/zz-new.jpg"]
+    assert fake.keys == ["docs/a.pdf", "photosets/x.jpg"]
+    assert [len(chunk) for chunk in fake.chunks] == [1000, 1000, 101]
+    assert len(patches) == 1
+
+
+async def test_prefix_delete_spares_siblings_sharing_the_prefix(client, monkeypatch, patches):
+    fake = _FakeS3(["uploads/a.png", "uploads-old/b.png", "uploads2/c.png"])
+    _use(monkeypatch, fake)
+
+    bare = await client.post("/files/delete-prefix", json={"prefix": "uploads"})
+    body = (await client.post("/files/delete-prefix", json={"prefix": "uploads/"})).json()
+
+    assert bare.status_code == 400
+    assert body["deleted"] == 1
+    assert fake.keys == ["uploads-old/b.png", "uploads2/c.png"]
+
+
+async def test_prefix_delete_reports_counts_and_caps_errors(client, monkeypatch, patches):
+    keys = [f"p/{i:05}" for i in range(10_050)]
+    fake = _FakeS3([*keys, "p/ok"], refuse=keys)
+    _use(monkeypatch, fake)
+
+    body = (await client.post("/files/delete-prefix", json={"prefix": "p/"})).json()
+
+    assert (body["deleted"], body["failed"]) == (1, len(keys))
+    assert len(body["errors"]) == 10_000
+
+
+async def test_the_whole_bucket_needs_its_name_to_confirm(client, monkeypatch, patches):
+    monkeypatch.setattr(settings, "b2_bucket_name", "my-bucket")
+    fake = _FakeS3(["a.txt", "docs/b.pdf"])
+    _use(monkeypatch, fake)
+
+    for body in ({"prefix": ""}, {"prefix": "", "confirm": "other-bucket"}):
+        response = await client.post("/files/delete-prefix", json=body)
+        assert response.status_code == 400
+        assert "confirm" in response.json()["detail"]
+    assert fake.chunks == []
+
+    confirmed = {"prefix": "", "confirm": "my-bucket"}
+    body = (await client.post("/files/delete-prefix", json=confirmed)).json()
+    assert body["deleted"] == 2 and fake.keys == []
+
+
+def test_a_failed_listing_still_writes_through_what_was_deleted(monkeypatch, patches):
+    fake = _FakeS3([f"p/{i:04}" for i in range(1500)])
+    _use(monkeypatch, fake)
+    list_page = fake.list_objects_v2
+
+    def flaky(**kwargs):
+        if "ContinuationToken" in kwargs:
+            raise ClientError({"Error": {"Code": "InternalError"}}, "ListObjectsV2")
+        return list_page(**kwargs)
+
+    fake.list_objects_v2 = flaky
+
+    with pytest.raises(RuntimeError):
+        b2_delete.delete_prefix("p/")
+    assert len(patches[0].deletes) == 1000
+
+
+@pytest.mark.parametrize(
+    ("path", "body", "status"),
+    [
+        ("/files/delete-batch", {"keys": ["a.txt", "../etc/passwd"]}, 400),
+        ("/files/delete-batch", {"keys": []}, 422),
+        ("/files/delete-batch", {"keys": [f"k{i}" for i in range(10_001)]}, 422),
+        ("/files/delete-prefix", {}, 422),
+        ("/files/delete-prefix", {"prefix": "a/../b/"}, 400),
+    ],
+)
+async def test_bad_requests_delete_nothing(client, monkeypatch, path, body, status):
+    fake = _FakeS3(["a.txt"])
+    _use(monkeypatch, fake)
+
+    response = await client.post(path, json=body)
+
+    assert response.status_code == status
+    assert fake.chunks == []
+
+
+@pytest.mark.parametrize("prefix", ["", "other/"])
+async def test_allowed_prefix_confines_prefix_delete(client, monkeypatch, prefix):
+    monkeypatch.setattr(settings, "allowed_key_prefix", "uploads/")
+    fake = _FakeS3(["uploads/a.txt", "other/b.txt"])
+    _use(monkeypatch, fake)
+
+    response = await client.post("/files/delete-prefix", json={"prefix": prefix})
+
+    assert response.status_code == 400
+    assert fake.chunks == []
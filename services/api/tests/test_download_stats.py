@@ -12,6 +12,7 @@ from app.types import FileMetadata
 @pytest.mark.asyncio
 async def test_downloads_increment_stats(client, monkeypatch):
     monkeypatch.setattr(counter, "_count", 0)
+    monkeypatch.setattr(files_service, "listing_version", lambda prefix="", wait=True: None)
     monkeypatch.setattr(
         files_service,
         "get_upload_stats",
@@ -23,7 +24,7 @@ async def test_downloads_increment_stats(client, monkeypatch):
         },
     )
 
-    def fake_metadata(key: str) -> FileMetadata:
+    async def fake_metadata(key: str) -> FileMetadata:
         return FileMetadata(
             key=key,
             filename="test.txt",
@@ -35,7 +36,7 @@ async def test_downloads_increment_stats(client, monkeypatch):
             url=None,
         )
 
-    monkeypatch.setattr(files_service, "get_file_metadata", fake_metadata)
+    monkeypatch.setattr(files_service, "get_file_metadata_async", fake_metadata)
     monkeypatch.setattr(
         files_service,
         "get_presigned_url",
@@ -60,8 +61,9 @@ async def test_downloads_increment_stats(client, monkeypatch):
 async def test_preview_does_not_increment_downloads(client, monkeypatch):
     """Preview returns a presigned URL without bumping the download counter."""
     monkeypatch.setattr(counter, "_count", 0)
+    monkeypatch.setattr(files_service, "listing_version", lambda prefix="", wait=True: None)
 
-    def fake_metadata(key: str) -> FileMetadata:
+    async def fake_metadata(key: str) -> FileMetadata:
         return FileMetadata(
             key=key,
             filename="test.png",
@@ -73,7 +75,7 @@ async def test_preview_does_not_increment_downloads(client, monkeypatch):
             url=None,
         )
 
-    monkeypatch.setattr(files_service, "get_file_metadata", fake_metadata)
+    monkeypatch.setattr(files_service, "get_file_metadata_async", fake_metadata)
     monkeypatch.setattr(
         files_service,
         "get_presigned_url",
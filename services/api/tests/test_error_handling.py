@@ -1,5 +1,7 @@
 """Tests for error handling across the API."""
 
+from unittest.mock import AsyncMock
+
 import pytest
 
 from app.service import files as files_service
@@ -12,7 +14,8 @@ async def test_unhandled_exception_returns_500(client, monkeypatch):
     def explode(**kwargs):
         raise RuntimeError("B2 exploded")
 
-    monkeypatch.setattr(files_service, "list_files", explode)
+    monkeypatch.setattr(files_service, "list_files_sorted", explode)
+    monkeypatch.setattr(files_service, "listing_version", lambda prefix="", wait=True: None)
 
     response = await client.get("/files")
     assert response.status_code == 500
@@ -36,7 +39,8 @@ async def test_unhandled_exception_500_carries_cors_headers(client, monkeypatch)
     def explode(*args, **kwargs):
         raise RuntimeError("B2 exploded")
 
-    monkeypatch.setattr(files_service, "list_files", explode)
+    monkeypatch.setattr(files_service, "list_files_sorted", explode)
+    monkeypatch.setattr(files_service, "listing_version", lambda prefix="", wait=True: None)
 
     origin = "http://localhost:3000"
     response = await client.get("/files", headers={"Origin": origin})
@@ -55,6 +59,7 @@ async def test_stats_b2_failure_returns_500(client, monkeypatch):
         raise RuntimeError("B2 stats query failed")
 
     monkeypatch.setattr(files_service, "get_upload_stats", explode)
+    monkeypatch.setattr(files_service, "listing_version", lambda prefix="", wait=True: None)
 
     response = await client.get("/files/stats")
     assert response.status_code == 500
@@ -64,7 +69,7 @@ async def test_stats_b2_failure_returns_500(client, monkeypatch):
 @pytest.mark.asyncio
 async def test_download_not_found_returns_404(client, monkeypatch):
     """Download for a missing file returns 404 with detail."""
-    monkeypatch.setattr(files_service, "get_file_metadata", lambda key: None)
+    monkeypatch.setattr(files_service, "get_file_metadata_async", AsyncMock(return_value=None))
 
     response = await client.get("/files/uploads/missing.txt/download")
     assert response.status_code == 404
@@ -1,4 +1,5 @@
 from datetime import UTC, datetime
+from unittest.mock import AsyncMock
 
 import pytest
 
@@ -44,11 +45,11 @@ async def test_query_metadata_route_handles_reserved_key_shapes(
 ):
     metadata_calls: list[str] = []
 
-    def fake_get_file_metadata(requested_key: str) -> FileMetadata:
+    async def fake_get_file_metadata(requested_key: str) -> FileMetadata:
         metadata_calls.append(requested_key)
         return _fake_metadata(requested_key)
 
-    monkeypatch.setattr(files_service, "get_file_metadata", fake_get_file_metadata)
+    monkeypatch.setattr(files_service, "get_file_metadata_async", fake_get_file_metadata)
 
     response = await client.get("/files-by-key/metadata", params={"key": key})
 
@@ -63,7 +64,9 @@ async def test_query_download_route_handles_reserved_key_shapes(
     client, monkeypatch, key
 ):
     presign_calls: list[str] = []
-    monkeypatch.setattr(files_service, "get_file_metadata", _fake_metadata)
+    monkeypatch.setattr(
+        files_service, "get_file_metadata_async", AsyncMock(side_effect=_fake_metadata)
+    )
     monkeypatch.setattr(
         files_service,
         "get_presigned_url",
@@ -87,7 +90,9 @@ async def test_query_preview_route_handles_reserved_key_shapes(
     client, monkeypatch, key
 ):
     presign_calls: list[str] = []
-    monkeypatch.setattr(files_service, "get_file_metadata", _fake_metadata)
+    monkeypatch.setattr(
+        files_service, "get_file_metadata_async", AsyncMock(side_effect=_fake_metadata)
+    )
     monkeypatch.setattr(
         files_service,
         "get_presigned_url",
@@ -112,7 +117,7 @@ async def test_query_delete_route_handles_reserved_key_shapes(
 ):
     delete_calls: list[str] = []
     monkeypatch.setattr(
-        files_service, "delete_file", lambda requested_key: delete_calls.append(requested_key)
+        files_service, "delete_file_async", AsyncMock(side_effect=delete_calls.append)
     )
 
     response = await client.delete("/files-by-key", params={"key": key})
@@ -139,8 +144,11 @@ async def test_query_key_routes_reject_invalid_keys(
     repo_calls: list[str] = []
     monkeypatch.setattr(
         files_service,
-        "get_file_metadata",
-        lambda requested_key: repo_calls.append(requested_key) or _fake_metadata(requested_key),
+        "get_file_metadata_async",
+        AsyncMock(
+            side_effect=lambda requested_key: repo_calls.append(requested_key)
+            or _fake_metadata(requested_key)
+        ),
     )
     monkeypatch.setattr(
         files_service,
@@ -150,7 +158,7 @@ async def test_query_key_routes_reject_invalid_keys(
         ),
     )
     monkeypatch.setattr(
-        files_service, "delete_file", lambda requested_key: repo_calls.append(requested_key)
+        files_service, "delete_file_async", AsyncMock(side_effect=repo_calls.append)
     )
 
     response = await getattr(client, method)(path, params={"key": key})
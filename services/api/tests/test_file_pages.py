@@ -0,0 +1,118 @@
+"""Tests for cursor pagination (`GET /files/page`, `service/file_pages.py`).
+
+Following `next_cursor` must visit every file under the query exactly once, in
+`/files` order, materializing only each page's rows; and a cursor must be
+refused cleanly once the listing it was cut from has changed.
+"""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.repo import b2_listing, list_cache
+from app.repo.list_builder import Delta, snapshot_from_objects
+
+
+def _objects() -> list[dict]:
+    # Sizes and times repeat, so ties (broken by key) are exercised too.
+    now = datetime(2026, 3, 4, tzinfo=UTC)
+    keys = [f"uploads/file-{i:03d}.txt" for i in range(150)]
+    keys += [f"docs/Note-{i:02d}.md" for i in range(40)]
+    return [
+        {"Key": key, "Size": (i * 37) % 50, "LastModified": now - timedelta(minutes=i % 60)}
+        for i, key in enumerate(sorted(keys))
+    ]
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    """Serve the objects through the real listing cache."""
+    snapshot = snapshot_from_objects(_objects())
+    monkeypatch.setattr(b2_listing, "_fetch_all_objects", lambda prefix: snapshot)
+    return snapshot
+
+
+async def _walk(client, query: str) -> tuple[list[str], list[int]]:
+    keys, sizes, cursor = [], [], None
+    while True:
+        url = f"/files/page?{query}" + (f"&cursor={cursor}" if cursor else "")
+        response = await client.get(url)
+        assert response.status_code == 200
+        page = response.json()
+        keys += [f["key"] for f in page["files"]]
+        sizes.append(len(page["files"]))
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return keys, sizes
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort", ["uploaded_at", "name", "size"])
+@pytest.mark.parametrize("order", ["asc", "desc"])
+@pytest.mark.parametrize("prefix", ["", "uploads/", "docs/", "docs/Note-0"])  # root, dense, sparse
+async def test_pages_cover_the_listing_in_files_order(client, bucket, sort, order, prefix):
+    query = f"prefix={prefix}&sort={sort}&order={order}"
+    everything = (await client.get(f"/files?{query}&limit=1000")).json()
+
+    keys, sizes = await _walk(client, f"{query}&limit=17")
+
+    assert keys == [f["key"] for f in everything]  # no gaps, no repeats
+    assert all(size == 17 for size in sizes[:-1]) and 0 < sizes[-1] <= 17
+
+
+@pytest.mark.asyncio
+async def test_the_last_full_page_has_no_cursor(client, bucket):
+    page = (await client.get("/files/page?prefix=docs/&limit=40")).json()
+    assert len(page["files"]) == 40
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_each_page_materializes_only_its_rows(client, bucket, monkeypatch):
+    rows: list[int] = []
+    real = b2_listing.FileRows
+    monkeypatch.setattr(
+        b2_listing, "FileRows", lambda s, i=None: rows.append(len(f := real(s, i))) or f
+    )
+
+    await _walk(client, "limit=50")
+
+    assert rows == [50, 50, 50, 40]
+
+
+@pytest.mark.asyncio
+async def test_a_cursor_from_an_older_listing_is_gone(client, bucket):
+    first = (await client.get("/files/page?limit=10")).json()
+
+    list_cache.apply(Delta({"uploads/zz-new.txt": (5, 1_900_000_000_000)}, frozenset()))
+    stale = await client.get(f"/files/page?limit=10&cursor={first['next_cursor']}")
+
+    assert stale.status_code == 410
+    assert "restart" in stale.json()["detail"]
+    restarted = (await client.get("/files/page?limit=10")).json()
+    assert restarted["files"][0]["key"] == "uploads/zz-new.txt"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "WzFd", "WyJ2IiwiIiwibmFtZSIsImFzYyIsLTFd"])
+async def test_malformed_cursors_are_rejected(client, bucket, cursor):
+    response = await client.get(f"/files/page?cursor={cursor}")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_a_cursor_only_continues_its_own_query(client, bucket):
+    cursor = (await client.get("/files/page?limit=5&sort=name")).json()["next_cursor"]
+
+    same = await client.get(f"/files/page?limit=5&sort=name&order=asc&cursor={cursor}")
+    other = await client.get(f"/files/page?limit=5&sort=size&cursor={cursor}")
+
+    assert same.status_code == 200  # `asc` is name's default anyway
+    assert other.status_code == 400
+    assert other.json()["detail"] == "Cursor does not match this query"
+
+
+@pytest.mark.asyncio
+async def test_limit_is_validated(client, bucket):
+    assert (await client.get("/files/page?limit=0")).status_code == 400
+    assert (await client.get("/files/page?limit=1001")).status_code == 400
@@ -0,0 +1,103 @@
+"""Tests for `fields=` and `format=compact` on the file-list routes
+(`runtime/projection.py`).
+
+Every form must carry exactly the values the default `FileMetadata` objects
+do — projected or rearranged, never recomputed differently — and keep the
+conditional-GET and partial-listing headers the default form gets.
+"""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.repo import b2_listing
+from app.repo.list_builder import snapshot_from_objects
+from app.runtime import listing
+
+_NOW = datetime(2026, 3, 4, tzinfo=UTC)
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    snapshot = snapshot_from_objects(
+        {"Key": key, "Size": 1000 * i, "LastModified": _NOW - timedelta(hours=i)}
+        for i, key in enumerate(sorted(["a.txt", "docs/guide.pdf", "docs/report-2024.csv", "z.png"]))
+    )
+    monkeypatch.setattr(b2_listing, "_fetch_all_objects", lambda prefix: snapshot)
+    return snapshot
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("path", "query"),
+    [("/files", "limit=10"), ("/files/search", "q=rep"), ("/files/page", "limit=3")],
+)
+async def test_fields_keep_only_the_requested_keys(client, bucket, path, query):
+    full = (await client.get(f"{path}?{query}")).json()
+    projected = (await client.get(f"{path}?{query}&fields=key,uploaded_at,size_bytes")).json()
+
+    if path == "/files/page":
+        assert projected["next_cursor"] == full["next_cursor"]
+        full, projected = full["files"], projected["files"]
+    assert projected == [
+        {"key": f["key"], "uploaded_at": f["uploaded_at"], "size_bytes": f["size_bytes"]}
+        for f in full
+    ]
+
+
+@pytest.mark.asyncio
+async def test_compact_is_a_header_and_value_rows(client, bucket):
+    full = (await client.get("/files?sort=name")).json()
+
+    compact = (await client.get("/files?sort=name&format=compact")).json()
+    assert compact["columns"] == list(full[0])  # every field, in FileMetadata order
+    assert [dict(zip(compact["columns"], row, strict=True)) for row in compact["rows"]] == full
+
+    lean = (await client.get("/files?sort=name&format=compact&fields=size_bytes,key")).json()
+    assert lean == {"columns": ["size_bytes", "key"], "rows": [[f["size_bytes"], f["key"]] for f in full]}
+
+
+@pytest.mark.asyncio
+async def test_compact_pages_carry_the_cursor(client, bucket):
+    first = (await client.get("/files/page?limit=3&format=compact&fields=key")).json()
+    rest = (await client.get(f"/files/page?limit=3&format=compact&fields=key&cursor={first['next_cursor']}")).json()
+
+    keys = [row[0] for row in first["rows"] + rest["rows"]]
+    assert keys == [f["key"] for f in (await client.get("/files")).json()]
+    assert rest["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_each_form_has_its_own_etag(client, bucket):
+    full = await client.get("/files")
+    lean = await client.get("/files?fields=key")
+
+    assert full.headers["ETag"] != lean.headers["ETag"]
+    again = await client.get("/files?fields=key", headers={"If-None-Match": lean.headers["ETag"]})
+    assert again.status_code == 304
+    other = await client.get("/files?format=compact", headers={"If-None-Match": lean.headers["ETag"]})
+    assert other.status_code == 200
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fields", ["", "key,nope", " , "])
+async def test_unknown_fields_are_rejected(client, bucket, fields):
+    response = await client.get(f"/files?fields={fields}")
+
+    assert response.status_code == 400
+    assert "key, filename" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_unknown_format_is_rejected(client, bucket):
+    assert (await client.get("/files?format=csv")).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_partial_listing_headers_survive(client, bucket, monkeypatch):
+    monkeypatch.setattr(listing, "get_listing_progress", lambda: 2)
+
+    response = await client.get("/files?format=compact")
+
+    assert response.headers["X-Listing-Complete"] == "false"
+    assert response.headers["X-Listing-Scanned-Objects"] == "2"
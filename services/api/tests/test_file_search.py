@@ -0,0 +1,197 @@
+"""Tests for filename search (`GET /files/search`, `repo/list_search.py`).
+
+The index must find exactly what a linear scan of the keys finds —
+also after write-through patches, which extend the index instead of
+rebuilding it — and rank filename prefix matches first.
+"""
+
+import random
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.repo import b2_listing, list_cache
+from app.repo.list_builder import Delta, patch_snapshot, snapshot_from_objects
+from app.repo.list_search import SearchIndex, search, search_index
+from app.repo.list_snapshot import ListingSnapshot
+
+_WHEN = datetime(2026, 3, 4, tzinfo=UTC)
+
+
+def _snapshot(keys):
+    return snapshot_from_objects(
+        {"Key": k, "Size": 1, "LastModified": _WHEN - timedelta(minutes=i)}
+        for i, k in enumerate(sorted(keys))
+    )
+
+
+def _keys(snapshot, rows):
+    return [snapshot.key(row) for row in rows]
+
+
+def _linear(snapshot, query):
+    """What a scan of every key finds: `query` anywhere in the key — except
+    that under 3 characters it must start the filename (or be in the folder)."""
+    q = query.casefold()
+    found = set()
+    for key, *_ in snapshot.rows():
+        folder, _, name = key.casefold().rpartition("/")
+        in_name = q in name if len(q) >= 3 else name.startswith(q)
+        if in_name or q in (folder + "/" if folder else "") or ("/" in q and q in key.casefold()):
+            found.add(key)
+    return found
+
+
+_KEYS = [
+    "uploads/Report-2024.pdf",
+    "uploads/annual-report.pdf",
+    "uploads/reports/q1.csv",
+    "uploads/photo.png",
+    "archive/report.txt",
+    "archive/old/Reports.txt",
+    "readme.md",
+]
+
+
+def test_ranks_filename_prefix_then_substring_then_folder():
+    snapshot = _snapshot(_KEYS)
+
+    found = _keys(snapshot, search(snapshot, "REPORT", 20))
+
+    assert found == [
+        "uploads/Report-2024.pdf",  # filename starts with it, by filename
+        "archive/report.txt",
+        "archive/old/Reports.txt",
+        "uploads/annual-report.pdf",  # filename contains it
+        "uploads/reports/q1.csv",  # only the folder does
+    ]
+    assert _keys(snapshot, search(snapshot, "report", 2)) == found[:2]
+
+
+def test_key_prefixes_and_paths_match_across_the_folder_boundary():
+    snapshot = _snapshot(_KEYS)
+
+    assert set(_keys(snapshot, search(snapshot, "uploads/rep", 20))) == {
+        "uploads/Report-2024.pdf", "uploads/reports/q1.csv",
+    }
+    assert _keys(snapshot, search(snapshot, "old/", 20)) == ["archive/old/Reports.txt"]
+    assert _keys(snapshot, search(snapshot, "ts/q1", 20)) == ["uploads/reports/q1.csv"]
+
+
+def test_a_path_query_bisects_the_folder_instead_of_walking_it(monkeypatch):
+    deep = [f"docs/archive/{i:04}/report.txt" for i in range(2000)]
+    snapshot = _snapshot([*deep, "docs/b.txt", *(f"docs/report-{i}.txt" for i in range(5))])
+    search_index(snapshot)
+    touched = []
+    for cls, name in ((SearchIndex, "key"), (ListingSnapshot, "key"), (ListingSnapshot, "folder")):
+        real = getattr(cls, name)
+        monkeypatch.setattr(cls, name, lambda self, i, real=real: touched.append(i) or real(self, i))
+
+    found = _keys(snapshot, search(snapshot, "CS/REP", 3))
+
+    assert found == ["docs/report-0.txt", "docs/report-1.txt", "docs/report-2.txt"]
+    assert len(touched) < 200  # bisects, not the 2000 keys under docs/archive/
+
+
+def test_short_queries_match_prefixes_and_folders():
+    snapshot = _snapshot(_KEYS)
+
+    assert set(_keys(snapshot, search(snapshot, "re", 20))) == {
+        "archive/report.txt", "uploads/Report-2024.pdf", "archive/old/Reports.txt",
+        "readme.md", "uploads/reports/q1.csv",
+    }
+    assert search(snapshot, "zz", 20) == []
+
+
+def _random_key(rng: random.Random) -> str:
+    folder = rng.choice(["", "uploads/", "uploads/2024/", "Docs/", "docs/old/"])
+    stem = "".join(rng.choice("abcdeAB-_") for _ in range(rng.randint(1, 8)))
+    return folder + stem + rng.choice([".txt", ".PDF", ""])
+
+
+def test_matches_a_linear_scan_through_patches():
+    rng = random.Random(7)
+    snapshot = _snapshot({_random_key(rng) for _ in range(400)})
+    search_index(snapshot)
+    queries = ["a", "ab", "abc", "B-a", ".pdf", "s/a", "uploads/", "/2024/b", "old/d", "e_"]
+
+    for _ in range(15):
+        upserts = {_random_key(rng): (1, 1_800_000_000_000) for _ in range(5)}
+        deletes = frozenset(rng.sample(list(snapshot.keys()), 5))
+        snapshot = patch_snapshot(snapshot, Delta(upserts, deletes))
+        assert snapshot.memoized("search") is not None  # carried, not dropped
+        for query in queries:
+            rows = search(snapshot, query, 10_000)
+            assert len(rows) == len(set(rows))
+            assert set(_keys(snapshot, rows)) == _linear(snapshot, query), query
+
+
+def test_a_rescan_is_the_only_full_build(monkeypatch):
+    builds = []
+    real = SearchIndex.build.__func__
+    monkeypatch.setattr(SearchIndex, "build", classmethod(lambda cls, s: builds.append(1) or real(cls, s)))
+    snapshot = _snapshot(_KEYS)
+    search(snapshot, "report", 5)
+
+    for i in range(3):
+        snapshot = patch_snapshot(snapshot, Delta({f"uploads/new-{i}.txt": (1, 0)}, frozenset()))
+        assert _keys(snapshot, search(snapshot, f"new-{i}", 5)) == [f"uploads/new-{i}.txt"]
+
+    assert builds == [1]
+
+
+def test_a_rescan_of_a_searched_bucket_builds_the_index_in_the_scan(monkeypatch):
+    objects = [{"Key": k, "Size": 1, "LastModified": _WHEN} for k in sorted(_KEYS)]
+    monkeypatch.setattr(b2_listing, "scan_listing", lambda *a, **kw: list(objects))
+    fetch = b2_listing._fetch_all_objects
+
+    first = list_cache.cached_listing("", fetch)
+    assert first.memoized("stats") is not None
+    assert first.memoized("search") is None  # nobody has searched yet
+    search(first, "report", 5)
+
+    objects.append({"Key": "uploads/report-new.txt", "Size": 1, "LastModified": _WHEN})
+    entry = list_cache._entry("")
+    list_cache._list_cache[""] = entry._replace(stored_at=float("-inf"))
+    list_cache._refresh("", fetch)
+    builds = []
+    monkeypatch.setattr(SearchIndex, "build", classmethod(lambda cls, s: builds.append(1)))
+
+    rescanned = list_cache.peek("")
+    assert rescanned is not first
+    assert "uploads/report-new.txt" in _keys(rescanned, search(rescanned, "report", 10))
+    assert builds == []
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    snapshot = _snapshot(_KEYS)
+    monkeypatch.setattr(b2_listing, "_fetch_all_objects", lambda prefix: snapshot)
+    return snapshot
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint(client, bucket):
+    response = await client.get("/files/search?q=report&limit=2")
+
+    assert response.status_code == 200
+    assert [f["key"] for f in response.json()] == ["uploads/Report-2024.pdf", "archive/report.txt"]
+    assert "ETag" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_search_sees_write_through_uploads_and_deletes(client, bucket):
+    await client.get("/files/search?q=report")
+    list_cache.apply(Delta({"uploads/report-new.txt": (1, 1_800_000_000_000)},
+                           frozenset({"archive/report.txt"})))
+
+    keys = [f["key"] for f in (await client.get("/files/search?q=report")).json()]
+
+    assert "uploads/report-new.txt" in keys
+    assert "archive/report.txt" not in keys
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("query", ["q=", "q=%20%20", "q=" + "x" * 257, "q=a&limit=0", "q=a&limit=101"])
+async def test_search_validates_its_query(client, bucket, query):
+    assert (await client.get(f"/files/search?{query}")).status_code == 400
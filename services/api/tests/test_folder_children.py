@@ -0,0 +1,208 @@
+"""Tests for one-level folder listings (`GET /files/children`).
+
+Warm, a folder's children come from the cached root snapshot; cold, from one
+`Delimiter="/"` request to B2. Both must return exactly what S3's delimiter
+listing would — subfolders as `CommonPrefixes`, the files directly in the
+folder — and page through it with the same cursors.
+"""
+
+from datetime import UTC, datetime
+
+import pytest
+from botocore.exceptions import EndpointConnectionError
+
+from app.repo import b2_listing, list_cache
+from app.repo.list_builder import snapshot_from_objects
+from app.repo.list_children import children
+
+_WHEN = datetime(2026, 3, 4, tzinfo=UTC)
+
+_KEYS = sorted([
+    "a.txt",
+    "docs/",  # a folder placeholder object
+    "docs/guide.pdf",
+    "docs/api/v1.json",
+    "docs/api/v2.json",
+    "docs/zz.txt",
+    "uploads/0.png",
+    *(f"uploads/big/{i:04d}.bin" for i in range(500)),
+    "uploads/big-file.bin",
+    "uploads/c.png",
+    "uploads/deep/x/y/z.txt",
+    "z.txt",
+])
+
+
+class _DelimiterS3:
+    """Serves `list_objects_v2` with Prefix/Delimiter/StartAfter/MaxKeys the way S3 does."""
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.calls = []
+
+    def list_objects_v2(self, Bucket, Prefix="", Delimiter=None, MaxKeys=1000, StartAfter=""):
+        self.calls.append({"Prefix": Prefix, "StartAfter": StartAfter, "MaxKeys": MaxKeys})
+        entries = []  # (sort key, kind, value)
+        seen = set()
+        for key in self.keys:
+            if not key.startswith(Prefix) or key <= StartAfter:
+                continue
+            slash = key.find(Delimiter, len(Prefix)) if Delimiter else -1
+            if slash >= 0:
+                prefix = key[: slash + 1]
+                if prefix not in seen:
+                    seen.add(prefix)
+                    entries.append((prefix, "prefix", prefix))
+            else:
+                entries.append((key, "key", key))
+        page = entries[:MaxKeys]
+        return {
+            "Contents": [{"Key": k, "Size": 1, "LastModified": _WHEN} for _, kind, k in page if kind == "key"],
+            "CommonPrefixes": [{"Prefix": p} for _, kind, p in page if kind == "prefix"],
+            "IsTruncated": len(entries) > MaxKeys,
+        }
+
+
+def _snapshot():
+    return snapshot_from_objects({"Key": k, "Size": 1, "LastModified": _WHEN} for k in _KEYS)
+
+
+def _expected(folder):
+    page = _DelimiterS3(_KEYS).list_objects_v2("b", Prefix=folder, Delimiter="/", MaxKeys=10_000)
+    files = [o["Key"] for o in page["Contents"] if o["Key"] != folder]
+    return [p["Prefix"] for p in page["CommonPrefixes"]], files
+
+
+@pytest.mark.parametrize("folder", ["", "docs/", "uploads/", "uploads/big/", "uploads/deep/", "nope/"])
+@pytest.mark.parametrize("limit", [1, 2, 7, 1000])
+def test_pages_match_a_delimiter_listing(folder, limit):
+    snapshot = _snapshot()
+    folders, files, after = [], [], None
+    while True:
+        page = children(snapshot, folder, after, limit)
+        assert len(page.folders) + len(page.rows) <= limit
+        folders += page.folders
+        files += [snapshot.key(row) for row in page.rows]
+        after = page.after
+        if after is None:
+            break
+    assert (folders, files) == _expected(folder)
+
+
+class _CountedKeys:
+    """A snapshot whose key column records which positions were read."""
+
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+        self.reads = []
+
+    def __getattr__(self, name):
+        return getattr(self._snapshot, name)
+
+    def keys(self):
+        return self
+
+    def __len__(self):
+        return len(self._snapshot)
+
+    def __getitem__(self, i):
+        self.reads.append(i)
+        return self._snapshot.key(i)
+
+
+def test_a_subfolder_is_skipped_not_walked():
+    snapshot = _CountedKeys(_snapshot())
+
+    page = children(snapshot, "uploads/", None, 1000)
+
+    assert page.folders == ["uploads/big/", "uploads/deep/"]
+    assert len(snapshot.reads) < 20  # not the 500 keys under uploads/big/
+
+
+@pytest.fixture
+def cold(monkeypatch):
+    s3 = _DelimiterS3(_KEYS)
+    warmed = []
+    monkeypatch.setattr(b2_listing, "get_s3_client", lambda: s3)
+    monkeypatch.setattr(b2_listing, "_prewarm_list_cache", lambda prefix, fetch: warmed.append(prefix))
+    return s3, warmed
+
+
+async def _walk(client, folder, limit):
+    folders, files, cursor = [], [], None
+    while True:
+        query = f"folder={folder}&limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+        response = await client.get(f"/files/children?{query}")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["folder"] == folder
+        folders += body["folders"]
+        files += [f["key"] for f in body["files"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return folders, files
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("folder", ["", "docs/", "uploads/"])
+async def test_cold_and_warm_answers_agree(client, cold, monkeypatch, folder):
+    s3, warmed = cold
+
+    cold_answer = await _walk(client, folder, 2)
+    assert warmed and s3.calls  # listed from B2, and the full scan was kicked off
+    assert all(call["MaxKeys"] == 2 for call in s3.calls)
+
+    monkeypatch.setattr(b2_listing, "_fetch_all_objects", lambda prefix: _snapshot())
+    list_cache.cached_listing("", b2_listing._fetch_all_objects)
+    s3.calls.clear()
+    warm_answer = await _walk(client, folder, 2)
+
+    assert s3.calls == []
+    assert cold_answer == warm_answer == _expected(folder)
+
+
+@pytest.mark.asyncio
+async def test_a_placeholder_only_page_does_not_end_the_walk(client, cold):
+    # With limit=1, B2's first page for docs/ is just the "docs/" placeholder.
+    cold_answer = await _walk(client, "docs/", 1)
+
+    assert cold_answer == _expected("docs/")
+
+
+def test_a_placeholder_marker_resumes_a_warm_walk():
+    page = children(_snapshot(), "docs/", "docs/", 10)
+
+    assert (page.folders, page.after) == (["docs/api/"], None)
+    assert [_snapshot().key(row) for row in page.rows] == ["docs/guide.pdf", "docs/zz.txt"]
+
+
+def test_cold_listing_failures_raise_runtime_error(cold, monkeypatch):
+    s3, _ = cold
+
+    def unreachable(**params):
+        raise EndpointConnectionError(endpoint_url="https://s3.test")
+
+    monkeypatch.setattr(s3, "list_objects_v2", unreachable)
+
+    with pytest.raises(RuntimeError, match="B2 list failed"):
+        b2_listing.list_children("docs/", None, 10)
+
+
+@pytest.mark.asyncio
+async def test_children_carry_file_metadata(client, cold):
+    body = (await client.get("/files/children?folder=docs/")).json()
+
+    guide = next(f for f in body["files"] if f["key"] == "docs/guide.pdf")
+    assert (guide["filename"], guide["folder"], guide["content_type"]) == (
+        "guide.pdf", "docs/", "application/pdf",
+    )
+
+
+@pytest.mark.asyncio
+async def test_children_validate(client, cold):
+    cursor = (await client.get("/files/children?folder=uploads/&limit=1")).json()["next_cursor"]
+
+    assert (await client.get(f"/files/children?folder=docs/&cursor={cursor}")).status_code == 400
+    assert (await client.get("/files/children?folder=docs")).status_code == 400
+    assert (await client.get("/files/children?limit=0")).status_code == 400
+    assert (await client.get("/files/children?cursor=%%%")).status_code == 400
@@ -0,0 +1,112 @@
+"""Tests for the folder summary (`GET /files/tree`, `repo/list_tree.py`).
+
+Each folder must carry du-style totals of everything under it — matching what
+the flat listing adds up to — and the response must stop at the requested
+depth while still saying how many subfolders lie below.
+"""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.repo import b2_listing, list_cache
+from app.repo.list_builder import Delta, snapshot_from_objects
+from app.repo.list_tree import build_tree, folder_name, parent
+
+_NOW = datetime(2026, 3, 4, 12, tzinfo=UTC)
+
+_OBJECTS = {
+    "readme.md": (10, 0),
+    "docs/guide.pdf": (200, 5),
+    "docs/api/v1.json": (30, 1),
+    "docs/api/v2.json": (40, 2),
+    "uploads/a.png": (1000, 3),
+    "uploads/2024/b.png": (2000, 4),
+    "uploads/2024/jan/c.png": (3000, 6),
+    "Zeta/z.txt": (1, 7),
+}
+
+
+def _snapshot(objects=_OBJECTS):
+    return snapshot_from_objects(
+        {"Key": key, "Size": size, "LastModified": _NOW - timedelta(hours=hours)}
+        for key, (size, hours) in sorted(objects.items())
+    )
+
+
+def test_paths():
+    assert parent("a/b/") == "a/"
+    assert parent("a/") == ""
+    assert folder_name("a/b/") == "b"
+    assert folder_name("") == ""
+
+
+def test_totals_roll_up_to_every_ancestor():
+    tree = build_tree(_snapshot())
+
+    assert tree.totals[""] == (8, 6281, _NOW)
+    assert tree.totals["docs/"] == (3, 270, _NOW - timedelta(hours=1))
+    assert tree.totals["uploads/2024/"] == (2, 5000, _NOW - timedelta(hours=4))
+    assert tree.totals["uploads/2024/jan/"].files == 1
+    assert tree.children[""] == ("docs/", "uploads/", "Zeta/")  # by name, case-insensitive
+    assert "uploads/2024/jan/" not in tree.children
+
+
+def test_totals_match_the_flat_listing():
+    snapshot = _snapshot()
+    tree = build_tree(snapshot)
+
+    for path, totals in tree.totals.items():
+        under = [row for row in snapshot.rows() if row[0].startswith(path)]
+        assert totals.files == len(under)
+        assert totals.size_bytes == sum(row[2] for row in under)
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    snapshot = _snapshot()
+    monkeypatch.setattr(b2_listing, "_fetch_all_objects", lambda prefix: snapshot)
+    return snapshot
+
+
+@pytest.mark.asyncio
+async def test_tree_endpoint_stops_at_the_requested_depth(client, bucket):
+    response = await client.get("/files/tree?depth=1")
+
+    assert response.status_code == 200
+    root = response.json()
+    assert (root["path"], root["file_count"], root["size_bytes"]) == ("", 8, 6281)
+    assert root["size_human"] == "6.1 KB"
+    assert [c["name"] for c in root["children"]] == ["docs", "uploads", "Zeta"]
+    uploads = root["children"][1]
+    assert uploads["subfolder_count"] == 1
+    assert uploads["children"] == []  # below the requested depth
+    assert "ETag" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_tree_endpoint_starts_at_a_prefix(client, bucket):
+    node = (await client.get("/files/tree?prefix=uploads/&depth=5")).json()
+
+    assert node["name"] == "uploads"
+    assert node["file_count"] == 3
+    assert node["children"][0]["children"][0]["path"] == "uploads/2024/jan/"
+
+    missing = (await client.get("/files/tree?prefix=nope/")).json()
+    assert (missing["file_count"], missing["newest_uploaded_at"], missing["children"]) == (0, None, [])
+
+
+@pytest.mark.asyncio
+async def test_tree_follows_write_through_deletes(client, bucket):
+    await client.get("/files/tree")
+    list_cache.apply(Delta({}, frozenset({"uploads/2024/jan/c.png"})))
+
+    node = (await client.get("/files/tree?prefix=uploads/2024/")).json()
+
+    assert (node["file_count"], node["size_bytes"], node["subfolder_count"]) == (1, 2000, 0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("query", ["prefix=uploads", "depth=-1", "depth=17"])
+async def test_tree_endpoint_validates(client, bucket, query):
+    assert (await client.get(f"/files/tree?{query}")).status_code == 400
@@ -0,0 +1,124 @@
+"""Tests for `sort=key` listings and their cold-cache early exit.
+
+Ascending key order is S3's own, so with no snapshot cached `/files` and each
+`/files/page` page must cost exactly one `MaxKeys=limit` request — no scan
+waited on — and return what the warm, snapshot-backed answer does.
+"""
+
+from datetime import UTC, datetime
+
+import pytest
+
+from app.repo import b2_listing, list_cache
+from app.repo.list_builder import snapshot_from_objects
+from app.service.file_pages import encode_cursor
+
+_WHEN = datetime(2026, 3, 4, tzinfo=UTC)
+_KEYS = sorted(
+    ["Zeta.txt", "a.txt", "docs/B.pdf", "docs/a.pdf", "uploads/é.png", "uploads/z.png"]
+    + [f"uploads/{i:03d}.bin" for i in range(30)]
+)
+
+
+class _S3:
+    """`list_objects_v2` with Prefix/StartAfter/MaxKeys, recording calls."""
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.calls = []
+
+    def list_objects_v2(self, Bucket, Prefix="", MaxKeys=1000, StartAfter=""):
+        self.calls.append({"Prefix": Prefix, "StartAfter": StartAfter, "MaxKeys": MaxKeys})
+        keys = [k for k in self.keys if k.startswith(Prefix) and k > StartAfter]
+        return {
+            "Contents": [{"Key": k, "Size": 1, "LastModified": _WHEN} for k in keys[:MaxKeys]],
+            "IsTruncated": len(keys) > MaxKeys,
+        }
+
+
+def _snapshot():
+    return snapshot_from_objects({"Key": k, "Size": 1, "LastModified": _WHEN} for k in _KEYS)
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    s3 = _S3(_KEYS)
+    warmed = []
+    s3.warmed = warmed
+    monkeypatch.setattr(b2_listing, "get_s3_client", lambda: s3)
+    monkeypatch.setattr(b2_listing, "_prewarm_list_cache", lambda prefix, fetch: warmed.append(prefix))
+    return s3
+
+
+def _warm(monkeypatch):
+    monkeypatch.setattr(b2_listing, "_fetch_all_objects", lambda prefix: _snapshot())
+    list_cache.cached_listing("", b2_listing._fetch_all_objects)
+
+
+async def _walk(client, query):
+    keys, cursor = [], None
+    while True:
+        url = f"/files/page?sort=key&{query}" + (f"&cursor={cursor}" if cursor else "")
+        response = await client.get(url)
+        assert response.status_code == 200
+        keys += [f["key"] for f in response.json()["files"]]
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            return keys
+
+
+@pytest.mark.asyncio
+async def test_a_cold_first_page_is_one_request(client, s3):
+    response = await client.get("/files?sort=key&limit=3&prefix=uploads/")
+
+    assert [f["key"] for f in response.json()] == [k for k in _KEYS if k.startswith("uploads/")][:3]
+    assert s3.calls == [{"Prefix": "uploads/", "StartAfter": "", "MaxKeys": 3}]
+    assert s3.warmed == [""]  # the full scan still starts, for next time
+    assert "X-Listing-Complete" not in response.headers
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("prefix", "limit"), [("", 4), ("uploads/", 7), ("", 1000)])
+async def test_cold_and_warm_pages_agree(client, s3, monkeypatch, prefix, limit):
+    expected = [k for k in _KEYS if k.startswith(prefix)]
+
+    cold = await _walk(client, f"prefix={prefix}&limit={limit}")
+    # One request per page, each after the last key served.
+    assert len(s3.calls) == -(-len(expected) // limit)
+    assert [call["StartAfter"] for call in s3.calls[1:]] == cold[limit - 1 : -1 : limit]
+
+    _warm(monkeypatch)
+    s3.calls.clear()
+    warm = await _walk(client, f"prefix={prefix}&limit={limit}")
+
+    assert s3.calls == []
+    assert cold == warm == expected
+
+
+@pytest.mark.asyncio
+async def test_a_cold_cursor_continues_on_a_warm_cache(client, s3, monkeypatch):
+    first = (await client.get("/files/page?sort=key&limit=5")).json()
+    _warm(monkeypatch)
+
+    second = (await client.get(f"/files/page?sort=key&limit=5&cursor={first['next_cursor']}")).json()
+
+    assert [f["key"] for f in first["files"] + second["files"]] == _KEYS[:10]
+
+
+@pytest.mark.asyncio
+async def test_descending_key_order_uses_the_snapshot(client, s3, monkeypatch):
+    _warm(monkeypatch)
+
+    response = await client.get("/files?sort=key&order=desc&limit=3")
+
+    assert [f["key"] for f in response.json()] == _KEYS[::-1][:3]
+    assert s3.calls == []
+
+
+@pytest.mark.asyncio
+async def test_key_cursors_are_checked(client, s3):
+    position_cursor = encode_cursor(["v1", "", "key", "asc", 5])
+    other_query = encode_cursor([None, "docs/", "key", "asc", "docs/a.pdf"])
+
+    for cursor in (position_cursor, other_query):
+        assert (await client.get(f"/files/page?sort=key&cursor={cursor}")).status_code == 400
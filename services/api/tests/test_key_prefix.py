@@ -9,7 +9,7 @@ from app.service import files as files_service
 from app.types import FileMetadata
 
 
-def _fake_metadata(key: str) -> FileMetadata:
+async def _fake_metadata(key: str) -> FileMetadata:
     return FileMetadata(
         key=key,
         filename=key.rsplit("/", 1)[-1],
@@ -25,7 +25,7 @@ def _fake_metadata(key: str) -> FileMetadata:
 @pytest.mark.asyncio
 async def test_key_outside_allowed_prefix_rejected(client, monkeypatch):
     monkeypatch.setattr(settings, "allowed_key_prefix", "uploads/")
-    monkeypatch.setattr(files_service, "get_file_metadata", _fake_metadata)
+    monkeypatch.setattr(files_service, "get_file_metadata_async", _fake_metadata)
 
     resp = await client.get(
         "/files-by-key/metadata", params={"key": "other/secret.txt"}
@@ -36,7 +36,7 @@ async def test_key_outside_allowed_prefix_rejected(client, monkeypatch):
 @pytest.mark.asyncio
 async def test_key_inside_allowed_prefix_allowed(client, monkeypatch):
     monkeypatch.setattr(settings, "allowed_key_prefix", "uploads/")
-    monkeypatch.setattr(files_service, "get_file_metadata", _fake_metadata)
+    monkeypatch.setattr(files_service, "get_file_metadata_async", _fake_metadata)
 
     resp = await client.get(
         "/files-by-key/metadata", params={"key": "uploads/a.txt"}
@@ -48,7 +48,7 @@ async def test_key_inside_allowed_prefix_allowed(client, monkeypatch):
 @pytest.mark.asyncio
 async def test_arbitrary_key_allowed_by_default(client, monkeypatch):
     # Default (empty prefix) preserves the by-key routes' arbitrary-key support.
-    monkeypatch.setattr(files_service, "get_file_metadata", _fake_metadata)
+    monkeypatch.setattr(files_service, "get_file_metadata_async", _fake_metadata)
 
     resp = await client.get(
         "/files-by-key/metadata", params={"key": "tenant-a/reports/q1.txt"}
@@ -7,12 +7,14 @@ that made every expiry block again would hand that 8-20s wait back to the user
 without failing any other test.
 """
 
+import threading
 import time
 
 import pytest
 
 from app.config import settings
 from app.repo import list_cache
+from app.repo.list_builder import Delta, SnapshotBuilder
 
 
 class _CountingFetch:
@@ -121,6 +123,105 @@ def test_nonempty_prefix_is_never_cached(monkeypatch):
     assert list_cache._entry("folder/") is None
 
 
+class _SnapshotFetch:
+    """Fetch stub returning a real snapshot of `keys` (prefix-filtered)."""
+
+    def __init__(self, keys: list[str]):
+        self.keys = keys
+        self.prefixes: list[str] = []
+
+    def __call__(self, prefix: str):
+        self.prefixes.append(prefix)
+        builder = SnapshotBuilder()
+        for key in self.keys:
+            if key.startswith(prefix):
+                builder.add(key, 1, 0)
+        return builder.build()
+
+
+_TREE = ["a.txt", "uploads/a/1.txt", "uploads/a/2.txt", "uploads/ab.txt", "uploads/b/3.txt"]
+
+
+def test_prefix_is_sliced_from_the_root_snapshot(monkeypatch):
+    monkeypatch.setattr(settings, "list_cache_ttl_seconds", 300.0)
+    fetch = _SnapshotFetch(_TREE)
+    list_cache.cached_listing("", fetch)
+
+    folder = list_cache.cached_listing("uploads/a/", fetch)
+    stem = list_cache.cached_listing("uploads/a", fetch)
+    missing = list_cache.cached_listing("zzz/", fetch)
+
+    assert list(folder.keys()) == ["uploads/a/1.txt", "uploads/a/2.txt"]
+    assert list(stem.keys()) == ["uploads/a/1.txt", "uploads/a/2.txt", "uploads/ab.txt"]
+    assert len(missing) == 0
+    assert fetch.prefixes == [""]  # only the root scan ever reached B2
+
+
+def test_prefix_from_a_stale_root_refreshes_the_root(monkeypatch):
+    monkeypatch.setattr(settings, "list_cache_ttl_seconds", 0.0)
+    fetch = _SnapshotFetch(_TREE)
+    list_cache.cached_listing("", fetch)
+
+    listing = list_cache.cached_listing("uploads/b/", fetch)
+
+    assert list(listing.keys()) == ["uploads/b/3.txt"]
+    assert _wait_for(lambda: fetch.prefixes == ["", ""])
+
+
+def _upsert(*keys: str) -> Delta:
+    return Delta({key: (7, 1000) for key in keys}, frozenset())
+
+
+def test_a_write_patches_the_snapshot_without_a_rescan(monkeypatch):
+    monkeypatch.setattr(settings, "list_cache_ttl_seconds", 300.0)
+    fetch = _SnapshotFetch(_TREE)
+    list_cache.cached_listing("", fetch)
+    before = list_cache._entry("").generation
+
+    list_cache.apply(Delta({"uploads/new.txt": (7, 1000)}, frozenset({"a.txt"})))
+    listing = list_cache.cached_listing("", fetch)
+
+    assert "uploads/new.txt" in listing
+    assert "a.txt" not in listing
+    assert list_cache._entry("").generation > before
+    assert fetch.prefixes == [""]  # stayed warm
+
+
+def test_a_write_during_a_scan_is_replayed_onto_it(monkeypatch):
+    monkeypatch.setattr(settings, "list_cache_ttl_seconds", 300.0)
+    listed = threading.Event()
+    release = threading.Event()
+
+    def slow_fetch(prefix: str):
+        snapshot = _SnapshotFetch(_TREE)(prefix)  # listed before the write landed
+        listed.set()
+        release.wait(5)
+        return snapshot
+
+    scan = threading.Thread(target=list_cache.cached_listing, args=("", slow_fetch))
+    scan.start()
+    assert listed.wait(5)
+    list_cache.apply(_upsert("uploads/new.txt"))
+    release.set()
+    scan.join(5)
+
+    # The scan's own result lacked the write; it was replayed before storing.
+    assert "uploads/new.txt" in list_cache.peek("")
+
+
+def test_a_failed_patch_falls_back_to_invalidation(monkeypatch):
+    fetch = _SnapshotFetch(_TREE)
+    list_cache.cached_listing("", fetch)
+
+    def broken(_snapshot, _delta):
+        raise RuntimeError("bug")
+
+    monkeypatch.setattr(list_cache, "patch_snapshot", broken)
+    list_cache.apply(_upsert("uploads/new.txt"))
+
+    assert list_cache.peek("") is None  # next read rescans
+
+
 def test_prewarm_populates_without_a_caller_waiting(monkeypatch):
     monkeypatch.setattr(settings, "list_cache_ttl_seconds", 300.0)
     fetch = _CountingFetch(delay=0.1)
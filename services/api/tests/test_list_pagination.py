@@ -8,7 +8,17 @@ capped at the first page.
 
 from datetime import UTC, datetime
 
-from app.repo import b2_client
+import pytest
+
+from app.config import settings
+from app.repo import b2_client, b2_listing, list_cache
+
+
+@pytest.fixture(autouse=True)
+def sequential_scan(monkeypatch):
+    """These tests pin the continuation-token chain, so scan as one range.
+    The partitioned scan has its own tests in test_parallel_scan.py."""
+    monkeypatch.setattr(settings, "list_scan_partitions", 1)
 
 
 class _FakePaginatedS3:
@@ -23,6 +33,12 @@ class _FakePaginatedS3:
         # First request carries no token; subsequent ones echo NextContinuationToken.
         return self._pages[kwargs.get("ContinuationToken")]
 
+    def put_object(self, **kwargs):
+        pass
+
+    def delete_object(self, **kwargs):
+        pass
+
 
 def _obj(key: str, size: int = 10) -> dict:
     return {"Key": key, "Size": size, "LastModified": datetime.now(UTC)}
@@ -42,13 +58,14 @@ def _install_fake_client(monkeypatch) -> _FakePaginatedS3:
     }
     client = _FakePaginatedS3(pages)
     monkeypatch.setattr(b2_client, "get_s3_client", lambda: client)
+    monkeypatch.setattr(b2_listing, "get_s3_client", lambda: client)
     return client
 
 
 def test_list_files_follows_continuation_token(monkeypatch):
     client = _install_fake_client(monkeypatch)
 
-    files = b2_client.list_files()
+    files = b2_listing.list_files()
 
     assert {f.key for f in files} == {
         "uploads/a.txt",
@@ -61,7 +78,7 @@ def test_list_files_follows_continuation_token(monkeypatch):
 def test_upload_stats_counts_all_pages(monkeypatch):
     _install_fake_client(monkeypatch)
 
-    stats = b2_client.get_upload_stats()
+    stats = b2_listing.get_upload_stats()
 
     assert stats["total_files"] == 3
     assert stats["total_size_bytes"] == 30
@@ -70,8 +87,8 @@ def test_upload_stats_counts_all_pages(monkeypatch):
 def test_empty_prefix_listing_is_cached(monkeypatch):
     client = _install_fake_client(monkeypatch)
 
-    b2_client.list_files()
-    b2_client.list_files()
+    b2_listing.list_files()
+    b2_listing.list_files()
 
     # Second call is served from cache — only the first scan hit B2 (2 pages).
     assert client.calls == 2
@@ -80,18 +97,32 @@ def test_empty_prefix_listing_is_cached(monkeypatch):
 def test_nonempty_prefix_is_not_cached(monkeypatch):
     client = _install_fake_client(monkeypatch)
 
-    b2_client.list_files("folder/")
-    b2_client.list_files("folder/")
+    b2_listing.list_files("folder/")
+    b2_listing.list_files("folder/")
 
-    # Arbitrary client-supplied prefixes bypass the cache, so both calls scan.
+    # With no root snapshot to slice, client-supplied prefixes bypass the cache,
+    # so both calls scan.
     assert client.calls == 4
 
 
 def test_mutation_invalidates_cache(monkeypatch):
     client = _install_fake_client(monkeypatch)
 
-    b2_client.list_files()  # scan + cache (2 pages)
-    b2_client._invalidate_list_cache()
-    b2_client.list_files()  # cache voided → rescan (2 more)
+    b2_listing.list_files()  # scan + cache (2 pages)
+    list_cache.invalidate()
+    b2_listing.list_files()  # cache voided → rescan (2 more)
 
     assert client.calls == 4
+
+
+def test_own_writes_patch_the_cache_instead_of_invalidating(monkeypatch):
+    client = _install_fake_client(monkeypatch)
+    b2_listing.list_files()  # scan + cache (2 pages)
+
+    b2_client.upload_file(b"12345", "uploads/new.txt", "text/plain")
+    b2_client.delete_file("uploads/a.txt")
+    files = b2_listing.list_files()
+
+    assert {f.key for f in files} == {"uploads/b.txt", "uploads/c.txt", "uploads/new.txt"}
+    assert next(f.size_bytes for f in files if f.key == "uploads/new.txt") == 5
+    assert client.calls == 2  # still warm: no rescan after either write
@@ -0,0 +1,69 @@
+"""Tests for `repo/list_rows.py`, the list routes' serialization fast path.
+
+The JSON values built straight from snapshot rows must be exactly what the
+`FileMetadata` models — and so the pre-fast-path responses — serialize to.
+"""
+
+import json
+import random
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.config import settings
+from app.repo.b2_client import _public_url
+from app.repo.list_builder import snapshot_from_objects
+from app.repo.list_rows import FileRows, iso_utc
+from app.repo.list_snapshot import epoch_ms, from_epoch_ms
+from app.types import FileMetadata
+
+
+def _snapshot():
+    rng = random.Random(7)
+    start = datetime(2019, 1, 1, tzinfo=UTC)
+    keys = ["a.txt", "Ünïcode dir/naïve café.pdf", "spaces here/x y#1?.png", "deep/a/b/c.tar.gz"]
+    keys += [f"f{i % 7}/file-{i}.{rng.choice(['jpg', 'csv', 'bin', ''])}" for i in range(300)]
+    return snapshot_from_objects(
+        {
+            "Key": key,
+            "Size": rng.choice([0, 1, 1023, 1024, rng.randrange(1 << 40)]),
+            # Whole seconds for some, so both timestamp forms are covered.
+            "LastModified": start + timedelta(
+                seconds=rng.randrange(10**8), milliseconds=rng.choice([0, rng.randrange(1000)])
+            ),
+        }
+        for key in sorted(set(keys))
+    )
+
+
+@pytest.mark.parametrize("public_url", ["", "https://cdn.example.com/files"])
+def test_objects_serialize_like_the_models(monkeypatch, public_url):
+    monkeypatch.setattr(settings, "b2_public_url", public_url)
+    files = FileRows(_snapshot())
+
+    expected = [json.loads(m.model_dump_json()) for m in files]
+    assert [m["url"] for m in expected] == [_public_url(m["key"]) for m in expected]
+
+    assert files.objects() == expected
+    assert files.values(["url", "key"]) == [[m["url"], m["key"]] for m in expected]
+    assert files.objects(["size_human"]) == [{"size_human": m["size_human"]} for m in expected]
+
+
+def test_timestamps_match_pydantic():
+    for ms in [0, 999, 1000, 1_767_225_600_000, 1_767_225_600_007, 1_767_225_600_120, 4_102_444_800_001]:
+        model = FileMetadata(
+            key="k", filename="k", folder="", size_bytes=0, size_human="0.0 B",
+            content_type="x", uploaded_at=from_epoch_ms(ms),
+        )
+        assert json.loads(model.model_dump_json())["uploaded_at"] == iso_utc(ms)
+        assert epoch_ms(from_epoch_ms(ms)) == ms
+
+
+def test_rows_are_a_sequence_of_models():
+    snapshot = _snapshot()
+    files = FileRows(snapshot, [5, 1, 3])
+
+    assert len(files) == 3
+    assert [f.key for f in files] == [snapshot.key(5), snapshot.key(1), snapshot.key(3)]
+    assert files[-1].key == snapshot.key(3)
+    assert [f.key for f in files[1:]] == [snapshot.key(1), snapshot.key(3)]
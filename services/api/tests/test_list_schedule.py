@@ -0,0 +1,150 @@
+"""Tests for the adaptive listing refresh interval (`repo/list_schedule.py`).
+
+A rescan that finds the bucket unchanged must back the interval off, one that
+finds outside changes must shorten it — within the configured bounds — and the
+app's own written-through uploads must not count as churn.
+"""
+
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+
+import pytest
+
+from app.config import settings
+from app.repo import list_cache, list_schedule
+from app.repo.list_builder import Delta, patch_snapshot, snapshot_from_objects
+from app.repo.list_schedule import count_changes
+from app.repo.list_snapshot import epoch_ms
+
+
+def _snapshot(*objects: tuple[str, int]):
+    when = datetime(2026, 3, 4, tzinfo=UTC)
+    return snapshot_from_objects(
+        {"Key": key, "Size": size, "LastModified": when} for key, size in sorted(objects)
+    )
+
+
+@pytest.fixture(autouse=True)
+def bounds(monkeypatch):
+    monkeypatch.setattr(settings, "list_cache_ttl_seconds", 60.0)
+    monkeypatch.setattr(settings, "list_refresh_min_seconds", 15.0)
+    monkeypatch.setattr(settings, "list_refresh_max_seconds", 480.0)
+
+
+def test_count_changes():
+    base = _snapshot(("a", 1), ("b", 2), ("c", 3))
+
+    assert count_changes(base, _snapshot(("a", 1), ("b", 2), ("c", 3))) == 0
+    assert count_changes(base, _snapshot(("a", 1), ("c", 3))) == 1  # removed
+    assert count_changes(base, _snapshot(("a", 1), ("b", 2), ("bb", 0), ("c", 3))) == 1
+    assert count_changes(base, _snapshot(("a", 1), ("b", 20), ("c", 3))) == 1  # resized
+    assert count_changes(base, _snapshot(("0", 0), ("b", 2), ("d", 4))) == 4
+    assert count_changes(base, _snapshot()) == 3
+    touched = snapshot_from_objects(
+        {"Key": k, "Size": n, "LastModified": datetime(2026, 3, 4, 0, 0, 1, tzinfo=UTC)}
+        for k, n in (("a", 1), ("b", 2), ("c", 3))
+    )
+    assert count_changes(base, touched) == 3  # rewritten outside the app, same sizes
+
+
+def test_a_patched_snapshot_compares_by_content_not_layout():
+    base = _snapshot(("a", 1), ("c", 3))
+    when = base.mtimes[0]
+    patched = patch_snapshot(base, Delta({"b": (2, when)}, frozenset()))
+    rebuilt = _snapshot(("a", 1), ("b", 2), ("c", 3))
+
+    assert patched.blob != rebuilt.blob  # appended key, different buffer
+    assert count_changes(patched, rebuilt) == 0
+
+
+def test_quiet_refreshes_back_off_and_churn_shortens_the_interval():
+    quiet = _snapshot(("a", 1))
+    intervals = []
+    for _ in range(5):
+        list_schedule.observe(quiet, _snapshot(("a", 1)), elapsed=60)
+        intervals.append(list_schedule.interval())
+    assert intervals == [120, 240, 480, 480, 480]  # doubling, capped at the max
+
+    busy = _snapshot(*((f"k{i}", i) for i in range(30)))
+    for _ in range(7):
+        list_schedule.observe(quiet, busy, elapsed=30)
+    assert list_schedule.interval() == 15  # halving, floored at the min
+    assert list_schedule.refresh_schedule() == (15, 31, 31 / 30)
+
+
+def test_low_churn_still_backs_off_and_moderate_churn_holds():
+    quiet = _snapshot(("a", 1))
+    one_upload = _snapshot(("a", 1), ("b", 2))
+
+    list_schedule.observe(quiet, one_upload, elapsed=3600)  # an upload an hour
+    assert list_schedule.interval() == 120
+    list_schedule.observe(quiet, one_upload, elapsed=60)  # one a minute: the dead band
+    assert list_schedule.interval() == 120
+    list_schedule.observe(quiet, _snapshot(("a", 1), ("b", 2), ("c", 3)), elapsed=60)
+    assert list_schedule.interval() == 120  # two writes don't collapse it
+
+
+def test_the_fixed_ttl_can_be_restored(monkeypatch):
+    monkeypatch.setattr(settings, "list_refresh_adaptive", False)
+    list_schedule.observe(_snapshot(("a", 1)), _snapshot(("a", 1)), elapsed=60)
+    assert list_schedule.interval() == 60
+
+
+class _Fetch:
+    def __init__(self, listing):
+        self.listing = listing
+
+    def __call__(self, _prefix: str):
+        return self.listing
+
+
+def _rescan(fetch: _Fetch) -> None:
+    """Age the cached entry past any interval, then run the refresh."""
+    entry = list_cache._entry("")
+    list_cache._list_cache[""] = entry._replace(stored_at=float("-inf"))
+    list_cache._refresh("", fetch)
+
+
+def test_refreshes_adapt_the_cache_interval():
+    fetch = _Fetch(_snapshot(("uploads/a", 1)))
+    list_cache.cached_listing("", fetch)  # the first scan has nothing to compare with
+    assert list_schedule.interval() == 60
+
+    _rescan(fetch)
+    assert list_schedule.interval() == 120
+
+    fetch.listing = _snapshot(("uploads/a", 1), ("uploads/by-another-app", 5))
+    _rescan(fetch)
+    assert list_schedule.interval() == 60
+    assert list_schedule.refresh_schedule().last_changes == 1
+
+
+def test_written_through_uploads_are_not_churn():
+    fetch = _Fetch(_snapshot(("uploads/a", 1), ("uploads/replaced", 2)))
+    list_cache.cached_listing("", fetch)
+
+    # What `verify_upload`'s HEAD reports: whole seconds, as an HTTP date.
+    head = epoch_ms(parsedate_to_datetime("Wed, 04 Mar 2026 12:00:05 GMT"))
+    list_cache.apply(Delta({"uploads/ours": (7, head), "uploads/replaced": (3, head)}, frozenset()))
+    # The bucket lists them too, with the milliseconds the HEAD dropped.
+    listed = datetime(2026, 3, 4, 12, 0, 5, 789_000, tzinfo=UTC)
+    fetch.listing = snapshot_from_objects(
+        [{"Key": "uploads/a", "Size": 1, "LastModified": datetime(2026, 3, 4, tzinfo=UTC)}]
+        + [{"Key": k, "Size": n, "LastModified": listed}
+           for k, n in (("uploads/ours", 7), ("uploads/replaced", 3))]
+    )
+    _rescan(fetch)
+
+    assert list_schedule.refresh_schedule().last_changes == 0
+    assert list_schedule.interval() == 120
+
+
+@pytest.mark.asyncio
+async def test_metrics_export_the_schedule(client):
+    list_schedule.observe(_snapshot(("a", 1)), _snapshot(("a", 1), ("b", 2)), elapsed=4)
+
+    body = (await client.get("/metrics")).text
+
+    assert "listing_refresh_interval_seconds 30.000" in body
+    assert "listing_refresh_changes 1" in body
+    assert "listing_churn_per_second 0.250000" in body
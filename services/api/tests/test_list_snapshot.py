@@ -0,0 +1,166 @@
+"""Tests for the columnar listing snapshot (`repo/list_snapshot.py`).
+
+The snapshot replaces botocore's list of dicts everywhere the listing is read,
+so every accessor must agree with what the dict-based code derived — key,
+folder, size, timestamp to the millisecond, and the mimetypes content type.
+"""
+
+import random
+from datetime import UTC, datetime
+
+import pytest
+
+from app.repo import b2_client
+from app.repo.list_builder import Delta, SnapshotBuilder, patch_snapshot, snapshot_from_objects
+from app.repo.list_snapshot import ListingSnapshot, from_epoch_ms
+
+_KEYS = [
+    "README",
+    "uploads/a.txt",
+    "uploads/archive.tar.gz",
+    "uploads/photos/IMG_0001.JPG",
+    "uploads/photos/.hidden",
+    "uploads/é ü/ß.pdf",
+    "uploads/no-extension",
+]
+
+
+def _obj(key: str, i: int = 0) -> dict:
+    when = datetime(2026, 3, 4, 5, 6, 7, 123_000, tzinfo=UTC)
+    return {"Key": key, "Size": 10 * i, "LastModified": when}
+
+
+def test_accessors_match_the_dict_listing():
+    objects = [_obj(key, i) for i, key in enumerate(sorted(_KEYS))]
+
+    snapshot = snapshot_from_objects(objects)
+
+    assert len(snapshot) == len(objects)
+    for i, obj in enumerate(objects):
+        folder, filename = b2_client._split_key(obj["Key"])
+        assert snapshot.key(i) == obj["Key"]
+        assert snapshot.folder(i) == folder
+        assert snapshot.key(i)[len(folder):] == filename
+        assert snapshot.size(i) == obj["Size"]
+        assert snapshot.uploaded_at(i) == obj["LastModified"]
+        assert snapshot.content_type(i) == b2_client._guess_content_type(obj["Key"])
+
+
+def test_out_of_order_input_is_sorted():
+    keys = [f"uploads/{n:04d}.txt" for n in range(200)]
+    shuffled = keys[:]
+    random.Random(7).shuffle(shuffled)
+    builder = SnapshotBuilder()
+    for key in shuffled:
+        builder.add(key, int(key[8:12]), 0)
+
+    snapshot = builder.build()
+
+    assert list(snapshot.keys()) == keys
+    assert list(snapshot.sizes) == list(range(200))  # columns moved with their keys
+
+
+def test_folders_and_content_types_are_interned():
+    builder = SnapshotBuilder()
+    for n in range(1000):
+        builder.add(f"uploads/{n % 3}/file-{n:04d}.png", n, n)
+
+    snapshot = builder.build()
+
+    assert len(snapshot.folders) == 3
+    assert snapshot.content_types == ("image/png",)
+
+
+@pytest.mark.parametrize(
+    ("prefix", "expected"),
+    [
+        ("", _KEYS),
+        ("uploads/photos/", ["uploads/photos/.hidden", "uploads/photos/IMG_0001.JPG"]),
+        ("uploads/é", ["uploads/é ü/ß.pdf"]),
+        ("uploads/a", ["uploads/a.txt", "uploads/archive.tar.gz"]),
+        ("uploads/zzz", []),
+        ("0", []),
+    ],
+)
+def test_with_prefix_is_the_key_range(prefix, expected):
+    snapshot = snapshot_from_objects(_obj(k, i) for i, k in enumerate(sorted(_KEYS)))
+
+    sliced = snapshot.with_prefix(prefix)
+
+    assert list(sliced.keys()) == sorted(expected)
+    # Every column moved with its key.
+    assert list(sliced.rows()) == [row for row in snapshot.rows() if row[0].startswith(prefix)]
+
+
+def test_patch_inserts_updates_and_deletes_in_key_order():
+    snapshot = snapshot_from_objects(_obj(k, i) for i, k in enumerate(sorted(_KEYS)))
+    delta = Delta(
+        {"uploads/a.txt": (99, 5), "uploads/new/x.webp": (1, 6), "0-first.md": (2, 7)},
+        frozenset({"README", "uploads/no-extension", "not/there"}),
+    )
+
+    patched = patch_snapshot(snapshot, delta)
+
+    expected = {row[0]: row for row in snapshot.rows()}
+    for key in delta.deletes:
+        expected.pop(key, None)
+    for key, (size, mtime) in delta.upserts.items():
+        folder = key[: key.rfind("/") + 1]
+        expected[key] = (key, folder, size, mtime, b2_client._guess_content_type(key))
+    assert list(patched.rows()) == [expected[key] for key in sorted(expected)]
+    assert list(snapshot.keys()) == sorted(_KEYS)  # the original is untouched
+
+
+def test_patch_widens_narrow_id_columns():
+    builder = SnapshotBuilder()
+    builder.add("f0/a.txt", 1, 1)
+    snapshot = builder.build()
+    new_folders = {f"f{n:03d}/a.txt": (1, 1) for n in range(1, 300)}  # > 255 folder ids
+
+    patched = patch_snapshot(snapshot, Delta(new_folders, frozenset()))
+
+    assert len(patched) == 300
+    assert patched.folder(299) == "f299/"
+    assert patched.key(0) == "f0/a.txt"
+
+
+def test_find_and_contains():
+    snapshot = snapshot_from_objects(_obj(k) for k in sorted(_KEYS))
+
+    assert snapshot.key(snapshot.find("uploads/a.txt")) == "uploads/a.txt"
+    assert snapshot.find("uploads/a") is None
+    assert "README" in snapshot
+    assert "zzz" not in snapshot
+
+
+def test_bytes_round_trip():
+    snapshot = snapshot_from_objects(_obj(k, i) for i, k in enumerate(sorted(_KEYS)))
+
+    restored = ListingSnapshot.from_bytes(snapshot.to_bytes())
+
+    assert list(restored.rows()) == list(snapshot.rows())
+
+
+def test_truncated_bytes_are_rejected():
+    data = snapshot_from_objects([_obj("uploads/a.txt")]).to_bytes()
+
+    with pytest.raises(ValueError):
+        ListingSnapshot.from_bytes(data[:30])
+
+
+def test_epoch_ms_survives_the_millisecond_boundary():
+    # 999 ms through a float division would round up into the next second.
+    assert from_epoch_ms(1_700_000_000_999) == datetime.fromtimestamp(1_700_000_000, UTC).replace(
+        microsecond=999_000
+    )
+
+
+def test_bytes_per_object_is_far_below_a_dict_listing():
+    builder = SnapshotBuilder()
+    for n in range(10_000):
+        builder.add(f"uploads/{n % 20:02d}/{n:08x}-photo.jpg", n, 1_700_000_000_000 + n)
+
+    snapshot = builder.build()
+
+    # 26-byte keys + ~20 bytes of columns; botocore's dicts cost several hundred.
+    assert snapshot.bytes_per_object < 60
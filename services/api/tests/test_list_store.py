@@ -0,0 +1,188 @@
+"""Tests for the persisted listing snapshot (`repo/list_store.py`).
+
+A restart must serve the last root scan from disk, as *stale*, instead of
+blocking the first caller on a cold B2 scan — and a damaged file must cost at
+most that cold scan, never an error.
+"""
+
+import time
+from datetime import UTC, datetime
+
+import pytest
+
+from app.config import settings
+from app.repo import list_cache, list_store
+from app.repo.list_builder import Delta, snapshot_from_objects
+from app.repo.list_snapshot import ListingSnapshot
+
+
+@pytest.fixture(autouse=True)
+def snapshot_file(tmp_path, monkeypatch):
+    path = tmp_path / "list_snapshot.bin"
+    monkeypatch.setattr(settings, "list_snapshot_file", str(path))
+    monkeypatch.setattr(settings, "list_cache_ttl_seconds", 300.0)
+    yield path
+    list_cache._reset_state()
+
+
+def _obj(key: str, size: int = 10, ms: int = 123) -> dict:
+    when = datetime(2026, 3, 4, 5, 6, 7, ms * 1000, tzinfo=UTC)
+    return {"Key": key, "Size": size, "LastModified": when}
+
+
+def _snapshot(objects: list[dict]) -> ListingSnapshot:
+    return snapshot_from_objects(objects)
+
+
+def _keys(listing: ListingSnapshot) -> list[str]:
+    return list(listing.keys())
+
+
+class _Fetch:
+    def __init__(self, objects: list[dict], delay: float = 0.0):
+        self.listing = _snapshot(objects)
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self, _prefix: str) -> ListingSnapshot:
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.listing
+
+
+def _restart() -> None:
+    """Forget all in-memory listing state, as a new process would."""
+    list_cache._reset_state()
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_round_trip_preserves_every_field():
+    listing = _snapshot(
+        [_obj("uploads/a.txt", 1, 0), _obj("uploads/é ü/ß.pdf", 2**40, 999), _obj("x.gz")]
+    )
+
+    list_store.save(listing, generation=7, scanned_at=1234.5)
+    stored = list_store.load()
+
+    assert (stored.generation, stored.scanned_at) == (7, 1234.5)
+    assert list(stored.listing.rows()) == list(listing.rows())
+
+
+def test_a_version_1_file_is_ignored(snapshot_file):
+    list_store.save(_snapshot([_obj("uploads/a.txt")]), generation=1, scanned_at=0.0)
+    data = bytearray(snapshot_file.read_bytes())
+    data[8:10] = (1).to_bytes(2, "little")
+    snapshot_file.write_bytes(bytes(data))
+
+    assert list_store.load() is None
+
+
+def test_restart_serves_the_disk_snapshot_without_waiting():
+    list_cache.cached_listing("", _Fetch([_obj("uploads/old.txt")]))
+    _restart()
+
+    slow = _Fetch([_obj("uploads/new.txt")], delay=0.3)
+    started = time.monotonic()
+    listing = list_cache.cached_listing("", slow)
+
+    assert time.monotonic() - started < 0.3
+    assert _keys(listing) == ["uploads/old.txt"]
+    # ...served as stale: the normal refresh replaces it in the background.
+    assert _wait_for(lambda: not list_cache._refreshing)
+    assert _keys(list_cache.cached_listing("", slow)) == ["uploads/new.txt"]
+    assert slow.calls == 1
+
+
+def test_prewarm_restores_then_refreshes():
+    list_cache.cached_listing("", _Fetch([_obj("uploads/old.txt")]))
+    _restart()
+
+    fresh = _Fetch([_obj("uploads/new.txt")], delay=0.1)
+    list_cache.prewarm("", fresh)
+
+    assert _keys(list_cache.peek("")) == ["uploads/old.txt"]
+    assert _wait_for(lambda: not list_cache._refreshing)
+    assert _keys(list_cache.peek("")) == ["uploads/new.txt"]
+
+
+def test_generation_stays_monotonic_across_restarts():
+    list_cache.cached_listing("", _Fetch([_obj("uploads/a.txt")]))
+    before = list_cache._entry("").generation
+    _restart()
+    list_cache._list_generation = 0  # a new process starts from zero
+
+    # Slow refresh, so the restored entry is still the one cached below.
+    list_cache.cached_listing("", _Fetch([], delay=0.3))
+
+    assert list_cache._entry("").generation == before
+    assert list_cache._list_generation >= before
+
+
+def test_disk_snapshot_is_not_restored_after_an_invalidation():
+    list_cache.cached_listing("", _Fetch([_obj("uploads/old.txt")]))
+    _restart()
+    list_cache.cached_listing("", _Fetch([]))  # restores once
+
+    list_cache.invalidate()
+    fetch = _Fetch([_obj("uploads/after-delete.txt")])
+
+    # A mutation must be followed by a fresh scan, never the pre-mutation disk copy.
+    assert list_cache.cached_listing("", fetch) == fetch.listing
+    assert fetch.calls == 1
+
+
+def test_disk_snapshot_is_not_restored_after_a_write():
+    list_cache.cached_listing("", _Fetch([_obj("uploads/old.txt")]))
+    _restart()
+
+    # An upload before the first read: the disk copy predates it.
+    list_cache.apply(Delta({"uploads/new.txt": (1, 0)}, frozenset()))
+    fetch = _Fetch([_obj("uploads/new.txt")])
+
+    assert list_cache.cached_listing("", fetch) is fetch.listing
+    assert fetch.calls == 1
+
+
+@pytest.mark.parametrize(
+    "damage",
+    [
+        lambda data: data[:20],  # truncated header
+        lambda data: data[:-3],  # truncated body
+        lambda data: data[:-1] + bytes([data[-1] ^ 0xFF]),  # flipped bit
+        lambda data: b"NOTASNAP" + data[8:],  # foreign file
+    ],
+)
+def test_damaged_snapshot_means_a_cold_scan_not_an_error(snapshot_file, damage):
+    list_store.save(_snapshot([_obj("uploads/a.txt")]), generation=1, scanned_at=0.0)
+    snapshot_file.write_bytes(damage(snapshot_file.read_bytes()))
+
+    assert list_store.load() is None
+    fetch = _Fetch([_obj("uploads/b.txt")])
+    assert list_cache.cached_listing("", fetch) == fetch.listing
+
+
+def test_unwritable_location_is_logged_not_raised(tmp_path, monkeypatch, caplog):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    monkeypatch.setattr(settings, "list_snapshot_file", str(blocker / "snap.bin"))
+
+    list_store.save(_snapshot([_obj("uploads/a.txt")]), generation=1, scanned_at=0.0)
+
+    assert "Failed to persist listing snapshot" in caplog.text
+
+
+def test_empty_setting_disables_persistence(snapshot_file, monkeypatch):
+    monkeypatch.setattr(settings, "list_snapshot_file", "")
+
+    list_cache.cached_listing("", _Fetch([_obj("uploads/a.txt")]))
+
+    assert not snapshot_file.exists()
+    assert list_store.load() is None
@@ -0,0 +1,163 @@
+"""Repo-level tests for the range-partitioned bucket scan (`repo/b2_scan.py`).
+
+The ranges must tile the keyspace exactly — a gap silently drops objects from
+listings and stats, an overlap double-counts them — and they must really run
+concurrently, or the scan is no faster than the sequential paginator.
+"""
+
+import threading
+import time
+from datetime import UTC, datetime
+
+import pytest
+
+from app.config import settings
+from app.repo import b2_listing, b2_scan, list_cache
+
+
+class _FakeS3:
+    """In-memory ListObjectsV2 over a sorted key set.
+
+    Honours Prefix, StartAfter, MaxKeys, ContinuationToken and Delimiter the way
+    S3 does (lexicographic order, StartAfter exclusive), and records each call.
+    """
+
+    def __init__(self, keys, page_size: int = 1000, delay: float = 0.0):
+        self.keys = sorted(keys)
+        self.page_size = page_size
+        self.delay = delay
+        self.calls: list[dict] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def list_objects_v2(self, **kwargs):
+        with self._lock:
+            self.calls.append(kwargs)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            return self._page(**kwargs)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _page(self, Prefix="", StartAfter=None, ContinuationToken=None,
+              MaxKeys=1000, Delimiter=None, **_):
+        after = ContinuationToken or StartAfter or ""
+        keys = [k for k in self.keys if k.startswith(Prefix) and k > after]
+        if Delimiter:
+            folders = sorted({
+                Prefix + k[len(Prefix):].split(Delimiter, 1)[0] + Delimiter
+                for k in keys if Delimiter in k[len(Prefix):]
+            })
+            files = [k for k in keys if Delimiter not in k[len(Prefix):]]
+            return {
+                "Contents": [_obj(k) for k in files],
+                "CommonPrefixes": [{"Prefix": f} for f in folders],
+                "IsTruncated": False,
+            }
+        page = keys[: min(MaxKeys, self.page_size)]
+        truncated = len(keys) > len(page)
+        response = {"Contents": [_obj(k) for k in page], "IsTruncated": truncated}
+        if truncated:
+            response["NextContinuationToken"] = page[-1]
+        return response
+
+
+def _obj(key: str) -> dict:
+    return {"Key": key, "Size": 1, "LastModified": datetime(2026, 1, 1, tzinfo=UTC)}
+
+
+def _keys(n: int) -> list[str]:
+    return [f"uploads/file-{i:05d}.txt" for i in range(n)]
+
+
+@pytest.mark.parametrize(
+    "boundaries",
+    [
+        [],
+        ["uploads/file-00100.txt", "uploads/file-00200.txt"],  # real keys
+        ["uploads/file-0015", "uploads/file-00250.zzz"],  # between keys
+        ["a", "uploads/", "zzz"],  # outside the populated range
+    ],
+)
+def test_ranges_tile_the_keyspace_exactly(boundaries):
+    keys = _keys(300)
+    client = _FakeS3(keys, page_size=40)
+
+    listing = b2_scan.scan_partitioned(client, "bucket", "", boundaries, 4)
+
+    # Every key exactly once, and concatenation order is key order.
+    assert [obj["Key"] for obj in listing] == keys
+
+
+def test_ranges_are_listed_concurrently():
+    boundaries = b2_scan.boundaries_from_keys(_keys(400), 4)
+    client = _FakeS3(_keys(400), page_size=50, delay=0.02)
+
+    b2_scan.scan_partitioned(client, "bucket", "", boundaries, 4)
+
+    assert client.max_in_flight == 4
+
+
+def test_boundaries_from_keys_are_even_quantiles():
+    keys = _keys(1000)
+
+    boundaries = b2_scan.boundaries_from_keys(keys, 4)
+
+    assert boundaries == [keys[250], keys[500], keys[750]]
+
+
+def test_first_scan_splits_inside_a_single_top_level_folder():
+    # Everything the app writes lives under uploads/, so the top-level folders
+    # alone would leave the whole bucket in one range.
+    client = _FakeS3(["uploads/a.txt", "uploads/m.txt", "uploads/z.txt"])
+
+    boundaries = b2_scan.first_scan_boundaries(client, "bucket", "", 4)
+
+    assert client.calls[0]["Delimiter"] == "/"
+    assert len(boundaries) == 3
+    assert all(b.startswith("uploads/") for b in boundaries)
+
+
+def test_first_scan_uses_common_prefixes_when_there_are_enough():
+    keys = [f"{folder}/x.txt" for folder in "abcdefgh"]
+    client = _FakeS3(keys)
+
+    boundaries = b2_scan.first_scan_boundaries(client, "bucket", "", 4)
+
+    assert len(boundaries) == 3
+    assert set(boundaries) <= {f"{folder}/" for folder in "abcdefgh"}
+
+
+def test_root_scan_learns_ranges_from_the_previous_snapshot(monkeypatch):
+    monkeypatch.setattr(settings, "list_scan_partitions", 4)
+    keys = _keys(400)
+    client = _FakeS3(keys, page_size=100)
+    monkeypatch.setattr(b2_listing, "get_s3_client", lambda: client)
+
+    first = b2_listing._fetch_all_objects("")
+    list_cache._list_cache[""] = list_cache._Entry(time.monotonic(), first, 1, 0.0)
+    client.calls.clear()
+    second = b2_listing._fetch_all_objects("")
+
+    assert list(second.keys()) == keys
+    # No delimiter probe the second time: boundaries are the old key quantiles.
+    assert not any("Delimiter" in call for call in client.calls)
+    assert {call.get("StartAfter") for call in client.calls} == {
+        None, keys[100], keys[200], keys[300],
+    }
+
+
+def test_prefix_scans_stay_sequential(monkeypatch):
+    monkeypatch.setattr(settings, "list_scan_partitions", 4)
+    client = _FakeS3(_keys(50))
+    monkeypatch.setattr(b2_listing, "get_s3_client", lambda: client)
+
+    b2_listing._fetch_all_objects("uploads/")
+
+    assert len(client.calls) == 1
+    assert "StartAfter" not in client.calls[0]
@@ -0,0 +1,118 @@
+"""Tests for `repo/b2_presign.py`, the presigner that bypasses botocore.
+
+Every URL it signs must be byte-for-byte the one botocore's
+`generate_presigned_url` produces at the same instant, and the derived
+signing key must be computed once per day, not once per URL.
+"""
+
+from datetime import UTC, datetime
+
+import boto3
+import pytest
+from botocore.config import Config
+
+from app.config import settings
+from app.repo import b2_presign, generate_presigned_upload, get_presigned_url
+from app.repo.b2_presign import Presigner
+
+_NOW = datetime(2026, 3, 4, 23, 59, 59, tzinfo=UTC)
+_KEYS = [
+    "uploads/photo.png",
+    "a b+c~d.txt",
+    "Ünïcode dir/naïve café.pdf",
+    "odd/!*'();:@&=$,?#[]%/x",
+    "日本/テスト.bin",
+    "x/" + "y" * 300,
+]
+_ENDPOINTS = [
+    ("https://s3.us-west-004.backblazeb2.com", None),  # region resolved by botocore
+    ("https://S3.Example.com:443", "eu-central-003"),
+    ("http://127.0.0.1:9000", "us-west-004"),
+]
+
+
+@pytest.fixture(autouse=True)
+def frozen_botocore(monkeypatch):
+    monkeypatch.setattr(
+        "botocore.auth.get_current_datetime", lambda: _NOW.replace(tzinfo=None)
+    )
+
+
+def _pair(endpoint, region, secret="s3cr/t+key"):
+    client = boto3.client(
+        "s3",
+        endpoint_url=endpoint,
+        region_name=region,
+        aws_access_key_id="004abc",
+        aws_secret_access_key=secret,
+        config=Config(signature_version="s3v4"),
+    )
+    return client, Presigner(client.meta.endpoint_url, client.meta.region_name, "004abc", secret)
+
+
+@pytest.mark.parametrize(("endpoint", "region"), _ENDPOINTS)
+@pytest.mark.parametrize("key", _KEYS)
+def test_object_urls_match_botocore(endpoint, region, key):
+    client, presigner = _pair(endpoint, region)
+    disposition = "inline; filename=\"a%20b\"; filename*=UTF-8''a%20b"
+    cases = [
+        ("get_object", {"ResponseContentDisposition": disposition}, "GET",
+         {"response-content-disposition": disposition}, None),
+        ("get_object", {"Range": "bytes=0-511"}, "GET", None, {"Range": "bytes=0-511"}),
+        ("head_object", {}, "HEAD", None, None),
+        ("delete_object", {}, "DELETE", None, None),
+        ("put_object", {"ContentType": "text/plain;  charset=utf-8", "ContentLength": 5}, "PUT",
+         None, {"Content-Type": "text/plain;  charset=utf-8", "Content-Length": "5"}),
+    ]
+    for operation, params, method, query, headers in cases:
+        expected = client.generate_presigned_url(
+            operation, Params={"Bucket": "my-bucket", "Key": key, **params}, ExpiresIn=900
+        )
+        actual = presigner.presign(
+            method, "my-bucket", key, expires_in=900, query=query, headers=headers, now=_NOW
+        )
+        assert actual == expected, operation
+
+
+class _Frozen(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return _NOW
+
+
+def test_repo_presigns_match_botocore(monkeypatch):
+    monkeypatch.setattr(settings, "b2_endpoint", "https://s3.us-west-004.backblazeb2.com")
+    monkeypatch.setattr(settings, "b2_bucket_name", "my-bucket")
+    monkeypatch.setattr(settings, "b2_key_id", "004abc")
+    monkeypatch.setattr(settings, "b2_application_key", "s3cr/t+key")
+    monkeypatch.setattr(b2_presign, "datetime", _Frozen)
+    client = b2_presign.get_s3_client()
+    disposition = "attachment; filename=\"r%C3%A9sum%C3%A9.pdf\"; filename*=UTF-8''r%C3%A9sum%C3%A9.pdf"
+
+    assert get_presigned_url("docs/résumé.pdf", filename="résumé.pdf") == (
+        client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": "my-bucket", "Key": "docs/résumé.pdf",
+                    "ResponseContentDisposition": disposition},
+            ExpiresIn=600,
+        )
+    )
+    assert generate_presigned_upload("uploads/a.png", "image/png", 1234) == (
+        client.generate_presigned_url(
+            "put_object",
+            Params={"Bucket": "my-bucket", "Key": "uploads/a.png",
+                    "ContentType": "image/png", "ContentLength": 1234},
+            ExpiresIn=900,
+        )
+    )
+
+
+def test_the_signing_key_is_derived_once_per_day():
+    _, presigner = _pair("https://s3.us-west-004.backblazeb2.com", "us-west-004")
+    b2_presign._signing_key.cache_clear()
+
+    for key in _KEYS:
+        presigner.presign("GET", "my-bucket", key, expires_in=600, now=_NOW)
+    presigner.presign("GET", "my-bucket", "next-day", expires_in=600, now=datetime(2026, 3, 5, tzinfo=UTC))
+
+    assert b2_presign._signing_key.cache_info().misses == 2
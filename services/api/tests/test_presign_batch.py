@@ -0,0 +1,116 @@
+"""Tests for `POST /files/presign-batch`.
+
+A warm batch must take existence from the cached listing — no HEAD for a key
+the listing holds — and sign every URL locally; only keys the listing lacks
+(or all of them with nothing cached) may cost a HEAD.
+"""
+
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from app.config import settings
+from app.repo import counter, list_cache
+from app.repo.list_builder import snapshot_from_objects
+from app.service import presign as presign_service
+from app.types import FileMetadata
+
+_WHEN = datetime(2026, 3, 4, tzinfo=UTC)
+_KEYS = ["uploads/a.png", "uploads/b b.pdf", "docs/c.txt"]
+
+
+@pytest.fixture
+def heads(monkeypatch):
+    monkeypatch.setattr(settings, "b2_endpoint", "https://s3.us-west-004.backblazeb2.com")
+    monkeypatch.setattr(settings, "b2_bucket_name", "my-bucket")
+    monkeypatch.setattr(settings, "b2_key_id", "004abc")
+    monkeypatch.setattr(settings, "b2_application_key", "secret")
+
+    async def head(key):
+        if key == "outside/new.png":  # uploaded elsewhere since the scan
+            return FileMetadata(
+                key=key, filename="new.png", folder="outside/", size_bytes=1,
+                size_human="1 B", content_type="image/png", uploaded_at=_WHEN,
+            )
+        return None
+
+    mock = AsyncMock(side_effect=head)
+    monkeypatch.setattr(presign_service, "get_file_metadata_async", mock)
+    return mock
+
+
+def _warm():
+    snapshot = snapshot_from_objects(
+        {"Key": key, "Size": 1, "LastModified": _WHEN} for key in _KEYS
+    )
+    list_cache.cached_listing("", lambda prefix: snapshot)
+
+
+async def test_a_warm_batch_needs_no_head(client, heads):
+    _warm()
+
+    response = await client.post("/files/presign-batch", json={"keys": _KEYS})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert list(body["urls"]) == _KEYS
+    assert body["missing"] == []
+    heads.assert_not_awaited()
+    url = urlsplit(body["urls"]["uploads/b b.pdf"])
+    assert url.path == "/my-bucket/uploads/b%20b.pdf"
+    assert parse_qs(url.query)["response-content-disposition"][0].startswith(
+        'inline; filename="b%20b.pdf"'
+    )
+
+
+async def test_keys_the_listing_lacks_are_headed(client, heads):
+    _warm()
+    keys = ["uploads/a.png", "outside/new.png", "gone.txt", "uploads/a.png"]
+
+    body = (await client.post("/files/presign-batch", json={"keys": keys})).json()
+
+    assert list(body["urls"]) == ["uploads/a.png", "outside/new.png"]
+    assert body["missing"] == ["gone.txt"]
+    assert sorted(call.args[0] for call in heads.await_args_list) == [
+        "gone.txt", "outside/new.png"
+    ]
+
+
+async def test_a_cold_batch_heads_every_key(client, heads):
+    body = (await client.post("/files/presign-batch", json={"keys": _KEYS})).json()
+
+    assert body["urls"] == {}
+    assert body["missing"] == _KEYS
+    assert heads.await_count == len(_KEYS)
+
+
+async def test_attachment_urls_count_as_downloads(client, heads, monkeypatch):
+    monkeypatch.setattr(counter, "_count", 0)
+    _warm()
+
+    await client.post("/files/presign-batch", json={"keys": _KEYS})
+    assert counter.get_download_count() == 0
+    await client.post(
+        "/files/presign-batch", json={"keys": [*_KEYS, "gone.txt"], "disposition": "attachment"}
+    )
+    assert counter.get_download_count() == len(_KEYS)
+
+
+@pytest.mark.parametrize(
+    ("body", "status"),
+    [
+        ({"keys": ["uploads/a.png", "../etc/passwd"]}, 400),
+        ({"keys": []}, 422),
+        ({"keys": [f"k{i}" for i in range(101)]}, 422),
+        ({"keys": ["a"], "disposition": "sideways"}, 422),
+    ],
+)
+async def test_bad_batches_are_rejected(client, heads, body, status):
+    _warm()
+
+    response = await client.post("/files/presign-batch", json=body)
+
+    assert response.status_code == status
+    heads.assert_not_awaited()
@@ -0,0 +1,114 @@
+"""Tests for time-bucketed download/preview URLs (`PRESIGN_TIME_BUCKET_SECONDS`).
+
+Within one bucket, repeat presigns for a key and disposition must return the
+exact same URL, so the browser's cached body is reused; that URL must stay
+valid for the usual expiry wherever in the bucket it was handed out, allow
+caching for its whole life, and still be the URL botocore would sign.
+"""
+
+from datetime import UTC, datetime, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from app.config import settings
+from app.repo import b2_presign, get_presigned_url
+
+_START = datetime(2026, 3, 4, 12, 0, tzinfo=UTC)
+
+
+class _Clock(datetime):
+    current = _START
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    monkeypatch.setattr(settings, "b2_endpoint", "https://s3.us-west-004.backblazeb2.com")
+    monkeypatch.setattr(settings, "b2_bucket_name", "my-bucket")
+    monkeypatch.setattr(settings, "b2_key_id", "004abc")
+    monkeypatch.setattr(settings, "b2_application_key", "secret")
+    monkeypatch.setattr(settings, "presign_time_bucket_seconds", 3600)
+    monkeypatch.setattr(b2_presign, "datetime", _Clock)
+    monkeypatch.setattr(_Clock, "current", _START)
+    return _Clock
+
+
+def _query(url: str) -> dict[str, str]:
+    return {k: v[0] for k, v in parse_qs(urlsplit(url).query).items()}
+
+
+def test_repeat_presigns_in_a_bucket_are_identical(clock):
+    first = get_presigned_url("uploads/a.png", filename="a.png", disposition="inline")
+    clock.current = _START + timedelta(minutes=59, seconds=59)
+
+    assert get_presigned_url("uploads/a.png", filename="a.png", disposition="inline") == first
+    assert get_presigned_url("uploads/a.png", filename="a.png") != first  # attachment
+    assert get_presigned_url("uploads/b.png", filename="b.png", disposition="inline") != first
+
+
+def test_the_next_bucket_signs_a_new_url(clock):
+    first = get_presigned_url("uploads/a.png", disposition="inline")
+    clock.current = _START + timedelta(hours=1)
+
+    second = get_presigned_url("uploads/a.png", disposition="inline")
+
+    assert second != first
+    assert _query(first)["X-Amz-Date"] == "20260304T120000Z"
+    assert _query(second)["X-Amz-Date"] == "20260304T130000Z"
+
+
+def test_urls_outlive_their_bucket_and_are_cacheable(clock):
+    clock.current = _START + timedelta(minutes=30)
+
+    query = _query(get_presigned_url("uploads/a.png", disposition="inline"))
+
+    # Signed at the bucket start, valid for the bucket plus the usual 600s.
+    assert query["X-Amz-Date"] == "20260304T120000Z"
+    assert query["X-Amz-Expires"] == "4200"
+    assert query["response-cache-control"] == "max-age=600"
+
+
+def test_caches_never_outlive_the_signature(clock):
+    signed = _START.timestamp()
+    for offset in (0, 1799, 3599):  # handed out early, midway, at the very end
+        clock.current = _START + timedelta(seconds=offset)
+        query = _query(get_presigned_url("uploads/a.png", disposition="inline"))
+        expires_at = signed + int(query["X-Amz-Expires"])
+        max_age = int(query["response-cache-control"].removeprefix("max-age="))
+
+        assert clock.current.timestamp() + max_age <= expires_at
+
+
+def test_bucketed_urls_match_botocore(clock, monkeypatch):
+    monkeypatch.setattr(
+        "botocore.auth.get_current_datetime", lambda: _START.replace(tzinfo=None)
+    )
+    clock.current = _START + timedelta(minutes=5)
+
+    expected = b2_presign.get_s3_client().generate_presigned_url(
+        "get_object",
+        Params={
+            "Bucket": "my-bucket",
+            "Key": "docs/report.pdf",
+            "ResponseContentDisposition": "inline",
+            "ResponseCacheControl": "max-age=600",
+        },
+        ExpiresIn=4200,
+    )
+
+    assert get_presigned_url("docs/report.pdf", disposition="inline") == expected
+
+
+def test_off_by_default_signs_each_request_afresh(clock, monkeypatch):
+    monkeypatch.setattr(settings, "presign_time_bucket_seconds", 0)
+    first = get_presigned_url("uploads/a.png")
+    clock.current = _START + timedelta(seconds=1)
+
+    second = get_presigned_url("uploads/a.png")
+
+    assert second != first
+    assert "response-cache-control" not in _query(second)
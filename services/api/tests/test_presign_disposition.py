@@ -10,62 +10,61 @@ from datetime import UTC, datetime
 
 import pytest
 
-from app.repo import b2_client
+from app.repo import b2_presign
 from app.service import files as files_service
 from app.types import FileMetadata
 
 
-class _FakeS3Client:
-    """Captures the params boto3 would have signed."""
+class _FakePresigner:
+    """Captures the query the presigner would have signed."""
 
     def __init__(self):
-        self.params: dict | None = None
+        self.query: dict | None = None
 
-    def generate_presigned_url(self, _client_method, Params, ExpiresIn):
-        # PascalCase kwargs mirror the boto3 signature this stands in for.
-        self.params = Params
-        self.expires_in = ExpiresIn
+    def presign(self, method, bucket, key, *, expires_in, query=None, headers=None):
+        self.query = query
+        self.expires_in = expires_in
         return "https://example.invalid/signed"
 
 
 @pytest.fixture
-def fake_s3(monkeypatch):
-    client = _FakeS3Client()
-    monkeypatch.setattr(b2_client, "get_s3_client", lambda: client)
-    return client
+def fake_presigner(monkeypatch):
+    presigner = _FakePresigner()
+    monkeypatch.setattr(b2_presign, "get_presigner", lambda: presigner)
+    return presigner
 
 
-def test_repo_defaults_to_attachment(fake_s3):
-    b2_client.get_presigned_url("uploads/report.pdf", filename="report.pdf")
-    disposition = fake_s3.params["ResponseContentDisposition"]
+def test_repo_defaults_to_attachment(fake_presigner):
+    b2_presign.get_presigned_url("uploads/report.pdf", filename="report.pdf")
+    disposition = fake_presigner.query["response-content-disposition"]
     assert disposition.startswith("attachment;")
     assert "report.pdf" in disposition
 
 
-def test_repo_inline_disposition(fake_s3):
-    b2_client.get_presigned_url(
+def test_repo_inline_disposition(fake_presigner):
+    b2_presign.get_presigned_url(
         "uploads/report.pdf", filename="report.pdf", disposition="inline"
     )
-    disposition = fake_s3.params["ResponseContentDisposition"]
+    disposition = fake_presigner.query["response-content-disposition"]
     assert disposition.startswith("inline;")
     assert "report.pdf" in disposition
 
 
-def test_repo_inline_without_filename(fake_s3):
-    b2_client.get_presigned_url("uploads/report.pdf", disposition="inline")
-    assert fake_s3.params["ResponseContentDisposition"] == "inline"
+def test_repo_inline_without_filename(fake_presigner):
+    b2_presign.get_presigned_url("uploads/report.pdf", disposition="inline")
+    assert fake_presigner.query["response-content-disposition"] == "inline"
 
 
-def test_repo_rejects_unknown_disposition(fake_s3):
+def test_repo_rejects_unknown_disposition(fake_presigner):
     with pytest.raises(ValueError):
-        b2_client.get_presigned_url("uploads/report.pdf", disposition="sideways")
+        b2_presign.get_presigned_url("uploads/report.pdf", disposition="sideways")
 
 
 def _stub_metadata(monkeypatch) -> list[dict]:
     """Point the service at a fake object and capture presign kwargs."""
     calls: list[dict] = []
 
-    def fake_metadata(key: str) -> FileMetadata:
+    async def fake_metadata(key: str) -> FileMetadata:
         return FileMetadata(
             key=key,
             filename="report.pdf",
@@ -83,27 +82,27 @@ def _stub_metadata(monkeypatch) -> list[dict]:
         )
         return f"https://example.invalid/{disposition}"
 
-    monkeypatch.setattr(files_service, "get_file_metadata", fake_metadata)
+    monkeypatch.setattr(files_service, "get_file_metadata_async", fake_metadata)
     monkeypatch.setattr(files_service, "get_presigned_url", fake_presign)
     return calls
 
 
-def test_service_preview_asks_for_inline(monkeypatch):
+async def test_service_preview_asks_for_inline(monkeypatch):
     calls = _stub_metadata(monkeypatch)
-    files_service.get_preview_url("uploads/report.pdf")
+    await files_service.get_preview_url("uploads/report.pdf")
     assert calls[-1]["disposition"] == "inline"
 
 
-def test_service_download_asks_for_attachment(monkeypatch):
+async def test_service_download_asks_for_attachment(monkeypatch):
     calls = _stub_metadata(monkeypatch)
-    files_service.get_download_url("uploads/report.pdf")
+    await files_service.get_download_url("uploads/report.pdf")
     assert calls[-1]["disposition"] == "attachment"
 
 
-def test_preview_and_download_dispositions_differ(monkeypatch):
+async def test_preview_and_download_dispositions_differ(monkeypatch):
     calls = _stub_metadata(monkeypatch)
-    files_service.get_preview_url("uploads/report.pdf")
-    files_service.get_download_url("uploads/report.pdf")
+    await files_service.get_preview_url("uploads/report.pdf")
+    await files_service.get_download_url("uploads/report.pdf")
     assert [c["disposition"] for c in calls] == ["inline", "attachment"]
 
 
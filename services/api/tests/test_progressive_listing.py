@@ -0,0 +1,159 @@
+"""Tests for progressive listing (`repo/list_progress.py`).
+
+With nothing cached, `/files` and the stats must answer from the pages a cold
+scan has listed so far — flagged as partial — instead of blocking until its
+last page, and switch to the real snapshot once it is cached.
+"""
+
+import threading
+import time
+from datetime import UTC, datetime
+
+import pytest
+
+from app.config import settings
+from app.repo import b2_listing, list_cache, list_progress
+from app.repo.list_builder import snapshot_from_objects
+
+
+def _obj(key: str, size: int = 10) -> dict:
+    return {"Key": key, "Size": size, "LastModified": datetime.now(UTC)}
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class _GatedFetch:
+    """A root-scan stub that lands one page per opened gate."""
+
+    def __init__(self, pages: list[list[dict]]):
+        self.pages = pages
+        self.gates = [threading.Event() for _ in pages]
+
+    def __call__(self, prefix: str):
+        objects: list[dict] = []
+        with list_progress.tracking() as on_page:
+            for page, gate in zip(self.pages, self.gates, strict=True):
+                assert gate.wait(5)
+                objects += page
+                on_page(page)
+        return snapshot_from_objects(objects)
+
+    def release(self) -> None:
+        for gate in self.gates:
+            gate.set()
+
+
+def test_cold_progressive_read_returns_the_pages_so_far():
+    fetch = _GatedFetch([[_obj("a"), _obj("b")], [_obj("c")]])
+    fetch.gates[0].set()
+
+    partial = list_cache.cached_listing("", fetch, progressive=True)
+
+    assert list(partial.keys()) == ["a", "b"]
+    assert not partial.complete
+    assert not partial.with_prefix("a").complete  # slices stay flagged
+
+    fetch.release()
+    assert _wait_for(lambda: list_cache._entry("") is not None)
+    final = list_cache.cached_listing("", fetch, progressive=True)
+    assert list(final.keys()) == ["a", "b", "c"]
+    assert final.complete
+
+
+def test_a_non_progressive_read_still_blocks_for_the_whole_scan():
+    fetch = _GatedFetch([[_obj("a")], [_obj("b")]])
+    fetch.gates[0].set()
+    threading.Timer(0.1, fetch.release).start()
+
+    listing = list_cache.cached_listing("", fetch)
+
+    assert list(listing.keys()) == ["a", "b"]
+    assert listing.complete
+
+
+def test_a_failed_cold_scan_surfaces_to_the_progressive_reader():
+    def failing(prefix: str):
+        with list_progress.tracking():
+            raise RuntimeError("B2 list failed")
+
+    with pytest.raises(RuntimeError, match="B2 list failed"):
+        list_cache.cached_listing("", failing, progressive=True)
+
+
+def test_no_partial_is_built_when_nobody_is_waiting(monkeypatch):
+    builds = []
+    monkeypatch.setattr(list_progress, "snapshot_from_objects", builds.append)
+    fetch = _GatedFetch([[_obj(f"k{i}")] for i in range(20)])
+    fetch.release()
+
+    list_cache.cached_listing("", fetch)
+
+    assert builds == []
+
+
+class _GatedS3:
+    """Fake S3 whose second page is held until `second_page` is set."""
+
+    def __init__(self):
+        self.second_page = threading.Event()
+
+    def list_objects_v2(self, **kwargs):
+        if kwargs.get("ContinuationToken") is None:
+            return {
+                "Contents": [_obj("uploads/a.txt", 1000), _obj("uploads/b.txt", 24)],
+                "IsTruncated": True,
+                "NextContinuationToken": "page-2",
+            }
+        assert self.second_page.wait(5)
+        return {"Contents": [_obj("uploads/c.txt")], "IsTruncated": False}
+
+
+@pytest.mark.asyncio
+async def test_endpoints_flag_partial_results_until_the_scan_is_cached(client, monkeypatch):
+    monkeypatch.setattr(settings, "list_scan_partitions", 1)
+    s3 = _GatedS3()
+    monkeypatch.setattr(b2_listing, "get_s3_client", lambda: s3)
+
+    try:
+        files = await client.get("/files")
+        stats = await client.get("/files/stats")
+        activity = await client.get("/files/stats/activity?days=1")
+    finally:
+        s3.second_page.set()
+
+    assert files.status_code == 200
+    assert {f["key"] for f in files.json()} == {"uploads/a.txt", "uploads/b.txt"}
+    for response in (files, stats, activity):
+        assert response.headers["X-Listing-Complete"] == "false"
+        assert response.headers["X-Listing-Scanned-Objects"] == "2"
+    assert stats.json()["complete"] is False
+    assert stats.json()["total_size_bytes"] == 1024
+    assert activity.json()[0]["uploads"] == 2
+
+    assert _wait_for(lambda: list_cache._entry("") is not None)
+    files = await client.get("/files")
+    stats = await client.get("/files/stats")
+    assert len(files.json()) == 3
+    assert "X-Listing-Complete" not in files.headers
+    assert stats.json()["complete"] is True
+
+
+@pytest.mark.asyncio
+async def test_progressive_listing_can_be_switched_off(client, monkeypatch):
+    monkeypatch.setattr(settings, "list_scan_partitions", 1)
+    monkeypatch.setattr(settings, "list_progressive", False)
+    s3 = _GatedS3()
+    monkeypatch.setattr(b2_listing, "get_s3_client", lambda: s3)
+    threading.Timer(0.1, s3.second_page.set).start()
+
+    response = await client.get("/files")
+
+    assert len(response.json()) == 3
+    assert "X-Listing-Complete" not in response.headers
@@ -1,5 +1,7 @@
 """Tests for per-IP fixed-window rate limiting."""
 
+from unittest.mock import AsyncMock
+
 import pytest
 
 from app.config import settings
@@ -33,7 +35,7 @@ async def test_write_tier_has_separate_budget(client, monkeypatch):
 
     monkeypatch.setattr(settings, "rate_limit_per_minute", 1)
     monkeypatch.setattr(settings, "rate_limit_write_per_minute", 5)
-    monkeypatch.setattr(files_service, "delete_file", lambda key: None)
+    monkeypatch.setattr(files_service, "delete_file_async", AsyncMock())
 
     await client.get("/health")
     assert (await client.get("/health")).status_code == 429  # read budget spent
@@ -0,0 +1,238 @@
+"""Tests for `repo/b2_raw_list.py`, the botocore-free ListObjectsV2 path.
+
+Its parse must reach the same snapshot as botocore's for the same body, and
+`RawListClient` must look like the boto3 client to `b2_scan` — results and
+errors alike.
+"""
+
+import io
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote_plus, urlparse
+from xml.sax.saxutils import escape
+
+import boto3
+import pytest
+import urllib3
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+from botocore.handlers import decode_list_object_v2
+from botocore.parsers import create_parser
+
+from app.config import settings
+from app.repo import b2_listing, b2_raw_list, b2_scan
+from app.repo.b2_raw_list import RawListClient, parse_last_modified, parse_list_page
+from app.repo.b2_scan import scan_listing
+from app.repo.list_builder import snapshot_from_objects
+
+_NS = "http://s3.amazonaws.com/doc/2006-03-01/"
+_KEYS = ["a & b.txt", "<odd>/q'uote\".bin", "Ünïcode dir/naïve café.pdf", "x/" + "y" * 300]
+_TIMES = ["2026-01-02T03:04:05.678Z", "1999-12-31T23:59:59.000Z", "2026-02-28T00:00:00Z"]
+
+
+def _client():
+    return boto3.client(
+        "s3",
+        endpoint_url="http://s3.test",
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+        region_name="us-west-004",
+        config=Config(s3={"addressing_style": "path"}),
+    )
+
+
+def _body(keys, truncated=False, prefixes=()) -> bytes:
+    contents = "".join(
+        f"<Contents><Key>{escape(key)}</Key><LastModified>{_TIMES[i % len(_TIMES)]}</LastModified>"
+        f'<ETag>"{i:032x}"</ETag><Size>{i * 1021}</Size><StorageClass>STANDARD</StorageClass>'
+        "<Owner><ID>o</ID><DisplayName>Key</DisplayName></Owner></Contents>"
+        for i, key in enumerate(keys)
+    )
+    folders = "".join(
+        f"<CommonPrefixes><Prefix>{escape(p)}</Prefix></CommonPrefixes>" for p in prefixes
+    )
+    token = f"<NextContinuationToken>{escape(keys[-1])}</NextContinuationToken>" if truncated else ""
+    return (
+        f'<?xml version="1.0" encoding="UTF-8"?><ListBucketResult xmlns="{_NS}">'
+        f"<Name>b</Name><Prefix>top/</Prefix><KeyCount>{len(keys)}</KeyCount>"
+        f"<MaxKeys>1000</MaxKeys><IsTruncated>{str(truncated).lower()}</IsTruncated>"
+        f"{contents}{folders}{token}</ListBucketResult>"
+    ).encode()
+
+
+def _botocore(body: bytes) -> dict:
+    shape = _client().meta.service_model.operation_model("ListObjectsV2").output_shape
+    return create_parser("rest-xml").parse({"body": body, "headers": {}, "status_code": 200}, shape)
+
+
+def _rows(contents):
+    snapshot = snapshot_from_objects(contents)
+    return list(snapshot.rows(range(len(snapshot))))
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 64 * 1024])
+def test_parse_matches_botocore(chunk):
+    body = _body(_KEYS, truncated=True, prefixes=["top/a & b/", "top/ü/"])
+    expected = _botocore(body)
+
+    actual = parse_list_page(body[i : i + chunk] for i in range(0, len(body), chunk))
+
+    assert _rows(actual["Contents"]) == _rows(expected["Contents"])
+    assert actual["CommonPrefixes"] == expected["CommonPrefixes"]
+    assert actual["IsTruncated"] is expected["IsTruncated"] is True
+    assert actual["NextContinuationToken"] == expected["NextContinuationToken"]
+
+
+def test_url_encoded_keys_are_decoded_like_botocore():
+    # What B2 answers the `encoding-type=url` botocore puts in the request.
+    keys = ["uploads/my photo+1.jpg", "Ünïcode dir/naïve café.pdf", "a%b/100%.txt"]
+    body = _body([quote_plus(k, safe="/") for k in keys], truncated=True).replace(
+        b"<MaxKeys>", b"<EncodingType>url</EncodingType><MaxKeys>"
+    )
+    expected = _botocore(body)
+    decode_list_object_v2(expected, {"encoding_type_auto_set": True})
+
+    actual = parse_list_page([body])
+
+    assert [obj["Key"] for obj in actual["Contents"]] == keys
+    assert _rows(actual["Contents"]) == _rows(expected["Contents"])
+    assert actual["NextContinuationToken"] == expected["NextContinuationToken"]
+
+
+def test_last_page_and_empty_page():
+    assert parse_list_page([_body(_KEYS)]).keys() == {"Contents", "IsTruncated"}
+    assert parse_list_page([_body([])]) == {"IsTruncated": False}
+
+
+def test_timestamps_match_botocore():
+    for text in [*_TIMES, "1970-01-01T00:00:00.000Z", "2038-01-19T03:14:08.001Z"]:
+        body = _body(["k"]).replace(_TIMES[0].encode(), text.encode())
+        assert parse_last_modified(text) == _rows(_botocore(body)["Contents"])[0][3]
+
+
+class _Http:
+    """A urllib3 pool stand-in answering every GET with one canned response."""
+
+    def __init__(self, status: int, body: bytes):
+        self.status, self.body, self.urls = status, body, []
+
+    def request(self, method, url, preload_content=True):
+        assert method == "GET" and preload_content is False
+        self.urls.append(url)
+        return urllib3.HTTPResponse(
+            body=io.BytesIO(self.body), status=self.status, preload_content=False
+        )
+
+
+def test_client_sends_signed_list_request():
+    http = _Http(200, _body(_KEYS))
+
+    response = RawListClient(_client(), http).list_objects_v2(
+        Bucket="b", Prefix="top/", StartAfter="top/m", MaxKeys=1000
+    )
+
+    assert len(response["Contents"]) == len(_KEYS)
+    url = urlparse(http.urls[0])
+    query = parse_qs(url.query)
+    assert url.path == "/b"
+    assert query["list-type"] == ["2"] and query["prefix"] == ["top/"]
+    assert query["start-after"] == ["top/m"]
+    assert query["X-Amz-Algorithm"] == ["AWS4-HMAC-SHA256"]
+
+
+def test_client_raises_botocore_client_errors():
+    body = b"<Error><Code>AccessDenied</Code><Message>not allowed</Message></Error>"
+    client = RawListClient(_client(), _Http(403, body))
+
+    with pytest.raises(ClientError) as e:
+        client.list_objects_v2(Bucket="b")
+    assert e.value.response["Error"] == {"Code": "AccessDenied", "Message": "not allowed"}
+    assert e.value.response["ResponseMetadata"]["HTTPStatusCode"] == 403
+
+
+class _Unavailable(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.hits += 1
+        body = b"<Error><Code>ServiceUnavailable</Code><Message>busy</Message></Error>"
+        self.send_response(503)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def unavailable():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Unavailable)
+    server.hits = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _local_client(port):
+    return boto3.client(
+        "s3",
+        endpoint_url=f"http://127.0.0.1:{port}",
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+        region_name="us-west-004",
+        config=Config(s3={"addressing_style": "path"}),
+    )
+
+
+def test_exhausted_5xx_retries_raise_a_retryable_client_error(unavailable, monkeypatch):
+    monkeypatch.setattr(b2_scan.time, "sleep", lambda seconds: None)  # urllib3's backoff too
+    client = RawListClient(_local_client(unavailable.server_port), b2_raw_list._pool())
+
+    with pytest.raises(ClientError) as e:
+        b2_scan._list_page(client, {"Bucket": "b"})
+
+    assert e.value.response["Error"]["Code"] == "ServiceUnavailable"
+    assert e.value.response["ResponseMetadata"]["HTTPStatusCode"] == 503
+    # urllib3's 3 tries under each of `_list_page`'s attempts.
+    assert unavailable.hits == 3 * b2_scan._PAGE_ATTEMPTS
+
+
+def test_connection_failures_raise_botocore_errors():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]  # closed again: nothing listens here
+    client = RawListClient(_local_client(port), b2_raw_list._pool())
+
+    with pytest.raises(BotoCoreError):
+        client.list_objects_v2(Bucket="b")
+
+
+def test_scan_through_raw_client():
+    keys = sorted(f"f{i % 3}/{i:04d}.bin" for i in range(25))
+    pages = {"": _body(keys[:10], truncated=True), keys[9]: _body(keys[10:])}
+
+    class _Paged(_Http):
+        def request(self, method, url, preload_content=True):
+            token = parse_qs(urlparse(url).query).get("continuation-token", [""])[0]
+            self.body = pages[token]
+            return super().request(method, url, preload_content)
+
+    contents = scan_listing(RawListClient(_client(), _Paged(200, b"")), "b", "", partitions=1)
+
+    assert [obj["Key"] for obj in contents] == keys
+    assert all(type(obj["LastModified"]) is int for obj in contents)
+
+
+def test_listing_uses_raw_client_when_enabled(monkeypatch):
+    seen = []
+    monkeypatch.setattr(settings, "list_raw_parser", True)
+    monkeypatch.setattr(settings, "list_scan_partitions", 1)
+    monkeypatch.setattr(b2_listing, "get_s3_client", _client)
+    monkeypatch.setattr(
+        b2_listing, "scan_listing", lambda client, *a, **kw: seen.append(client) or []
+    )
+
+    b2_listing._fetch_all_objects("top/")
+
+    assert isinstance(seen[0], RawListClient)
@@ -1,39 +1,40 @@
-"""Tests for recent files ordering — most recent first, regardless of key name."""
+"""Tests for `/files` ordering — most recent first by default, regardless of
+key name, and the `sort`/`order` options served from the snapshot's indexes."""
 
 from datetime import UTC, datetime, timedelta
 
 import pytest
 
-from app.service import files as files_service
-from app.types import FileMetadata
+from app.repo import b2_listing, list_index
+from app.repo.list_builder import snapshot_from_objects
+from app.repo.list_index import build_order, ordered
 
 
-def _make_file(key: str, hours_ago: int) -> FileMetadata:
-    return FileMetadata(
-        key=key,
-        filename=key.split("/")[-1],
-        folder="uploads/",
-        size_bytes=100,
-        size_human="100 B",
-        content_type="text/plain",
-        uploaded_at=datetime.now(UTC) - timedelta(hours=hours_ago),
-        url=None,
+def _make_object(key: str, hours_ago: int, size: int = 100) -> dict:
+    return {
+        "Key": key,
+        "Size": size,
+        "LastModified": datetime.now(UTC) - timedelta(hours=hours_ago),
+    }
+
+
+def _serve(monkeypatch, objects: list[dict]):
+    # S3 returns keys in lexicographic order; the snapshot keeps that order.
+    snapshot = snapshot_from_objects(sorted(objects, key=lambda o: o["Key"]))
+    monkeypatch.setattr(
+        b2_listing, "_list_all_objects", lambda prefix="", **_: snapshot.with_prefix(prefix)
     )
+    return snapshot
 
 
 @pytest.mark.asyncio
 async def test_recent_uploads_sorted_newest_first(client, monkeypatch):
     """Files are returned newest-first, not alphabetically."""
-    fake_files = [
-        _make_file("uploads/alpha.txt", hours_ago=24),  # oldest
-        _make_file("uploads/zebra.txt", hours_ago=0),  # newest
-        _make_file("uploads/middle.txt", hours_ago=12),
-    ]
-    # Simulate S3 returning in lexicographic order (alpha, middle, zebra)
-    fake_files.sort(key=lambda f: f.key)
-    monkeypatch.setattr(
-        files_service, "list_files", lambda prefix="": fake_files
-    )
+    _serve(monkeypatch, [
+        _make_object("uploads/alpha.txt", hours_ago=24),  # oldest
+        _make_object("uploads/zebra.txt", hours_ago=0),  # newest
+        _make_object("uploads/middle.txt", hours_ago=12),
+    ])
 
     response = await client.get("/files?limit=2")
     assert response.status_code == 200
@@ -47,15 +48,9 @@ async def test_recent_uploads_sorted_newest_first(client, monkeypatch):
 @pytest.mark.asyncio
 async def test_limit_applied_after_sort(client, monkeypatch):
     """Limit slices after date sort, not before S3 fetch."""
-    fake_files = [
-        _make_file(f"uploads/file{i:03d}.txt", hours_ago=100 - i)
-        for i in range(20)
-    ]
-    # S3 returns lexicographic order
-    fake_files.sort(key=lambda f: f.key)
-    monkeypatch.setattr(
-        files_service, "list_files", lambda prefix="": fake_files
-    )
+    _serve(monkeypatch, [
+        _make_object(f"uploads/file{i:03d}.txt", hours_ago=100 - i) for i in range(20)
+    ])
 
     response = await client.get("/files?limit=5")
     assert response.status_code == 200
@@ -64,3 +59,71 @@ async def test_limit_applied_after_sort(client, monkeypatch):
     # The 5 most recent by upload time (file019, file018, file017, ...)
     assert data[0]["filename"] == "file019.txt"
     assert data[4]["filename"] == "file015.txt"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("sort=name", ["a.txt", "B.txt", "c.txt"]),  # default asc, case-insensitive
+        ("sort=name&order=desc", ["c.txt", "B.txt", "a.txt"]),
+        ("sort=size", ["a.txt", "c.txt", "B.txt"]),  # default desc
+        ("sort=size&order=asc", ["B.txt", "c.txt", "a.txt"]),
+        ("sort=uploaded_at&order=asc", ["c.txt", "a.txt", "B.txt"]),
+    ],
+)
+async def test_sort_and_order(client, monkeypatch, query, expected):
+    _serve(monkeypatch, [
+        _make_object("uploads/a.txt", hours_ago=2, size=300),
+        _make_object("uploads/B.txt", hours_ago=1, size=100),
+        _make_object("uploads/c.txt", hours_ago=3, size=200),
+    ])
+
+    response = await client.get(f"/files?{query}")
+
+    assert response.status_code == 200
+    assert [f["filename"] for f in response.json()] == expected
+
+
+@pytest.mark.asyncio
+async def test_unknown_sort_is_rejected(client):
+    response = await client.get("/files?sort=owner")
+    assert response.status_code == 422
+    response = await client.get("/files?sort=name&order=up")
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("field", ["uploaded_at", "name", "size"])
+@pytest.mark.parametrize("prefix", ["", "f1/", "f3/sub/", "f9/"])
+def test_slice_order_matches_a_full_sort(field, prefix):
+    """A prefix slice walks the root index when dense and sorts itself when
+    sparse; both must agree with sorting the slice from scratch."""
+    objects = [
+        _make_object(f"f{i % 4}/{'sub/' if i % 7 == 0 else ''}{i * 37 % 101:03d}.bin",
+                     hours_ago=i * 13 % 50, size=i * 17 % 23)
+        for i in range(400)
+    ]
+    snapshot = snapshot_from_objects(sorted(objects, key=lambda o: o["Key"]))
+    sliced = snapshot.with_prefix(prefix)
+
+    for descending in (False, True):
+        expected = list(build_order(sliced, field))
+        if descending:
+            expected.reverse()
+        assert list(ordered(sliced, field, descending)) == expected
+
+
+def test_order_index_is_built_once_per_snapshot(monkeypatch):
+    _serve(monkeypatch, [_make_object(f"k{i}", hours_ago=i, size=i) for i in range(5)])
+    builds = []
+    real_build = list_index.build_order
+    monkeypatch.setattr(
+        list_index, "build_order", lambda s, field: builds.append(field) or real_build(s, field)
+    )
+
+    largest = b2_listing.list_files_sorted("", 2, "size", descending=True)
+    smallest = b2_listing.list_files_sorted("", 2, "size", descending=False)
+
+    assert builds == ["size"]  # both directions walk the one index
+    assert [f.key for f in largest] == ["k4", "k3"]
+    assert [f.key for f in smallest] == ["k0", "k1"]
@@ -0,0 +1,153 @@
+"""Tests for per-page retries and resumable root scans (`repo/b2_scan.py`,
+`repo/list_checkpoint.py`).
+
+A page that fails transiently must be retried in place; a scan that fails for
+good must leave a checkpoint the next scan continues from — same objects as a
+clean scan, the app's own writes since included, no page listed twice.
+"""
+
+from datetime import UTC, datetime
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+from app.config import settings
+from app.repo import b2_listing, b2_scan, list_cache, list_checkpoint
+from app.repo.list_builder import Delta
+
+_KEYS = [f"uploads/file-{i:04d}.txt" for i in range(100)]
+
+
+def _error(status: int, code: str) -> ClientError:
+    return ClientError(
+        {"Error": {"Code": code, "Message": code}, "ResponseMetadata": {"HTTPStatusCode": status}},
+        "ListObjectsV2",
+    )
+
+
+class _FlakyS3:
+    """ListObjectsV2 over `keys`, 10 per page, raising `failures[token]` (a
+    list, consumed one per call) for the page after `token` ("" = first)."""
+
+    def __init__(self, keys, failures=None):
+        self.keys = sorted(keys)
+        self.failures = failures or {}
+        self.calls: list[dict] = []
+
+    def list_objects_v2(self, Prefix="", StartAfter=None, ContinuationToken=None, **kwargs):
+        self.calls.append({"StartAfter": StartAfter, "ContinuationToken": ContinuationToken})
+        pending = self.failures.get(ContinuationToken or StartAfter or "")
+        if pending:
+            raise pending.pop(0)
+        after = ContinuationToken or StartAfter or ""
+        keys = [k for k in self.keys if k.startswith(Prefix) and k > after]
+        page = keys[:10]
+        response = {
+            "Contents": [
+                {"Key": k, "Size": 1, "LastModified": datetime(2026, 1, 1, tzinfo=UTC)}
+                for k in page
+            ],
+            "IsTruncated": len(keys) > len(page),
+        }
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = page[-1]
+        return response
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    sleeps: list[float] = []
+    monkeypatch.setattr(b2_scan.time, "sleep", sleeps.append)
+    monkeypatch.setattr(settings, "list_scan_partitions", 1)
+    monkeypatch.setattr(settings, "list_resume_max_age_seconds", 600.0)
+    client = _FlakyS3(_KEYS)
+    client.sleeps = sleeps
+    monkeypatch.setattr(b2_listing, "get_s3_client", lambda: client)
+    return client
+
+
+def test_transient_page_errors_are_retried_in_place(s3):
+    unreachable = EndpointConnectionError(endpoint_url="http://b2.test")
+    s3.failures = {_KEYS[39]: [_error(503, "ServiceUnavailable"), unreachable]}
+
+    snapshot = b2_listing._fetch_all_objects("")
+
+    assert list(snapshot.keys()) == _KEYS
+    assert [c["ContinuationToken"] for c in s3.calls].count(_KEYS[39]) == 3
+    assert len(s3.sleeps) == 2 and all(0 <= s <= 8 for s in s3.sleeps)
+
+
+def test_client_errors_are_not_retried(s3):
+    s3.failures = {"": [_error(403, "AccessDenied")]}
+
+    with pytest.raises(RuntimeError, match="AccessDenied"):
+        b2_listing._fetch_all_objects("")
+    assert len(s3.calls) == 1
+
+
+def _fail_for_good(s3, token: str) -> None:
+    s3.failures = {token: [_error(500, "InternalError")] * b2_scan._PAGE_ATTEMPTS}
+    with pytest.raises(RuntimeError, match="B2 list failed"):
+        b2_listing._fetch_all_objects("")
+    s3.calls.clear()
+
+
+def test_failed_scan_resumes_from_its_last_page(s3):
+    _fail_for_good(s3, _KEYS[69])
+
+    snapshot = b2_listing._fetch_all_objects("")
+
+    assert list(snapshot.keys()) == _KEYS
+    # Straight back to the failed page; pages 1-7 are not listed again.
+    assert [c["ContinuationToken"] for c in s3.calls] == [_KEYS[69], _KEYS[79], _KEYS[89]]
+    assert list_checkpoint._checkpoint is None
+
+
+def test_partitioned_scan_resumes_only_unfinished_ranges(s3, monkeypatch):
+    monkeypatch.setattr(settings, "list_scan_partitions", 4)
+    boundaries = [_KEYS[25], _KEYS[50], _KEYS[75]]
+    monkeypatch.setattr(b2_scan, "first_scan_boundaries", lambda *a: boundaries)
+    # The range (25, 50] fails on its second page, after key 35.
+    _fail_for_good(s3, _KEYS[35])
+
+    snapshot = b2_listing._fetch_all_objects("")
+
+    assert list(snapshot.keys()) == _KEYS
+    assert all(c["ContinuationToken"] is not None for c in s3.calls)
+    assert len(s3.calls) == 2  # the failed page, then the range's last
+
+
+def test_writes_since_the_failure_reach_the_resumed_scan(s3):
+    _fail_for_good(s3, _KEYS[49])
+    # Deleted from a page the checkpoint already holds; added to one it doesn't.
+    s3.keys.remove(_KEYS[5])
+    s3.keys.append("uploads/new.txt")
+    list_cache.apply(Delta(upserts={"uploads/new.txt": (1, 0)}, deletes=frozenset({_KEYS[5]})))
+
+    snapshot = b2_listing._fetch_all_objects("")
+
+    assert _KEYS[5] not in set(snapshot.keys())
+    assert "uploads/new.txt" in set(snapshot.keys())
+    assert len(snapshot) == len(_KEYS)
+
+
+@pytest.mark.parametrize("void", ["expired", "invalidated"])
+def test_stale_or_invalidated_checkpoints_restart_the_scan(s3, monkeypatch, void):
+    _fail_for_good(s3, _KEYS[69])
+    if void == "expired":
+        monkeypatch.setattr(settings, "list_resume_max_age_seconds", 0)
+    else:
+        list_cache.invalidate()
+
+    snapshot = b2_listing._fetch_all_objects("")
+
+    assert list(snapshot.keys()) == _KEYS
+    assert s3.calls[0]["ContinuationToken"] is None
+
+
+def test_prefix_scans_are_not_checkpointed(s3):
+    s3.failures = {_KEYS[19]: [_error(500, "InternalError")] * b2_scan._PAGE_ATTEMPTS}
+    with pytest.raises(RuntimeError):
+        b2_listing._fetch_all_objects("uploads/")
+
+    assert list_checkpoint._checkpoint is None
@@ -0,0 +1,145 @@
+"""Tests for the listing cache shared between worker processes (`repo/list_shared.py`).
+
+Real processes, no external services: each worker is a spawned interpreter
+pointed at the same snapshot file. Exactly one of them may scan the bucket,
+all must end up serving the same generation, and an upload or delete through
+any worker must reach the others — including a scan already in flight.
+"""
+
+import multiprocessing
+import time
+from datetime import UTC, datetime
+
+import pytest
+
+from app.config import settings
+from app.repo import list_cache, list_shared
+from app.repo.list_builder import Delta, snapshot_from_objects
+from app.repo.list_snapshot import ListingSnapshot
+
+pytestmark = pytest.mark.skipif(list_shared.fcntl is None, reason="sharing needs POSIX flock")
+
+_KEYS = ["uploads/a.txt", "uploads/b.txt", "uploads/c.txt"]
+_TIMEOUT = 30
+
+
+def _listing(keys: list[str]) -> ListingSnapshot:
+    when = datetime(2026, 3, 4, tzinfo=UTC)
+    return snapshot_from_objects({"Key": k, "Size": 10, "LastModified": when} for k in keys)
+
+
+def _share(snapshot_file: str) -> None:
+    settings.list_snapshot_file = snapshot_file
+    settings.list_shared_cache = True
+    settings.list_cache_ttl_seconds = 300.0
+
+
+class _CountingFetch:
+    """A slow bucket scan that records each call in a file all workers append to."""
+
+    def __init__(self, calls_file: str, keys: list[str], delay: float = 0.5):
+        self.calls_file = calls_file
+        self.keys = keys
+        self.delay = delay
+
+    def __call__(self, prefix: str) -> ListingSnapshot:
+        with open(self.calls_file, "a") as f:
+            f.write(f"{prefix or 'root'}\n")
+        time.sleep(self.delay)
+        return _listing(self.keys)
+
+
+def _read_worker(snapshot_file, calls_file, start, results):
+    _share(snapshot_file)
+    start.wait(_TIMEOUT)
+    listing = list_cache.cached_listing("", _CountingFetch(calls_file, _KEYS))
+    results.put((list_cache._entry("").generation, list(listing.keys())))
+
+
+def _upload_worker(snapshot_file, key, results):
+    _share(snapshot_file)
+    list_cache.apply(Delta({key: (42, 1_700_000_000_000)}, frozenset()))
+    entry = list_cache._entry("")
+    results.put(entry.generation if entry else None)
+
+
+def _spawn(target, *args) -> multiprocessing.Process:
+    process = multiprocessing.get_context("spawn").Process(target=target, args=args)
+    process.start()
+    return process
+
+
+def _join(processes: list[multiprocessing.Process]) -> None:
+    for process in processes:
+        process.join(_TIMEOUT)
+        assert process.exitcode == 0
+
+
+@pytest.fixture
+def shared(tmp_path, monkeypatch):
+    snapshot_file = str(tmp_path / "list_snapshot.bin")
+    monkeypatch.setattr(settings, "list_snapshot_file", snapshot_file)
+    monkeypatch.setattr(settings, "list_shared_cache", True)
+    monkeypatch.setattr(settings, "list_cache_ttl_seconds", 300.0)
+    monkeypatch.setattr(list_shared, "_file_seen", None)
+    monkeypatch.setattr(list_shared, "_journal_seen", (0, 0))
+    yield snapshot_file
+    list_cache._reset_state()
+
+
+def test_concurrent_cold_workers_scan_once_and_agree(shared, tmp_path):
+    calls_file = str(tmp_path / "scans.log")
+    context = multiprocessing.get_context("spawn")
+    start, results = context.Event(), context.Queue()
+    workers = [_spawn(_read_worker, shared, calls_file, start, results) for _ in range(4)]
+    start.set()
+
+    answers = [results.get(timeout=_TIMEOUT) for _ in workers]
+    _join(workers)
+
+    with open(calls_file) as f:
+        assert f.read().splitlines() == ["root"]  # one scan for the whole host
+    assert {generation for generation, _ in answers} == {answers[0][0]}
+    assert all(keys == _KEYS for _, keys in answers)
+
+
+def test_an_upload_through_another_worker_reaches_this_one(shared, tmp_path):
+    calls_file = tmp_path / "scans.log"
+    fetch = _CountingFetch(str(calls_file), _KEYS, delay=0)
+    list_cache.cached_listing("", fetch)
+    results = multiprocessing.get_context("spawn").Queue()
+
+    _join([_spawn(_upload_worker, shared, "uploads/new.txt", results)])
+    their_generation = results.get(timeout=_TIMEOUT)
+
+    listing = list_cache.cached_listing("", fetch)
+    assert list(listing.keys()) == [*_KEYS, "uploads/new.txt"]
+    assert list_cache._entry("").generation == their_generation
+    assert calls_file.read_text().splitlines() == ["root"]  # caught up, not rescanned
+
+
+def test_a_scan_replays_writes_other_workers_made_while_it_ran(shared, tmp_path):
+    results = multiprocessing.get_context("spawn").Queue()
+    calls_file = str(tmp_path / "scans.log")
+
+    def fetch(prefix: str) -> ListingSnapshot:
+        # The bucket was listed before the upload landed; another worker
+        # writes it through mid-scan.
+        listing = _CountingFetch(calls_file, _KEYS, delay=0)(prefix)
+        _join([_spawn(_upload_worker, shared, "uploads/mid-scan.txt", results)])
+        return listing
+
+    listing = list_cache.cached_listing("", fetch)
+
+    assert list(listing.keys()) == [*_KEYS, "uploads/mid-scan.txt"]
+    assert results.get(timeout=_TIMEOUT) is None  # that worker had nothing cached
+    assert not (tmp_path / "list_snapshot.bin.deltas").exists()  # the scan covers it now
+
+
+def test_sharing_is_off_by_default(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "list_snapshot_file", str(tmp_path / "list_snapshot.bin"))
+
+    assert not list_shared.enabled()
+    with list_shared.write_lock() as floor, list_shared.scan_lock():
+        assert floor == 0
+    assert list(tmp_path.iterdir()) == []  # no lock files
@@ -1,24 +1,23 @@
-"""Tests for the upload activity endpoint."""
+"""Tests for the upload activity endpoint and the per-generation listing
+aggregate (`repo/list_stats.py`) behind it and `/files/stats`."""
 
+from collections import Counter
 from datetime import UTC, datetime, timedelta
 
 import pytest
 
-from app.service import files as files_service
-from app.types import FileMetadata
+from app.repo import b2_listing, list_stats
+from app.repo.list_builder import snapshot_from_objects
 
 
-def _make_file(key: str, uploaded_at: datetime) -> FileMetadata:
-    return FileMetadata(
-        key=key,
-        filename=key.split("/")[-1],
-        folder="uploads/",
-        size_bytes=100,
-        size_human="100 B",
-        content_type="text/plain",
-        uploaded_at=uploaded_at,
-        url=None,
-    )
+def _make_file(key: str, uploaded_at: datetime, size: int = 100) -> dict:
+    return {"Key": key, "Size": size, "LastModified": uploaded_at}
+
+
+def _serve(monkeypatch, objects: list[dict]):
+    snapshot = snapshot_from_objects(sorted(objects, key=lambda o: o["Key"]))
+    monkeypatch.setattr(b2_listing, "_list_all_objects", lambda prefix="", **_: snapshot)
+    return snapshot
 
 
 @pytest.mark.asyncio
@@ -32,7 +31,7 @@ async def test_upload_activity_returns_daily_counts(client, monkeypatch):
         _make_file("uploads/b.txt", today),
         _make_file("uploads/c.txt", yesterday),
     ]
-    monkeypatch.setattr(files_service, "list_files", lambda prefix="": fake_files)
+    _serve(monkeypatch, fake_files)
 
     response = await client.get("/files/stats/activity?days=7")
     assert response.status_code == 200
@@ -57,7 +56,7 @@ async def test_upload_activity_rejects_invalid_days(client):
 
 @pytest.mark.asyncio
 async def test_upload_activity_fills_missing_days(client, monkeypatch):
-    monkeypatch.setattr(files_service, "list_files", lambda prefix="": [])
+    _serve(monkeypatch, [])
 
     response = await client.get("/files/stats/activity?days=3")
     assert response.status_code == 200
@@ -65,3 +64,42 @@ async def test_upload_activity_fills_missing_days(client, monkeypatch):
     data = response.json()
     assert len(data) == 3
     assert all(entry["uploads"] == 0 for entry in data)
+
+
+def test_daily_histogram_matches_bucketing_every_object():
+    start = datetime(2026, 5, 1, 23, 59, 59, 999_000, tzinfo=UTC)
+    objects = [
+        _make_file(f"f/{i:04d}.{'png' if i % 3 else 'txt'}", start + timedelta(minutes=i * 37))
+        for i in range(2000)
+    ]
+    snapshot = snapshot_from_objects(objects)
+
+    stats = list_stats.build_stats(snapshot)
+
+    assert stats.uploads_by_day == Counter(o["LastModified"].date() for o in objects)
+    assert stats.files_by_content_type == {"image/png": 1333, "text/plain": 667}
+    assert list(stats.files_by_content_type) == ["image/png", "text/plain"]  # most common first
+    assert stats.total_size_bytes == 200_000
+
+
+@pytest.mark.asyncio
+async def test_stats_and_activity_share_one_aggregate_per_snapshot(client, monkeypatch):
+    now = datetime.now(UTC)
+    _serve(monkeypatch, [
+        _make_file("uploads/a.txt", now, size=1000),
+        _make_file("uploads/b.pdf", now - timedelta(days=1), size=24),
+    ])
+    builds = []
+    real_build = list_stats.build_stats
+    monkeypatch.setattr(list_stats, "build_stats", lambda s: builds.append(s) or real_build(s))
+
+    stats = (await client.get("/files/stats")).json()
+    activity = (await client.get("/files/stats/activity?days=2")).json()
+    await client.get("/files/stats")
+
+    assert len(builds) == 1
+    assert stats["total_files"] == 2
+    assert stats["total_size_bytes"] == 1024
+    assert stats["uploads_today"] == 1
+    assert stats["files_by_content_type"] == {"text/plain": 1, "application/pdf": 1}
+    assert [entry["uploads"] for entry in activity] == [1, 1]
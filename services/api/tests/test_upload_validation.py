@@ -1,6 +1,7 @@
 """Unit + integration tests for upload validation and content sniffing."""
 
 from datetime import UTC, datetime
+from unittest.mock import AsyncMock
 
 import pytest
 
@@ -239,82 +240,84 @@ _PNG_HEAD = b"\x89PNG\r\n\x1a\n" + b"\x00" * 8
 
 def _wire_verify(monkeypatch, *, metadata, head_bytes):
     deleted: list[str] = []
-    invalidated: list[bool] = []
+    listed: list[str] = []
     monkeypatch.setattr(
-        upload_service, "get_file_metadata", lambda key: metadata
+        upload_service, "get_file_metadata_async", AsyncMock(return_value=metadata)
     )
     monkeypatch.setattr(
-        upload_service, "get_object_head_bytes", lambda key, length: head_bytes
+        upload_service, "get_object_head_bytes_async", AsyncMock(return_value=head_bytes)
     )
     monkeypatch.setattr(
-        upload_service, "delete_file", lambda key: deleted.append(key)
+        upload_service, "delete_file_async", AsyncMock(side_effect=deleted.append)
     )
     monkeypatch.setattr(
-        upload_service, "invalidate_listing", lambda: invalidated.append(True)
+        upload_service,
+        "add_to_listing_async",
+        AsyncMock(side_effect=lambda meta: listed.append(meta.key)),
     )
-    return deleted, invalidated
+    return deleted, listed
 
 
-def test_verify_accepts_valid_object(monkeypatch):
+async def test_verify_accepts_valid_object(monkeypatch):
     meta = _meta("uploads/a.png", size_bytes=16, content_type="image/png")
-    deleted, invalidated = _wire_verify(
+    deleted, listed = _wire_verify(
         monkeypatch, metadata=meta, head_bytes=_PNG_HEAD
     )
-    result = verify_upload("uploads/a.png")
+    result = await verify_upload("uploads/a.png")
     assert result.key == "uploads/a.png"
     assert result.metadata is None  # rich extraction stays on-demand
     assert deleted == []
-    assert invalidated == [True]  # new object made visible
+    assert listed == ["uploads/a.png"]  # new object made visible
 
 
-def test_verify_rejects_and_deletes_signature_mismatch(monkeypatch):
+async def test_verify_rejects_and_deletes_signature_mismatch(monkeypatch):
     meta = _meta("uploads/a.png", size_bytes=16, content_type="image/png")
     deleted, _ = _wire_verify(
         monkeypatch, metadata=meta, head_bytes=b"<html>not a png"
     )
     with pytest.raises(UploadError) as exc:
-        verify_upload("uploads/a.png")
+        await verify_upload("uploads/a.png")
     assert exc.value.status_code == 415
     assert deleted == ["uploads/a.png"]  # invalid object removed
 
 
-def test_verify_rejects_oversize(monkeypatch):
+async def test_verify_rejects_oversize(monkeypatch):
     monkeypatch.setattr(upload_service.settings, "max_file_size", 10)
     meta = _meta("uploads/big.txt", size_bytes=999, content_type="text/plain")
     deleted, _ = _wire_verify(monkeypatch, metadata=meta, head_bytes=b"x")
     with pytest.raises(UploadError) as exc:
-        verify_upload("uploads/big.txt")
+        await verify_upload("uploads/big.txt")
     assert exc.value.status_code == 413
     assert deleted == ["uploads/big.txt"]
 
 
-def test_verify_missing_object_is_404(monkeypatch):
+async def test_verify_missing_object_is_404(monkeypatch):
     deleted, _ = _wire_verify(monkeypatch, metadata=None, head_bytes=b"")
     with pytest.raises(UploadError) as exc:
-        verify_upload("uploads/gone.txt")
+        await verify_upload("uploads/gone.txt")
     assert exc.value.status_code == 404
     assert deleted == []  # nothing to delete
 
 
-def test_verify_rejects_key_outside_uploads_prefix():
+async def test_verify_rejects_key_outside_uploads_prefix():
     with pytest.raises(UploadError):
-        verify_upload("other/evil.txt")
+        await verify_upload("other/evil.txt")
 
 
-def test_verify_skips_range_get_for_signatureless_type(monkeypatch):
+async def test_verify_skips_range_get_for_signatureless_type(monkeypatch):
     """Text/data types have no signature, so verify must not fetch header bytes."""
     meta = _meta("uploads/notes.md", size_bytes=12, content_type="text/markdown")
     fetched: list[int] = []
-    monkeypatch.setattr(upload_service, "get_file_metadata", lambda key: meta)
+    monkeypatch.setattr(upload_service, "get_file_metadata_async", AsyncMock(return_value=meta))
     monkeypatch.setattr(
         upload_service,
-        "get_object_head_bytes",
-        lambda key, length: fetched.append(length) or b"",
+        "get_object_head_bytes_async",
+        AsyncMock(side_effect=lambda key, length: fetched.append(length) or b""),
     )
-    monkeypatch.setattr(upload_service, "delete_file", lambda key: None)
-    monkeypatch.setattr(upload_service, "invalidate_listing", lambda: None)
+    monkeypatch.setattr(upload_service, "delete_file_async", AsyncMock())
+    monkeypatch.setattr(upload_service, "add_to_listing_async", AsyncMock())
 
-    result = verify_upload("uploads/notes.md")
+    result = await verify_upload("uploads/notes.md")
     assert result.key == "uploads/notes.md"
     assert fetched == []  # no wasted Range-GET
 